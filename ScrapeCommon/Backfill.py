@@ -0,0 +1,114 @@
+"""Re-parse a source's description workbooks over a date range, e.g. after a parser fix.
+
+    python ScrapeCommon/Backfill.py dignity --start 2025-03-01 --end 2025-04-30 [--jobs 4]
+
+Every {source}_..._description.xlsx scraped in the range is handed to the source's
+parser, several workbooks at a time, each in its own process. A workbook is skipped
+when its _parsed.xlsx is newer than it and was built by the current parser version
+(see ParsedOutput.parser_version), so a re-run only does the files a parser change
+affects or that were never parsed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, HtmlParse, ParsedOutput
+
+# script: the source's parser; backends: whether it takes --parser
+Parser = namedtuple('Parser', ['script', 'backends'])
+DESCRIPTIONS = SnapshotStore.PROJECT_ROOT / "ScrapeDescriptions"
+PARSERS = {
+    'kaiser': Parser(DESCRIPTIONS / "KaiserHospitals" / "ParseKPDescriptions.py", True),
+    'dignity': Parser(DESCRIPTIONS / "DignityHospitals" / "ParseDignityDescriptions.py", True),
+    'claremont': Parser(DESCRIPTIONS / "ClaremontColleges" / "ParseClaremontJobDescriptions.py", False),
+}
+
+
+def description_workbooks(source, start=None, end=None, project_root=SnapshotStore.PROJECT_ROOT):
+    """(scrape date, path) of every parser input for a source scraped within [start, end]"""
+    found = []
+    for path, (file_source, kind, scrape_date) in SnapshotStore.legacy_files(project_root):
+        if file_source != source or kind != 'descriptions' or not path.name.endswith('_description.xlsx'):
+            continue
+        if (start and scrape_date < start) or (end and scrape_date > end):
+            continue
+        found.append((scrape_date, path))
+    return found
+
+
+def parsed_path(path):
+    """Where a parser writes the output for an input workbook"""
+    return path.with_name(path.name.replace('.xlsx', '_parsed.xlsx'))
+
+
+def is_current(path, version):
+    """Whether path's parsed output is newer than it and was built by this parser version"""
+    output = parsed_path(path)
+    return (output.exists() and output.stat().st_mtime >= path.stat().st_mtime
+            and ParsedOutput.read_version(output) == version)
+
+
+def run_parser(script, path, options):
+    """Parse one workbook in a separate process; returns (succeeded, seconds, output)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, str(script), str(path), *options],
+                            cwd=path.parent, capture_output=True, text=True)
+    return result.returncode == 0, time.perf_counter() - start, (result.stdout + result.stderr).strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse description workbooks over a date range")
+    parser.add_argument("source", choices=sorted(PARSERS))
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First scrape date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last scrape date (YYYY-MM-DD)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Workbooks parsed at the same time (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="Re-parse even workbooks whose output is current")
+    parser.add_argument("--dry-run", action="store_true", help="List the workbooks that would be parsed")
+    HtmlParse.add_parser_argument(parser)
+    args = parser.parse_args()
+
+    script, backends = PARSERS[args.source]
+    options = ["--parser", args.parser] if backends else []
+    version = ParsedOutput.parser_version(script, args.parser if backends else None)
+    start = args.start.isoformat() if args.start else None
+    end = args.end.isoformat() if args.end else None
+
+    workbooks = description_workbooks(args.source, start, end)
+    pending = [path for _, path in workbooks if args.force or not is_current(path, version)]
+    print(f"{args.source}: {len(workbooks)} description workbooks in range, "
+          f"{len(workbooks) - len(pending)} already parsed by parser version {version}, {len(pending)} to parse")
+    if args.dry_run:
+        for path in pending:
+            print(f"  {path.relative_to(SnapshotStore.PROJECT_ROOT)}")
+        return
+    if not pending:
+        return
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = {pool.submit(run_parser, script, path, options): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            succeeded, seconds, output = future.result()
+            if succeeded:
+                print(f"Parsed {path.name} ({seconds:.1f}s)")
+            else:
+                failed.append(path)
+                print(f"Failed {path.name} ({seconds:.1f}s):\n{output[-2000:]}")
+
+    print(f"\nBackfill done: {len(pending) - len(failed)} parsed, {len(failed)} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
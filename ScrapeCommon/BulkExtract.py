@@ -0,0 +1,39 @@
+import json
+from collections import namedtuple
+
+# One field of a listing row: the first/index-th match of `selector` inside the
+# row (or the row itself when selector is None), read as its visible text or,
+# when attr is given, as that property/attribute (like WebElement.get_attribute).
+Field = namedtuple('Field', ['selector', 'attr', 'index'], defaults=[None, None, 0])
+
+# Runs in the page: every row and every field in a single WebDriver round trip
+EXTRACT_ROWS_JS = """
+const [rowSelector, fields] = arguments;
+const rows = Array.from(document.querySelectorAll(rowSelector), row => {
+    const values = {};
+    for (const [name, selector, attr, index] of fields) {
+        const el = selector ? row.querySelectorAll(selector)[index] : (index === 0 ? row : null);
+        if (!el) {
+            values[name] = null;
+        } else if (attr) {
+            values[name] = (attr in el) ? el[attr] : el.getAttribute(attr);
+        } else {
+            values[name] = (el.innerText || '').trim();
+        }
+    }
+    return values;
+});
+return JSON.stringify(rows);
+"""
+
+
+def extract_rows(driver, row_selector, fields, required=()):
+    """Extract every listing row on the page with one execute_script call.
+
+    fields maps output names to Field specs. Missing elements come back as None;
+    rows missing any of the `required` fields are dropped. Returns a list of dicts
+    in page order.
+    """
+    spec = [[name, field.selector, field.attr, field.index] for name, field in fields.items()]
+    rows = json.loads(driver.execute_script(EXTRACT_ROWS_JS, row_selector, spec) or '[]')
+    return [row for row in rows if all(row.get(name) is not None for name in required)]
@@ -0,0 +1,194 @@
+"""Combine the parsed outputs of every day (and source) into one history table.
+
+    python ScrapeCommon/CombineParsed.py [--sources dignity kaiser] [--start 2025-03-01] [--output history.parquet]
+
+Every *_parsed.xlsx / *parsed*.csv under ScrapeLinks/ and ScrapeDescriptions/ is read
+(several at a time, each in its own process) and given explicit types: the pay
+figures as floats, every other column as text, so a column that holds numbers one
+day and text the next (job ids, Dignity's job-info fields) lines up instead of the
+day being dropped. Days whose columns differ are unioned; a column a day lacks is
+empty for its rows.
+
+Each file's typed rows are cached as Parquet under Snapshots/combine_cache/, keyed
+by the file's path and modification time, so a re-run only reads days that are new
+or were re-parsed. With --batch-size, files are read and cached that many rows at a
+time, so a worker's memory depends on the batch size rather than the file.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, WorkbookStream
+
+CACHE_ROOT = SnapshotStore.SNAPSHOT_ROOT / "combine_cache"
+# Bump when the typing below changes, so cached files are rebuilt
+CACHE_VERSION = "2"
+CACHE_KEY = b'combine:key'
+
+# Parsed columns that hold numbers; every other column is kept as text
+NUMERIC_COLUMNS = {
+    'hourlypay_low', 'hourlypay_high', 'hourlypay_spread',
+    'pay_low', 'pay_high', 'pay_difference',
+    'pay_min', 'pay_max', 'hourly_min', 'hourly_max', 'annual_min', 'annual_max',
+}
+# Columns the combiner adds in front of each file's own
+ADDED_COLUMNS = ['source', 'scrape_date', 'file']
+
+
+def parsed_files(sources=None, start=None, end=None, project_root=SnapshotStore.PROJECT_ROOT):
+    """(source, scrape date, path) of every parsed output for the sources, scraped within [start, end]"""
+    found = []
+    for path, (source, kind, scrape_date) in SnapshotStore.legacy_files(project_root):
+        if kind != 'parsed' or (sources and source not in sources):
+            continue
+        if (start and scrape_date < start) or (end and scrape_date > end):
+            continue
+        found.append((source, scrape_date, path))
+    return found
+
+
+def _as_text(values):
+    """A column as text: whole-number floats without '.0', dates without a midnight time.
+
+    Each value is formatted on its own, so a batch of a file gets the same text as the
+    whole file would.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        values = values.dt.strftime('%Y-%m-%d %H:%M:%S').str.removesuffix(' 00:00:00')
+    elif pd.api.types.is_float_dtype(values):
+        whole = values.mod(1).eq(0)
+        text = values.astype('string')
+        text[whole] = values[whole].astype('Int64').astype('string')
+        return text
+    return values.astype('string')
+
+
+def coerce(df):
+    """A parsed frame with explicit types: NUMERIC_COLUMNS as float, every other column as text"""
+    df = df.loc[:, ~df.columns.duplicated()]
+    columns = {}
+    for column in df.columns:
+        name = str(column)
+        if name in NUMERIC_COLUMNS:
+            columns[name] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+        else:
+            columns[name] = _as_text(df[column])
+    return pd.DataFrame(columns, index=df.index)
+
+
+def cache_path(path, root=CACHE_ROOT):
+    return Path(root) / f"{hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:20]}.parquet"
+
+
+def _cache_key(path):
+    return f"{CACHE_VERSION}:{Path(path).stat().st_mtime_ns}".encode('utf-8')
+
+
+def is_cached(path, root=CACHE_ROOT):
+    """Whether the cache holds this file as it is now (same path and modification time)"""
+    cached = cache_path(path, root)
+    if not cached.exists():
+        return False
+    metadata = pq.read_schema(cached).metadata or {}
+    return metadata.get(CACHE_KEY) == _cache_key(path)
+
+
+def load_file(source, scrape_date, path, root=CACHE_ROOT, batch_size=0):
+    """Read and type one parsed file into the cache, batch_size rows at a time (0: at once);
+    returns its row count"""
+    key = _cache_key(path)
+    cached = cache_path(path, root)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cached.with_suffix(f".{os.getpid()}.tmp")
+
+    rows = 0
+    writer = None
+    try:
+        for batch in SnapshotStore.iter_output(path, batch_size):
+            df = coerce(batch)
+            df.insert(0, 'source', source)
+            df.insert(1, 'scrape_date', scrape_date)
+            df.insert(2, 'file', Path(path).name)
+            df[ADDED_COLUMNS] = df[ADDED_COLUMNS].astype('string')
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                schema = table.schema.with_metadata({**(table.schema.metadata or {}), CACHE_KEY: key})
+                writer = pq.ParquetWriter(temp_path, schema, compression='zstd')
+            # Every batch gets the first one's types (a text column is text even when a batch has no values)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(df)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    writer.close()
+    os.replace(temp_path, cached)
+    return rows
+
+
+def combine(files, jobs=1, root=CACHE_ROOT, batch_size=0):
+    """One DataFrame of every file's typed rows (columns unioned), reading only files not cached.
+
+    Returns (combined, number of files read).
+    """
+    pending = [(source, scrape_date, path) for source, scrape_date, path in files if not is_cached(path, root)]
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(load_file, *zip(*pending), [root] * len(pending), [batch_size] * len(pending)))
+    else:
+        for source, scrape_date, path in pending:
+            load_file(source, scrape_date, path, root, batch_size)
+
+    frames = [pq.read_table(cache_path(path, root)).to_pandas() for _, _, path in files]
+    if not frames:
+        return pd.DataFrame(columns=ADDED_COLUMNS), len(pending)
+    combined = pd.concat(frames, ignore_index=True)
+    # Union of the columns, in the order they first appear; a day without a column is empty there
+    return combined.sort_values(['scrape_date', 'source'], kind='stable', ignore_index=True), len(pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Combine parsed outputs of every day into one history table")
+    parser.add_argument("--sources", nargs="+", choices=sorted(set(SnapshotStore.SOURCES.values())), default=None)
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First scrape date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last scrape date (YYYY-MM-DD)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Files read at the same time (default: %(default)s)")
+    parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                        help="Folder holding ScrapeLinks/ and ScrapeDescriptions/ (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the history table to this Parquet file")
+    WorkbookStream.add_batch_argument(parser)
+    args = parser.parse_args(argv)
+
+    start = args.start.isoformat() if args.start else None
+    end = args.end.isoformat() if args.end else None
+    files = parsed_files(args.sources, start, end, args.project_root)
+
+    started = time.perf_counter()
+    combined, read = combine(files, args.jobs, batch_size=args.batch_size)
+    print(f"{len(files)} parsed files ({read} read, {len(files) - read} from cache) in "
+          f"{time.perf_counter() - started:.1f}s: {len(combined)} rows, {len(combined.columns)} columns")
+    for source, rows in combined.groupby('source', sort=True).size().items():
+        days = combined.loc[combined['source'] == source, 'scrape_date'].nunique()
+        print(f"  {source}: {rows} rows over {days} days")
+
+    if args.output:
+        combined.to_parquet(args.output, index=False)
+        print(f"History written to {args.output}")
+    return combined
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from ScrapeCommon import SnapshotStore
+
+SYNC_EVERY = 100  # append() fsyncs after this many records; extend() and close() always do
+
+def _json_default(value):
+    """Convert pandas/numpy scalars and timestamps into JSON-friendly values"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class CrawlJournal:
+    """Append-only JSONL log of scraped records, compacted into Excel once per run.
+
+    Every scraper writes one line per job as soon as it is scraped. Each line is
+    flushed right away, but only fsynced every SYNC_EVERY records and at the end of
+    extend() / close(), so a machine crash loses at most the last few records, which
+    a resumed run scrapes again. Resuming reads the journal back
+    instead of re-opening the workbook, and the workbook itself is only built
+    by compact() at the end of the run.
+
+    Parallel workers each write to their own shard (see shard()); reading the
+    main journal also reads every shard next to it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._unsynced = 0
+
+    @classmethod
+    def for_output(cls, output_path):
+        """Journal that sits next to an output workbook (same name, .jsonl)"""
+        return cls(Path(output_path).with_suffix('.jsonl'))
+
+    def shard(self, worker):
+        """Journal owned by a single pool worker, stored next to this one"""
+        return CrawlJournal(self.path.with_name(f"{self.path.stem}.worker{worker}{self.path.suffix}"))
+
+    def shard_paths(self):
+        """Worker shard files in worker order (worker10 sorts after worker2)"""
+        paths = self.path.parent.glob(f"{self.path.stem}.worker*{self.path.suffix}")
+        def worker_index(path):
+            index = path.stem.rsplit('.worker', 1)[-1]
+            return (0, int(index), '') if index.isdigit() else (1, 0, index)
+        return sorted(paths, key=worker_index)
+
+    def append(self, record):
+        """Write a single record and flush it (fsynced every SYNC_EVERY records)"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # Start on a fresh line if the previous run died mid-record
+            if self._file.tell() > 0:
+                with open(self.path, 'rb') as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    if existing.read(1) != b'\n':
+                        self._file.write('\n')
+        self._file.write(json.dumps(record, default=_json_default, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= SYNC_EVERY:
+            self.sync()
+
+    def extend(self, records):
+        """Write a batch of records (e.g. one results page) and fsync once at the end"""
+        for record in records:
+            self.append(record)
+        self.sync()
+
+    def sync(self):
+        """fsync everything written so far"""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def read(self):
+        """Return all records written so far, including worker shards (torn lines are ignored)"""
+        records = []
+        for path in [self.path] + self.shard_paths():
+            if not path.exists():
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Skipping unreadable journal line in {path.name}")
+        return records
+
+    def keys(self, column):
+        """Set of values already journaled for a column (e.g. the URLs already scraped)"""
+        return {record[column] for record in self.read() if record.get(column) is not None}
+
+    def to_dataframe(self, base=None, key=None, columns=None, order=None):
+        """Build a DataFrame from the journal.
+
+        Without a base the journal records are the rows (deduplicated on key,
+        keeping the latest). With a base, journal records are upserted by key:
+        matching base rows are updated, unmatched records are appended, and
+        every other base row is kept as-is. If order (a sequence of keys) is
+        given, rows are sorted to follow it, e.g. the input order of a pool run.
+        """
+        records = pd.DataFrame(self.read())
+
+        if base is None:
+            df = records
+            if key and not df.empty:
+                df = df.drop_duplicates(subset=key, keep='last').reset_index(drop=True)
+        else:
+            df = base.copy()
+            if not records.empty:
+                latest = records.drop_duplicates(subset=key, keep='last').set_index(key)
+                hit = df[key].isin(latest.index)
+                for col in latest.columns:
+                    if col not in df.columns:
+                        df[col] = None
+                    df[col] = df[col].astype(object)
+                    df.loc[hit, col] = df.loc[hit, key].map(latest[col])
+                new_rows = latest[~latest.index.isin(df[key])].reset_index()
+                if not new_rows.empty:
+                    df = pd.concat([df, new_rows], ignore_index=True)
+
+        if order is not None and not df.empty:
+            position = {value: i for i, value in enumerate(order)}
+            rank = df[key].map(position).fillna(len(position)).to_numpy()
+            df = df.iloc[rank.argsort(kind='stable')].reset_index(drop=True)
+
+        if columns is not None:
+            df = df.reindex(columns=columns)
+        return df
+
+    def compact(self, excel_path, base=None, key=None, columns=None, order=None):
+        """Write the journal out as the Excel deliverable (plus its Parquet snapshot) and return the DataFrame"""
+        df = self.to_dataframe(base=base, key=key, columns=columns, order=order)
+        Path(excel_path).parent.mkdir(parents=True, exist_ok=True)
+        df.to_excel(excel_path, index=False, engine='openpyxl')
+        print(f"Compacted {len(df)} records from {self.path.name} -> {excel_path}")
+        SnapshotStore.write_for_output(excel_path, df)
+        return df
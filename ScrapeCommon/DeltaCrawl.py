@@ -0,0 +1,142 @@
+import random
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from ScrapeCommon import SnapshotStore
+
+# Columns that change on every scrape without the posting changing (Claremont's
+# `posted` is relative: "Posted 8 Days Ago" becomes "Posted 9 Days Ago")
+VOLATILE_COLUMNS = {
+    'Timestamp', 'Scrape Date', 'Scrape Day', 'Scrape Time', 'scraped_date', 'scraped_time',
+    'scrape_date', 'scrape_time', 'scrape_day', 'source_page', 'posted',
+}
+
+# Description values left by a failed fetch; these rows are fetched again rather than carried
+FAILURE_MARKERS = ('SCRAPE_FAILED', 'CRITICAL_ERROR', 'ERROR', 'PAGE NOT FOUND')
+
+
+def add_delta_arguments(parser):
+    """Add the shared --full / --revalidate options to a description scraper's argument parser"""
+    parser.add_argument("--full", action="store_true",
+                        help="Fetch every posting instead of carrying unchanged ones forward")
+    parser.add_argument("--revalidate", type=float, default=0.05, metavar="FRACTION",
+                        help="Share of carried postings to fetch again anyway (default: %(default)s)")
+    return parser
+
+
+def previous_descriptions(output_path, key, columns):
+    """Most recent earlier description output for the same source, or (None, None).
+
+    Looks at the workbooks next to output_path and at the Parquet snapshots (which
+    outlive workbooks that were cleaned up), newest first, and returns the first one
+    holding the key and every description column, as (scrape date, DataFrame).
+    """
+    info = SnapshotStore.classify_snapshot_file(output_path)
+    if info is None:
+        return None, None
+    source, _, today = info
+
+    candidates = []
+    for path in Path(output_path).parent.glob("*.xlsx"):
+        found = SnapshotStore.classify_snapshot_file(path)
+        if found and found[0] == source and found[1] == 'descriptions' and found[2] < today:
+            candidates.append((found[2], 0, path))
+    for _, scrape_date, path in SnapshotStore.snapshot_files('descriptions', [source]):
+        if scrape_date < today:
+            candidates.append((scrape_date, 1, path))
+
+    # Newest first; a workbook beats the snapshot of the same day (it is read via its snapshot anyway)
+    for scrape_date, _, path in sorted(candidates, key=lambda c: (c[0], -c[1]), reverse=True):
+        try:
+            df = pd.read_parquet(path) if path.suffix == '.parquet' else SnapshotStore.read_output(path)
+        except Exception as e:
+            print(f"Could not read previous descriptions {path.name}: {str(e)[:200]}")
+            continue
+        if key in df.columns and all(column in df.columns for column in columns):
+            return scrape_date, df
+    return None, None
+
+
+def _fetched(df, columns):
+    """Rows whose description columns hold a real fetch (something present, no failure marker)"""
+    values = df[columns].astype('string')
+    present = values.notna().any(axis=1)
+    failed = values.apply(lambda column: column.str.startswith(FAILURE_MARKERS, na=False)).any(axis=1)
+    return present & ~failed
+
+
+def _listing_hash(df, columns):
+    """Hash of the listing fields of each row, for spotting postings edited in place"""
+    if not columns:
+        return pd.Series(0, index=df.index, dtype='uint64')
+    return pd.util.hash_pandas_object(df[columns].astype('string').fillna(''), index=False)
+
+
+def diff_postings(today, previous, key, columns):
+    """Compare today's links with the previous description output using a keyed hash join.
+
+    Returns today's rows with a `delta` column: 'new' (not in the previous output),
+    'changed' (listing fields differ), 'open' (unchanged and fetched successfully last
+    time) or 'refetch' (unchanged, but last time's fetch failed); plus the keys of the
+    postings that have been removed since.
+    """
+    listing = [column for column in today.columns
+               if column in previous.columns and column != key
+               and column not in columns and column not in VOLATILE_COLUMNS]
+    left = pd.DataFrame({key: today[key], '_hash': _listing_hash(today, listing)})
+    right = pd.DataFrame({key: previous[key], '_hash': _listing_hash(previous, listing),
+                          '_fetched': _fetched(previous, columns)})
+    right = right.drop_duplicates(subset=key, keep='last')
+
+    merged = left.merge(right, on=key, how='outer', indicator=True, suffixes=('', '_previous'))
+    removed = merged.loc[merged['_merge'] == 'right_only', key].tolist()
+    merged = merged[merged['_merge'] != 'right_only'].drop_duplicates(subset=key)
+
+    delta = pd.Series('open', index=merged.index)
+    delta[merged['_merge'] == 'left_only'] = 'new'
+    both = merged['_merge'] == 'both'
+    delta[both & (merged['_hash'] != merged['_hash_previous'])] = 'changed'
+    unchanged = both & (merged['_hash'] == merged['_hash_previous'])
+    delta[unchanged & ~merged['_fetched'].fillna(False).astype(bool)] = 'refetch'
+
+    result = today.copy()
+    result['delta'] = result[key].map(pd.Series(delta.to_numpy(), index=merged[key].to_numpy()))
+    return result, removed
+
+
+def carry_forward(today, output_path, key, columns, full=False, revalidate=0.05):
+    """Copy yesterday's description columns onto today's still-open, unchanged postings.
+
+    today is the link frame with the description `columns` added (empty). Postings that
+    are new, changed, failed last time, or drawn for the revalidation sample are left
+    empty so the scraper fetches them; everything else comes back already filled in.
+    Returns today's frame; with `full` (or no previous output) it is returned as-is.
+    """
+    if full:
+        return today
+    previous_date, previous = previous_descriptions(output_path, key, columns)
+    if previous is None:
+        print("No previous description output found: fetching every posting")
+        return today
+
+    diff, removed = diff_postings(today, previous, key, columns)
+    carried = diff['delta'] == 'open'
+    # Re-fetch a reproducible sample of carried postings, to catch edits the listing doesn't show
+    sample = [value for value in diff.loc[carried, key]
+              if random.Random(f"{date.today().isoformat()}|{value}").random() < revalidate]
+    carried &= ~diff[key].isin(sample)
+
+    previous = previous.drop_duplicates(subset=key, keep='last').set_index(key)
+    today = today.copy()
+    for column in columns:
+        today[column] = today[column].astype(object)
+        today.loc[carried, column] = today.loc[carried, key].map(previous[column])
+
+    counts = diff['delta'].value_counts()
+    print(f"Delta against {previous_date}: {counts.get('new', 0)} new, {counts.get('changed', 0)} changed, "
+          f"{counts.get('open', 0)} still open, {counts.get('refetch', 0)} failed last time, {len(removed)} removed")
+    print(f"Carrying {int(carried.sum())} descriptions forward; fetching {int((~carried).sum())} "
+          f"(including {len(sample)} revalidations)")
+    return today
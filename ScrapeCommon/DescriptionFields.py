@@ -0,0 +1,149 @@
+"""Field extraction from scraped descriptions, written against HtmlParse backends.
+
+Each function takes the backend to parse with, so a parser picks bs4, lxml or
+selectolax per run (see HtmlParse.add_parser_argument) and the same code runs on all
+three. Rows are extracted by plain module-level functions so they can also be
+handed to worker processes.
+"""
+import pandas as pd
+
+from ScrapeCommon.HtmlParse import Selector
+
+JOB_INFO = Selector('span', 'job-info')
+STRONG = Selector('strong')
+BOLD = Selector('b')
+
+# Kaiser (kp.org job pages)
+KP_ATS_EXTRAS = Selector('div', 'ats-extras')
+KP_INFO_WRAP = Selector('div', 'job-description__info-wrap')
+
+# Dignity (CommonSpirit job pages)
+SECTION16_PANEL = Selector('div', 'section16__panel')
+ATS_DESCRIPTION = Selector('div', 'ats-description')
+JOB_APPLY_BUTTON = Selector('a', 'button job-apply bottom')
+DESC_OVERVIEW = Selector('span', 'desc-overview')
+READ_MORE_BUTTON = Selector('button', 'read-more__btn')
+
+
+def kaiser_job_details(html, backend):
+    """Labelled fields of a Kaiser job page (pay range, location, ...) as a dict"""
+    if pd.isna(html):  # Skip NaN values
+        return {}
+
+    soup = backend.parse(html)
+    details = {}
+
+    # Extract from <div class="ats-extras">
+    ats_extras = backend.find(soup, KP_ATS_EXTRAS)
+    if ats_extras is not None:
+        for span in backend.find_all(ats_extras, JOB_INFO):
+            label = backend.text(backend.find(span, STRONG), strip=True)
+            key = label.replace(':', '').strip()
+            value = backend.text(span, strip=True).replace(label, '').strip()
+            details[key.lower().replace(' ', '_')] = value
+
+    # Extract from <div class="job-description__info-wrap">
+    info_wrap = backend.find(soup, KP_INFO_WRAP)
+    if info_wrap is not None:
+        for span in backend.find_all(info_wrap, JOB_INFO):
+            label = backend.text(backend.find(span, BOLD), strip=True)
+            value = backend.text(span, strip=True).replace(label, '').strip()
+            details[label.lower().replace(' ', '_')] = value
+
+    return details
+
+
+def job_info(root, backend):
+    """Dignity job-info spans under root as {label: value}"""
+    details = {}
+    for span in backend.find_all(root, JOB_INFO):
+        b_tag = backend.find(span, BOLD)
+        if b_tag is not None:
+            # The label is the <b> text, the value is everything after </b> until </span>
+            label = backend.text(b_tag, strip=True).strip(':')
+            details[label] = backend.text_after(b_tag).strip()
+    return details
+
+
+def html_before(element, stop, backend):
+    """An element's HTML cut off where another element (e.g. a button) starts"""
+    # A missing element reads as 'None', as the parser has always written it
+    html = backend.html(element) if element is not None else str(None)
+    return html.split(backend.html(stop))[0]
+
+
+def plain_text(html, backend):
+    """Text of an HTML fragment, one string per line"""
+    if not html:
+        return ""
+    return backend.text(backend.parse(html), separator="\n").strip()
+
+
+def dignity_row(section16_html, overview_html, job_details_html, backend):
+    """Parse a Dignity row's HTML cells once each and extract everything from those trees.
+
+    Empty overview/job details cells are filled from section16 (job details up to the
+    job-apply button); without section16, job details are trimmed to the desc-overview
+    container up to the read-more button. Returns the final overview_html and
+    job_details_html, the job-info fields of each, and the job details' plain text.
+    """
+    overview_data = None
+    section16_data = {}
+    text = None
+
+    if section16_html:
+        section16 = backend.parse(section16_html)
+        section16_data = job_info(section16, backend)
+
+        # If 'overview_html' is empty, use the section16 panel
+        section16_panel = backend.find(section16, SECTION16_PANEL)
+        if not overview_html and section16_panel is not None:
+            overview_html = backend.html(section16_panel)
+            overview_data = job_info(section16_panel, backend)
+
+        # If 'job_details_html' is empty, use the ats-description up to the job-apply button
+        if not job_details_html:
+            ats_description = backend.find(section16, ATS_DESCRIPTION)
+            job_apply_button = backend.find(section16, JOB_APPLY_BUTTON)
+            if job_apply_button is not None:
+                job_details_html = html_before(ats_description, job_apply_button, backend)
+                if ats_description is not None and backend.contains(ats_description, job_apply_button):
+                    text = backend.text_before(ats_description, job_apply_button)
+                elif ats_description is not None and job_details_html == backend.html(ats_description):
+                    text = backend.text(ats_description, separator="\n").strip()
+            elif ats_description is not None:
+                job_details_html = backend.html(ats_description)
+                text = backend.text(ats_description, separator="\n").strip()
+
+    elif job_details_html:
+        job_details = backend.parse(job_details_html)
+        text = backend.text(job_details, separator="\n").strip()
+        desc_overview = backend.find(job_details, DESC_OVERVIEW)
+        parent_container = backend.find_parent(desc_overview, ATS_DESCRIPTION) if desc_overview is not None else None
+        if parent_container is not None:
+            read_more_button = backend.find(parent_container, READ_MORE_BUTTON)
+            if read_more_button is not None:
+                job_details_html = html_before(parent_container, read_more_button, backend)
+                text = backend.text_before(parent_container, read_more_button)
+            else:
+                job_details_html = backend.html(parent_container)
+                text = backend.text(parent_container, separator="\n").strip()
+
+    if overview_data is None:
+        overview_data = job_info(backend.parse(overview_html), backend) if overview_html else {}
+    if text is None:
+        # Only when the text can't be read off a tree parsed above (e.g. a job-apply button outside the description)
+        text = plain_text(job_details_html, backend)
+
+    return {
+        'overview_html': overview_html,
+        'job_details_html': job_details_html,
+        'overview_data': overview_data,
+        'section16_data': section16_data,
+        'job_details_plain_text': text,
+    }
+
+
+def page_text(html, backend):
+    """All text of a page, concatenated as BeautifulSoup's get_text() does"""
+    return backend.text(backend.parse(html or ''))
@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+from selenium import webdriver
+
+# Resources the scrapers never read: images, media and web fonts
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.mov", "*.m3u8", "*.mp3", "*.ogg", "*.wav",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+]
+
+# Analytics, ads, chat and video hosts the job boards pull in
+THIRD_PARTY_HOSTS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "facebook.net", "facebook.com", "connect.facebook.net", "linkedin.com", "licdn.com",
+    "hotjar.com", "clarity.ms", "bing.com", "twitter.com", "tiktok.com", "snapchat.com",
+    "youtube.com", "ytimg.com", "vimeo.com", "adobedtm.com", "demdex.net", "omtrdc.net",
+    "newrelic.com", "nr-data.net", "qualtrics.com", "onetrust.com", "cookielaw.org",
+]
+
+# Overlays that only get in the scrapers' way: the Radancy (Kaiser, CommonSpirit) cookie
+# banner and the job-alert prompt with its "Not Now" button
+HIDDEN_OVERLAYS = [
+    "#igdpr-alert",
+    "[role='dialog']:has(.btn-not-now)",
+    ".modal:has(.btn-not-now)",
+    ".modal-backdrop:has(~ .modal .btn-not-now)",
+]
+
+# Injected into every document before the page's own scripts run
+HIDE_OVERLAYS_JS = """
+(() => {
+    const style = document.createElement('style');
+    style.textContent = %s;
+    const attach = () => (document.head || document.documentElement).appendChild(style);
+    if (document.documentElement) {
+        attach();
+    } else {
+        new MutationObserver((_, observer) => {
+            if (document.documentElement) {
+                observer.disconnect();
+                attach();
+            }
+        }).observe(document, {childList: true});
+    }
+})();
+"""
+
+# Consent cookies saved after the first accepted banner and seeded into every new browser
+# (machine-local state, kept at the project root next to the caches)
+CONSENT_FILE = Path(__file__).resolve().parent.parent / "consent_cookies.json"
+COOKIE_FIELDS = ['name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires']
+CONSENT_WORDS = ['consent', 'gdpr', 'cookie']
+
+_lock = threading.Lock()
+_traffic = {'pages': 0, 'bytes': 0, 'requests': 0, 'blocked': 0}
+
+
+class LeanChrome(webdriver.Chrome):
+    """Chrome that blocks unneeded resources over CDP and tallies the bytes each page transfers"""
+
+    def __init__(self, *args, blocked_urls=(), hidden_overlays=(), consent_file=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute_cdp_cmd('Network.enable', {})
+        if blocked_urls:
+            self.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+        if hidden_overlays:
+            css = ", ".join(hidden_overlays) + " { display: none !important; }"
+            self.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                 {'source': HIDE_OVERLAYS_JS % json.dumps(css)})
+        if consent_file:
+            seed_consent_cookies(self, consent_file)
+
+    def _collect_traffic(self):
+        """Drain the performance log into the run totals"""
+        transferred = requests = blocked = 0
+        try:
+            entries = self.get_log('performance')
+        except Exception:
+            return
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            if message['method'] == 'Network.loadingFinished':
+                transferred += message['params'].get('encodedDataLength', 0)
+                requests += 1
+            elif message['method'] == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+                blocked += 1
+        with _lock:
+            _traffic['bytes'] += int(transferred)
+            _traffic['requests'] += requests
+            _traffic['blocked'] += blocked
+
+    def count_page(self):
+        """Count a page loaded in place (e.g. an AJAX results page) for the bytes-per-page report"""
+        self._collect_traffic()
+        with _lock:
+            _traffic['pages'] += 1
+
+    def get(self, url):
+        self._collect_traffic()
+        with _lock:
+            _traffic['pages'] += 1
+        super().get(url)
+
+    def quit(self):
+        try:
+            self._collect_traffic()
+        finally:
+            super().quit()
+
+
+def load_consent_cookies(path=CONSENT_FILE):
+    """Saved consent cookies that have not expired yet"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            cookies = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    now = time.time()
+    return [cookie for cookie in cookies if cookie.get('expires', -1) <= 0 or cookie['expires'] > now]
+
+
+def seed_consent_cookies(driver, path=CONSENT_FILE):
+    """Set the saved consent cookies before the first navigation, so banners never show"""
+    cookies = load_consent_cookies(path)
+    if cookies:
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+    return len(cookies)
+
+
+def save_consent_cookies(driver, domain, path=CONSENT_FILE):
+    """Remember the persistent cookies a site set after its consent banner was accepted"""
+    fresh = []
+    for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']:
+        if not cookie['domain'].lstrip('.').endswith(domain):
+            continue
+        # Session cookies are only worth keeping when they carry the consent itself
+        if cookie.get('session') and not any(word in cookie['name'].lower() for word in CONSENT_WORDS):
+            continue
+        saved_cookie = {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+        if cookie.get('session'):
+            saved_cookie.pop('expires', None)
+        fresh.append(saved_cookie)
+    with _lock:
+        saved = {(c['name'], c['domain'], c['path']): c for c in load_consent_cookies(path)}
+        saved.update({(c['name'], c['domain'], c['path']): c for c in fresh})
+        # Write-then-rename so parallel browsers never leave a half-written file
+        temp_path = Path(path).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(list(saved.values()), file, indent=1)
+        os.replace(temp_path, path)
+    print(f"Saved {len(fresh)} consent cookies for {domain}")
+    return len(fresh)
+
+
+def new_driver(headless=True, block=True, blocked_hosts=THIRD_PARTY_HOSTS, implicit_wait=0,
+               page_load_timeout=None, window_size="1920,1080", hide_overlays=True, consent_file=CONSENT_FILE):
+    """Start a lean Chrome: headless, eager page loads, images/media/fonts/trackers blocked.
+
+    Known overlays are hidden with an injected stylesheet and saved consent cookies are
+    seeded up front, so pages come up without banners to dismiss. Cookies are seeded
+    rather than kept in a user-data-dir because parallel browsers can't share a profile.
+    """
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={window_size}")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--log-level=3")  # Only show fatal errors
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    options.add_experimental_option("useAutomationExtension", False)
+    if block:
+        # Belt and braces: the image setting also stops CSS background images
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    # Hand control back at DOMContentLoaded instead of waiting for every subresource
+    options.page_load_strategy = 'eager'
+    # Network events feed the bytes-per-page report
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    blocked_urls = []
+    if block:
+        blocked_urls = BLOCKED_RESOURCES + [f"*{host}*" for host in blocked_hosts]
+    driver = LeanChrome(options=options, blocked_urls=blocked_urls,
+                        hidden_overlays=HIDDEN_OVERLAYS if hide_overlays else (), consent_file=consent_file)
+    if implicit_wait:
+        driver.implicitly_wait(implicit_wait)
+    if page_load_timeout:
+        driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+def add_browser_arguments(parser):
+    """Add the shared --headed / --no-block / --block-host options to a scraper's argument parser"""
+    parser.add_argument("--headed", action="store_true",
+                        help="Show the browser window instead of running headless")
+    parser.add_argument("--no-block", action="store_true",
+                        help="Load images, media, fonts and third-party hosts as usual")
+    parser.add_argument("--block-host", action="append", default=[], metavar="HOST",
+                        help="Also block requests to HOST (repeatable)")
+    return parser
+
+
+def driver_factory(args, **settings):
+    """Zero-argument driver constructor configured from parsed --headed/--no-block/--block-host"""
+    return partial(
+        new_driver,
+        headless=not args.headed,
+        block=not args.no_block,
+        blocked_hosts=THIRD_PARTY_HOSTS + args.block_host,
+        **settings
+    )
+
+
+def report():
+    """Print the bytes transferred per page across every lean driver in this run"""
+    with _lock:
+        traffic = dict(_traffic)
+    if not traffic['pages']:
+        return
+    per_page = traffic['bytes'] / traffic['pages']
+    print(f"\nBrowser traffic: {traffic['bytes'] / 1e6:.1f} MB over {traffic['pages']} pages "
+          f"({per_page / 1e3:.0f} kB/page, {traffic['requests'] / traffic['pages']:.1f} requests/page, "
+          f"{traffic['blocked']} requests blocked)")
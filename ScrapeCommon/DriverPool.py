@@ -0,0 +1,99 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def default_workers():
+    """A sensible browser count for this machine (each Chrome wants about a core)"""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def add_pool_arguments(parser):
+    """Add the shared --workers / --delay options to a scraper's argument parser"""
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Number of parallel browser instances (default: %(default)s)")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Seconds each worker waits between URLs (default: %(default)s)")
+    return parser
+
+
+class LazyDriver:
+    """WebDriver stand-in that only launches the browser the first time it is used.
+
+    Lets HTTP-first scrapers hand every worker a "driver" without paying for a
+    Chrome start-up unless a page actually needs the browser fallback.
+    """
+
+    def __init__(self, setup_driver):
+        self._setup_driver = setup_driver
+        self._driver = None
+
+    @property
+    def started(self):
+        return self._driver is not None
+
+    def __getattr__(self, name):
+        if self._driver is None:
+            self._driver = self._setup_driver()
+        return getattr(self._driver, name)
+
+    def quit(self):
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+def _run_worker(worker, shard, scrape_item, setup_driver, journal, delay):
+    """Scrape one shard of items on a dedicated browser, journaling every record"""
+    worker_journal = journal.shard(worker)
+    driver = LazyDriver(setup_driver)
+    scraped = 0
+    try:
+        for position, (index, item) in enumerate(shard, start=1):
+            print(f"[worker {worker}] {position}/{len(shard)} (row {index + 1})")
+            try:
+                record = scrape_item(driver, item)
+            except Exception as e:
+                print(f"[worker {worker}] Error on row {index + 1}: {str(e)[:200]}")
+                record = None
+
+            if record:
+                worker_journal.append(record)
+                scraped += 1
+
+            if delay:
+                time.sleep(delay)
+    finally:
+        driver.quit()
+        worker_journal.close()
+    return scraped
+
+
+def scrape_in_pool(items, scrape_item, setup_driver, journal, key, workers=1, delay=0.0):
+    """Shard items across `workers` browsers and return the journaled records in input order.
+
+    items is a list of dicts (e.g. df.to_dict('records')) and scrape_item(driver, item)
+    returns the record to journal for an item, or None to leave it for the next run.
+    Each worker's browser is started lazily, on the first call that touches the driver.
+    Worker i journals to its own shard of `journal`, so every worker resumes from its
+    own progress and items already journaled by any worker are skipped.
+    """
+    done = journal.keys(key)
+    pending = [(index, item) for index, item in enumerate(items) if item[key] not in done]
+    workers = max(1, min(workers, len(pending)))
+    print(f"{len(items) - len(pending)} already scraped, {len(pending)} to go on {workers} worker(s)")
+
+    if pending:
+        # Round-robin sharding keeps the workers evenly loaded
+        shards = [pending[worker::workers] for worker in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_worker, worker, shard, scrape_item, setup_driver, journal, delay)
+                for worker, shard in enumerate(shards)
+            ]
+            scraped = sum(future.result() for future in futures)
+        print(f"Pool finished: {scraped} new records from {workers} worker(s)")
+
+    # Merge every shard back into input order
+    records = {record[key]: record for record in journal.read() if key in record}
+    return [records[item[key]] for item in items if item[key] in records]
@@ -0,0 +1,233 @@
+import hashlib
+import mmap
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+import pandas as pd
+import zstandard as zstd
+
+# One archive per source: HtmlArchive/{source}/blobs.zst (zstd frames, appended) + index.tsv
+ARCHIVE_ROOT = Path(__file__).resolve().parent.parent / "HtmlArchive"
+REF_PREFIX = "sha256:"
+LEVEL = 19
+MAX_CHAIN = 8  # Longest run of deltas before a version is stored in full again
+CACHE_SIZE = 64  # Decoded versions kept for resolving delta chains
+
+# offset/length locate the frame in blobs.zst; base is the sha256 of the version the
+# frame was compressed against ('' for a full frame); key is the posting it belongs to
+Entry = namedtuple('Entry', ['offset', 'length', 'base', 'size', 'key'])
+
+
+def is_ref(value):
+    return isinstance(value, str) and value.startswith(REF_PREFIX) and len(value) == len(REF_PREFIX) + 64
+
+
+class HtmlArchive:
+    """Content-addressed, zstd-compressed store for scraped HTML.
+
+    put() returns a "sha256:<hex>" reference to put in the workbook instead of the HTML.
+    Identical content is stored once, however many days it is scraped. A new version of
+    a posting (same key) is compressed with the previous version as a zstd dictionary,
+    so an edit costs about the size of the edit. Frames are read through a memory map of
+    the pack using the offset index, which is loaded into memory when the archive opens.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.pack_path = self.root / "blobs.zst"
+        self.index_path = self.root / "index.tsv"
+        self.entries = {}
+        self.latest = {}
+        self._lock = threading.RLock()
+        self._pack = None
+        self._index = None
+        self._map = None
+        self._decoded = OrderedDict()
+        self.stats = {'full': 0, 'delta': 0, 'duplicate': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self._load_index()
+
+    def _load_index(self):
+        """Read index.tsv, ignoring a torn last line or frames past the end of the pack"""
+        if not self.index_path.exists():
+            return
+        pack_size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+        with open(self.index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 6 or not parts[1].isdigit() or not parts[2].isdigit():
+                    continue
+                sha, offset, length, base, size, key = parts
+                entry = Entry(int(offset), int(length), base, int(size), key)
+                if entry.offset + entry.length > pack_size:
+                    continue
+                self.entries[sha] = entry
+                if key:
+                    self.latest[key] = sha
+
+    def __contains__(self, ref):
+        return ref.removeprefix(REF_PREFIX) in self.entries
+
+    def _chain_length(self, sha):
+        length = 0
+        while sha and self.entries[sha].base:
+            sha = self.entries[sha].base
+            length += 1
+        return length
+
+    def _append(self, sha, frame, base, size, key):
+        if self._pack is None:
+            self._pack = open(self.pack_path, 'ab')
+            self._index = open(self.index_path, 'a', encoding='utf-8')
+        offset = self._pack.seek(0, 2)
+        if frame is not None:
+            self._pack.write(frame)
+            self._pack.flush()
+            entry = Entry(offset, len(frame), base, size, key)
+        else:
+            entry = self.entries[sha]._replace(key=key)
+        # The index line only goes out once its frame is on disk
+        self._index.write(f"{sha}\t{entry.offset}\t{entry.length}\t{entry.base}\t{entry.size}\t{key}\n")
+        self._index.flush()
+        self.entries[sha] = entry
+        if key:
+            self.latest[key] = sha
+
+    def put(self, text, key=None):
+        """Store text (once per distinct content) and return its reference; None passes through"""
+        if text is None:
+            return None
+        data = text.encode('utf-8')
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.stats['bytes_in'] += len(data)
+            if sha in self.entries:
+                self.stats['duplicate'] += 1
+                if key and self.latest.get(key) != sha:
+                    self._append(sha, None, None, None, key)
+                return REF_PREFIX + sha
+
+            base = self.latest.get(key) if key else None
+            if base and self._chain_length(base) < MAX_CHAIN:
+                dictionary = zstd.ZstdCompressionDict(self._read(base), dict_type=zstd.DICT_TYPE_RAWCONTENT)
+                frame = zstd.ZstdCompressor(level=LEVEL, dict_data=dictionary).compress(data)
+                self.stats['delta'] += 1
+            else:
+                base = ''
+                frame = zstd.ZstdCompressor(level=LEVEL).compress(data)
+                self.stats['full'] += 1
+            self.stats['bytes_out'] += len(frame)
+            self._append(sha, frame, base, len(data), key or '')
+        return REF_PREFIX + sha
+
+    def _view(self, end):
+        """Memory map of the pack covering at least `end` bytes (remapped as the pack grows)"""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.pack_path, 'rb') as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _read(self, sha):
+        """Raw bytes of one stored version, decoding its delta chain as needed"""
+        if sha in self._decoded:
+            self._decoded.move_to_end(sha)
+            return self._decoded[sha]
+        entry = self.entries[sha]
+        frame = self._view(entry.offset + entry.length)[entry.offset:entry.offset + entry.length]
+        if entry.base:
+            dictionary = zstd.ZstdCompressionDict(self._read(entry.base), dict_type=zstd.DICT_TYPE_RAWCONTENT)
+            data = zstd.ZstdDecompressor(dict_data=dictionary).decompress(frame)
+        else:
+            data = zstd.ZstdDecompressor().decompress(frame)
+        self._decoded[sha] = data
+        if len(self._decoded) > CACHE_SIZE:
+            self._decoded.popitem(last=False)
+        return data
+
+    def get(self, ref):
+        """Text behind a reference (KeyError if this archive doesn't hold it)"""
+        with self._lock:
+            return self._read(ref.removeprefix(REF_PREFIX)).decode('utf-8')
+
+    def close(self):
+        with self._lock:
+            for handle in (self._pack, self._index, self._map):
+                if handle is not None:
+                    handle.close()
+            self._pack = self._index = self._map = None
+
+    def report(self):
+        """Print how much HTML this run stored and how small it got"""
+        with self._lock:
+            stats = dict(self.stats)
+        stored = stats['full'] + stats['delta']
+        if not stored + stats['duplicate']:
+            return
+        ratio = stats['bytes_in'] / stats['bytes_out'] if stats['bytes_out'] else float('inf')
+        print(f"\nHTML archive ({self.root.name}): {stats['duplicate']} pages already archived, "
+              f"{stats['full']} stored in full, {stats['delta']} as deltas; "
+              f"{stats['bytes_in'] / 1e6:.1f} MB -> {stats['bytes_out'] / 1e6:.1f} MB ({ratio:.0f}x)")
+
+
+class InlineHtml:
+    """Stands in for an archive when the HTML stays in the workbook (--inline-html)"""
+
+    def put(self, text, key=None):
+        return text
+
+    def report(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def add_archive_argument(parser):
+    """Add the shared --inline-html option to a description scraper's argument parser"""
+    parser.add_argument("--inline-html", action="store_true",
+                        help="Keep the scraped HTML in the workbook instead of HtmlArchive/ (which stays on "
+                             "this machine), for workbooks that are parsed elsewhere")
+    return parser
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(source, root=ARCHIVE_ROOT):
+    """The (shared, per-process) archive for one source"""
+    path = Path(root) / source
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = HtmlArchive(path)
+        return _archives[path]
+
+
+def for_args(args, source):
+    """Where a scraper puts its HTML: the source's archive, or the workbook with --inline-html"""
+    return InlineHtml() if args.inline_html else open_archive(source)
+
+
+def resolve(value, root=ARCHIVE_ROOT):
+    """HTML behind a workbook cell: references are looked up in every source's archive,
+    anything else (inline HTML, blanks, NaN) is returned as-is.
+
+    A reference no archive holds raises KeyError: the workbook was scraped on a machine
+    whose HtmlArchive/ isn't here, and parsing on would write empty fields.
+    """
+    if not is_ref(value):
+        return value
+    for path in sorted(Path(root).glob("*/index.tsv")):
+        archive = open_archive(path.parent.name, root)
+        if value in archive:
+            return archive.get(value)
+    raise KeyError(f"HTML {value} is not in the archive at {root}; copy HtmlArchive/ over from the machine "
+                   f"that scraped this workbook, or re-scrape it with --inline-html")
+
+
+def resolve_column(values, root=ARCHIVE_ROOT):
+    """resolve() over a DataFrame column (raises KeyError on the first reference not archived)"""
+    return pd.Series([resolve(value, root) for value in values], index=values.index, dtype=object)
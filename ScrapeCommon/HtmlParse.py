@@ -0,0 +1,248 @@
+"""Interchangeable HTML parsing backends for the description parsers.
+
+The parsers only ever do a handful of things with a page: find elements by tag and
+class, read their text or HTML, and cut a container off at a button. Each backend
+implements exactly those operations, so the same extraction code runs on
+
+    bs4         BeautifulSoup with html.parser (the reference; matches older outputs)
+    lxml        lxml.html with compiled XPath selectors
+    selectolax  the lexbor engine with CSS selectors
+
+Selectors are declared once as Selector(tag, classes) and compiled by each backend
+on first use. Text follows BeautifulSoup's get_text(): script, style and template
+contents and comments are not text. One difference is deliberate: BeautifulSoup
+matches a multi-class selector ('button job-apply bottom') against the whole class
+attribute, the other backends match elements carrying all of those classes.
+"""
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+
+Selector = namedtuple('Selector', ['tag', 'classes'], defaults=[None])
+
+# Elements whose contents get_text() leaves out
+NON_TEXT_TAGS = ('script', 'style', 'template')
+DEFAULT_BACKEND = 'bs4'
+
+
+def add_parser_argument(parser):
+    """Add the shared --parser option to a description parser's argument parser"""
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help="HTML parsing backend (default: %(default)s)")
+    return parser
+
+
+class SoupBackend:
+    """BeautifulSoup, exactly as the parsers have always used it"""
+    name = 'bs4'
+
+    def __init__(self, features='html.parser'):
+        self.features = features
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.features)
+
+    def find(self, node, selector):
+        return node.find(selector.tag, class_=selector.classes)
+
+    def find_all(self, node, selector):
+        return node.find_all(selector.tag, class_=selector.classes)
+
+    def find_parent(self, node, selector):
+        return node.find_parent(selector.tag, class_=selector.classes)
+
+    def contains(self, ancestor, node):
+        return any(parent is ancestor for parent in node.parents)
+
+    def text(self, node, separator='', strip=False):
+        return node.get_text(separator=separator, strip=strip)
+
+    def text_after(self, node):
+        return ''.join(node.next_siblings)
+
+    def text_before(self, container, stop):
+        strings = []
+        for node in container.descendants:
+            if node is stop:
+                break
+            if type(node) in container.MAIN_CONTENT_STRING_TYPES:
+                strings.append(node)
+        return "\n".join(strings).strip()
+
+    def html(self, node):
+        return str(node)
+
+
+class LxmlBackend:
+    """lxml.html; selectors become precompiled XPath expressions"""
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+        self._compiled = {}
+        outside = ' or '.join(f'ancestor::{tag}' for tag in NON_TEXT_TAGS)
+        self._strings = etree.XPath(f'.//text()[not({outside})]', smart_strings=False)
+        # Text nodes of $root that come before $stop in document order
+        self._strings_before = etree.XPath(
+            f'$stop/preceding::text()[not({outside})][ancestor::*[count(. | $root) = 1]]', smart_strings=False)
+        # Tail text and later siblings (an element's tail is its first following text node)
+        self._text_after = etree.XPath('following-sibling::node()[not(self::comment())]', smart_strings=False)
+
+    def __reduce__(self):
+        # Compiled XPath doesn't pickle; a worker process compiles its own
+        return (LxmlBackend, ())
+
+    def _xpath(self, selector, axis):
+        key = (selector, axis)
+        if key not in self._compiled:
+            tests = [f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+                     for name in (selector.classes or '').split()]
+            predicate = ''.join(f'[{test}]' for test in tests)
+            self._compiled[key] = self._etree.XPath(f'{axis}{selector.tag or "*"}{predicate}')
+        return self._compiled[key]
+
+    def parse(self, html):
+        try:
+            return self._html.document_fromstring(html)
+        except self._etree.ParserError:
+            # Blank (or comment-only) documents
+            return self._html.Element('html')
+
+    def find(self, node, selector):
+        found = self._xpath(selector, 'descendant::')(node)
+        return found[0] if found else None
+
+    def find_all(self, node, selector):
+        return self._xpath(selector, 'descendant::')(node)
+
+    def find_parent(self, node, selector):
+        found = self._xpath(selector, 'ancestor::')(node)
+        return found[-1] if found else None
+
+    def contains(self, ancestor, node):
+        return any(parent == ancestor for parent in node.iterancestors())
+
+    def _join(self, strings, separator, strip):
+        if strip:
+            strings = [string.strip() for string in strings]
+            strings = [string for string in strings if string]
+        return separator.join(strings)
+
+    def text(self, node, separator='', strip=False):
+        return self._join(self._strings(node), separator, strip)
+
+    def text_after(self, node):
+        parts = []
+        for sibling in self._text_after(node):
+            if isinstance(sibling, str):
+                parts.append(sibling)
+            elif sibling.tag not in NON_TEXT_TAGS:
+                parts.append(self.text(sibling))
+        return ''.join(parts)
+
+    def text_before(self, container, stop):
+        return "\n".join(self._strings_before(container, stop=stop, root=container)).strip()
+
+    def html(self, node):
+        return self._html.tostring(node, encoding='unicode', with_tail=False)
+
+
+class SelectolaxBackend:
+    """selectolax on the lexbor engine; selectors become CSS selectors"""
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+        self._compiled = {}
+
+    def _css(self, selector):
+        if selector not in self._compiled:
+            classes = ''.join(f'.{name}' for name in (selector.classes or '').split())
+            self._compiled[selector] = f'{selector.tag or "*"}{classes}'
+        return self._compiled[selector]
+
+    def parse(self, html):
+        # The root node keeps its parser (and so the document) alive
+        return self._parser(html).root
+
+    def find(self, node, selector):
+        found = node.css_first(self._css(selector))
+        if found is not None and found == node:
+            # lexbor matches the node itself too; BeautifulSoup only searches below it
+            return next(iter(self.find_all(node, selector)), None)
+        return found
+
+    def find_all(self, node, selector):
+        return [found for found in node.css(self._css(selector)) if found != node]
+
+    def find_parent(self, node, selector):
+        css = self._css(selector)
+        parent = node.parent
+        while parent is not None and parent.tag != '-document':
+            if parent.css_matches(css):
+                return parent
+            parent = parent.parent
+        return None
+
+    def contains(self, ancestor, node):
+        parent = node.parent
+        while parent is not None:
+            if parent == ancestor:
+                return True
+            parent = parent.parent
+        return False
+
+    def _strings(self, node, stop=None):
+        skipped = None
+        for child in node.traverse(include_text=True):
+            if stop is not None and child == stop:
+                return
+            if child.tag in NON_TEXT_TAGS:
+                skipped = child
+            elif child.tag == '-text':
+                # Text directly inside a skipped element (the only place such text can be)
+                if skipped is not None and child.parent == skipped:
+                    continue
+                yield child.text_content
+
+    def text(self, node, separator='', strip=False):
+        strings = self._strings(node)
+        if strip:
+            strings = (string.strip() for string in strings)
+            strings = [string for string in strings if string]
+        return separator.join(strings)
+
+    def text_after(self, node):
+        parts = []
+        sibling = node.next
+        while sibling is not None:
+            if sibling.tag == '-text':
+                parts.append(sibling.text_content)
+            elif sibling.tag not in NON_TEXT_TAGS and sibling.tag != '-comment':
+                parts.append(self.text(sibling))
+            sibling = sibling.next
+        return ''.join(parts)
+
+    def text_before(self, container, stop):
+        return "\n".join(self._strings(container, stop)).strip()
+
+    def html(self, node):
+        return node.html
+
+
+BACKENDS = {
+    'bs4': SoupBackend,
+    'lxml': LxmlBackend,
+    'selectolax': SelectolaxBackend,
+}
+
+
+def get_backend(name=DEFAULT_BACKEND, **options):
+    """A backend by name ('bs4', 'lxml' or 'selectolax'); options go to its constructor"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend {name!r} (choose from {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name](**options)
@@ -0,0 +1,66 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Present as a regular desktop Chrome so we get the same server-rendered page the browser gets
+HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+_local = threading.local()
+
+
+def get_session(pool_size=8):
+    """Keep-alive requests.Session for the calling thread (connections are pooled per host)"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(HEADERS)
+        _local.session = session
+    return session
+
+
+def fetch_html(url, timeout=15, cache=None):
+    """GET a page over the pooled session and return its HTML, or None on failure.
+
+    With a PageCache the request goes through it, so unchanged pages are served from
+    the cache or revalidated with a conditional request.
+    """
+    if cache is not None:
+        return cache.fetch(url, timeout=timeout)
+    try:
+        response = get_session().get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {str(e)[:200]}")
+        return None
+
+
+def fetch_extract(url, extract, fallback=None, cache=None, timeout=15):
+    """Fast path for a server-rendered page: extract() run on its HTML fetched over HTTP.
+
+    extract returns None (or something empty) when the expected container is missing;
+    then, or when the fetch fails, the result of fallback() (typically the browser) is
+    returned instead, or None without a fallback.
+    """
+    page_html = fetch_html(url, timeout=timeout, cache=cache)
+    extracted = extract(page_html) if page_html else None
+    if not extracted and fallback is not None:
+        return fallback()
+    return extracted
+
+
+def add_fetch_argument(parser):
+    """Add the shared --fetch option (plain HTTP first, or always the browser)"""
+    parser.add_argument("--fetch", choices=["http", "browser"], default="http",
+                        help="'http' reads server-rendered pages directly and only opens a "
+                             "browser when the expected container is missing (default: %(default)s)")
+    return parser
@@ -0,0 +1,215 @@
+"""How long postings stay open: first seen, last seen, days open and reopenings, per source.
+
+    python ScrapeCommon/Lifecycle.py update [--sources kaiser dignity] [--rebuild]
+    python ScrapeCommon/Lifecycle.py report [--source dignity]
+
+A posting is open on every day it is in its source's link listing (kpjobs_*,
+DignityHospitals_*, ClaremontCollegesJobs_*, ucjobs_*). Postings are keyed per source
+on their job id (Dignity's job_id, Claremont's requisition_id, UC's Requisition, the
+id at the end of a Kaiser URL), or on the job URL where there is none.
+
+The state lives in SQLite (lifecycle.sqlite): one row per posting, and one row per
+source and scrape date already applied. `update` applies only scrape dates newer than
+the last one applied for the source, each with a single upsert of that day's keys,
+so adding a day costs time in proportion to that day's rows, never a rescan of
+history. A posting missing from at least one scrape and then listed again counts as
+reopened. Dates older than the last one applied (a late backfill) need --rebuild,
+which replays every day from scratch.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, Warehouse, WorkbookStream
+
+DB_PATH = SnapshotStore.PROJECT_ROOT / "lifecycle.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    source TEXT NOT NULL,
+    posting_key TEXT NOT NULL,
+    job_url TEXT,
+    job_id TEXT,
+    title TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    open_since TEXT NOT NULL,
+    days_seen INTEGER NOT NULL,
+    days_open INTEGER NOT NULL,
+    times_reopened INTEGER NOT NULL,
+    PRIMARY KEY (source, posting_key)
+);
+CREATE INDEX IF NOT EXISTS postings_last_seen ON postings (source, last_seen);
+CREATE TABLE IF NOT EXISTS days (
+    source TEXT NOT NULL,
+    scrape_date TEXT NOT NULL,
+    listed INTEGER NOT NULL,
+    new INTEGER NOT NULL,
+    continued INTEGER NOT NULL,
+    reopened INTEGER NOT NULL,
+    closed INTEGER NOT NULL,
+    PRIMARY KEY (source, scrape_date)
+);
+CREATE VIEW IF NOT EXISTS posting_status AS
+SELECT postings.*, postings.last_seen = latest.scrape_date AS is_open, postings.times_reopened > 0 AS reopened
+FROM postings JOIN (SELECT source, MAX(scrape_date) AS scrape_date FROM days GROUP BY source) AS latest USING (source);
+"""
+
+# A posting listed today: new, or seen before (reopened when it missed the previous scrape)
+UPSERT = """
+INSERT INTO postings (source, posting_key, job_url, job_id, title, first_seen, last_seen, open_since,
+                      days_seen, days_open, times_reopened)
+SELECT :source, posting_key, job_url, job_id, title, :today, :today, :today, 1, 1, 0 FROM today WHERE true
+ON CONFLICT (source, posting_key) DO UPDATE SET
+    job_url = coalesce(excluded.job_url, job_url),
+    job_id = coalesce(excluded.job_id, job_id),
+    title = coalesce(excluded.title, title),
+    open_since = CASE WHEN last_seen < :previous THEN :today ELSE open_since END,
+    times_reopened = times_reopened + (last_seen < :previous),
+    last_seen = :today,
+    days_seen = days_seen + 1,
+    days_open = CAST(julianday(:today) - julianday(first_seen) AS INTEGER) + 1
+"""
+
+
+def connect(db_path=DB_PATH):
+    """Open (creating if needed) the lifecycle state"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def listing_files(sources=None, project_root=SnapshotStore.PROJECT_ROOT):
+    """{(source, scrape date): [paths]} of the link listings, for the given sources"""
+    found = defaultdict(list)
+    for path, (source, kind, scrape_date) in SnapshotStore.legacy_files(project_root):
+        if kind == 'links' and (not sources or source in sources):
+            found[(source, scrape_date)].append(path)
+    return found
+
+
+def day_keys(source, paths, batch_size=0):
+    """The postings listed in a day's files: a DataFrame of posting_key, job_url, job_id, title.
+
+    Only the key columns are read, batch_size rows at a time (0: each file at once).
+    """
+    frames = []
+    for path in paths:
+        header = SnapshotStore.output_columns(path)
+        columns = [column for column in Warehouse.key_column_names(source) if column in header]
+        for df in SnapshotStore.iter_output(path, batch_size, columns=columns):
+            job_urls, job_ids, titles = Warehouse.key_columns(df, source)
+            frames.append(pd.DataFrame({'job_url': job_urls, 'job_id': job_ids, 'title': titles}, dtype=object))
+    keys = pd.concat(frames, ignore_index=True)
+    keys.insert(0, 'posting_key', keys['job_id'].where(keys['job_id'].notna(), keys['job_url']))
+    return keys[keys['posting_key'].notna()].drop_duplicates('posting_key')
+
+
+def apply_day(conn, source, scrape_date, keys):
+    """Apply one scrape date's listed postings; returns the day's counts"""
+    previous, previous_listed = conn.execute(
+        "SELECT scrape_date, listed FROM days WHERE source = ? ORDER BY scrape_date DESC LIMIT 1", (source,)
+    ).fetchone() or ('', 0)
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS temp.today")
+        conn.execute("CREATE TEMP TABLE today (posting_key TEXT PRIMARY KEY, job_url TEXT, job_id TEXT, title TEXT)")
+        conn.executemany("INSERT INTO today VALUES (?, ?, ?, ?)", keys.itertuples(index=False, name=None))
+        # Classify today's postings against their state before today (index lookups, one per row)
+        new, continued, reopened = conn.execute(
+            "SELECT SUM(p.posting_key IS NULL), SUM(p.last_seen = :previous), SUM(p.last_seen < :previous) "
+            "FROM today LEFT JOIN postings AS p ON p.source = :source AND p.posting_key = today.posting_key",
+            {'source': source, 'previous': previous}
+        ).fetchone()
+        new, continued, reopened = new or 0, continued or 0, reopened or 0
+        closed = previous_listed - continued
+        conn.execute(UPSERT, {'source': source, 'today': scrape_date, 'previous': previous})
+        conn.execute("INSERT INTO days VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (source, scrape_date, len(keys), new, continued, reopened, closed))
+        conn.execute("DROP TABLE temp.today")
+    return {'listed': len(keys), 'new': new, 'continued': continued, 'reopened': reopened, 'closed': closed}
+
+
+def update(conn, sources=None, project_root=SnapshotStore.PROJECT_ROOT, batch_size=0):
+    """Apply every scrape date not applied yet, oldest first; returns the number of dates applied"""
+    latest = dict(conn.execute("SELECT source, MAX(scrape_date) FROM days GROUP BY source"))
+    applied = 0
+    for (source, scrape_date), paths in sorted(listing_files(sources, project_root).items(), key=lambda item: item[0][1]):
+        if latest.get(source) and scrape_date <= latest[source]:
+            if not conn.execute("SELECT 1 FROM days WHERE source = ? AND scrape_date = ?", (source, scrape_date)).fetchone():
+                print(f"Skipping {source} {scrape_date}: older than the last date applied ({latest[source]}), "
+                      f"run with --rebuild to include it")
+            continue
+        started = time.perf_counter()
+        try:
+            keys = day_keys(source, paths, batch_size)
+        except Exception as e:
+            print(f"Failed: {source} {scrape_date}: {str(e)[:200]}")
+            continue
+        counts = apply_day(conn, source, scrape_date, keys)
+        latest[source] = scrape_date
+        applied += 1
+        print(f"{source} {scrape_date}: {counts['listed']} listed, {counts['new']} new, {counts['reopened']} reopened, "
+              f"{counts['closed']} closed since the previous scrape ({time.perf_counter() - started:.2f}s)")
+    return applied
+
+
+def report(conn, source=None):
+    """Per source: postings, open now, reopened, and days open of the postings that closed"""
+    where = "WHERE source = ?" if source else ""
+    params = (source,) if source else ()
+    summary = pd.read_sql_query(
+        f"SELECT source, COUNT(*) AS postings, SUM(is_open) AS open_now, SUM(reopened) AS reopened, "
+        f"AVG(CASE WHEN NOT is_open THEN days_open END) AS avg_days_open_closed, "
+        f"MAX(days_open) AS max_days_open FROM posting_status {where} GROUP BY source", conn, params=params)
+    churn = pd.read_sql_query(
+        f"SELECT source, scrape_date, listed, new, reopened, closed FROM days {where} "
+        f"ORDER BY source, scrape_date", conn, params=params)
+    return summary, churn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track when postings open, close and reopen")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Lifecycle state file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    update_parser = commands.add_parser("update", help="Apply the scrape dates not applied yet")
+    update_parser.add_argument("--sources", nargs="+", choices=sorted(Warehouse.KEY_COLUMNS), default=None)
+    update_parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                               help="Folder holding ScrapeLinks/ and ScrapeDescriptions/ (default: %(default)s)")
+    update_parser.add_argument("--rebuild", action="store_true", help="Forget the state and replay every date")
+    WorkbookStream.add_batch_argument(update_parser)
+    report_parser = commands.add_parser("report", help="Print posting lifetimes and daily churn")
+    report_parser.add_argument("--source", choices=sorted(Warehouse.KEY_COLUMNS), default=None)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    try:
+        if args.command == "update":
+            if args.rebuild:
+                with conn:
+                    for table in ("postings", "days"):
+                        if args.sources:
+                            conn.executemany(f"DELETE FROM {table} WHERE source = ?", [(s,) for s in args.sources])
+                        else:
+                            conn.execute(f"DELETE FROM {table}")
+            applied = update(conn, args.sources, args.project_root, args.batch_size)
+            print(f"\nApplied {applied} new scrape dates to {args.db}")
+        else:
+            summary, churn = report(conn, args.source)
+            with pd.option_context('display.max_rows', 200, 'display.width', 200):
+                print(summary.to_string(index=False))
+                print()
+                print(churn.to_string(index=False))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""One-shot conversion of the historical workbooks and CSVs into the Parquet snapshot dataset.
+
+    python ScrapeCommon/MigrateSnapshots.py [--dry-run] [--force]
+
+Walks ScrapeLinks/ and ScrapeDescriptions/, classifies every kpjobs_*, DignityHospitals_*,
+ClaremontCollegesJobs_* (and claremont_job_details) and ucjobs_* file, and writes it to
+Snapshots/{kind}/source=.../scrape_date=.../. Files whose snapshot is already newer than
+the original are skipped, so the migration can be re-run safely.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert historical scrape workbooks into the Parquet snapshot dataset")
+    parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                        help="Folder holding ScrapeLinks/ and ScrapeDescriptions/ (default: %(default)s)")
+    parser.add_argument("--dest", type=Path, default=SnapshotStore.SNAPSHOT_ROOT,
+                        help="Snapshot dataset root (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Only show how each file would be classified")
+    parser.add_argument("--force", action="store_true", help="Rewrite snapshots that are already up to date")
+    args = parser.parse_args()
+
+    converted = skipped = failed = 0
+    bytes_in = bytes_out = 0
+    for path, (source, kind, scrape_date) in SnapshotStore.legacy_files(args.project_root):
+        target = SnapshotStore.snapshot_path(source, kind, scrape_date, path.stem, args.dest)
+        label = f"{path.relative_to(args.project_root)} -> {target.relative_to(args.dest)}"
+        if args.dry_run:
+            print(label)
+            continue
+        if not args.force and target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+            skipped += 1
+            continue
+        try:
+            df = SnapshotStore.read_legacy(path)
+            SnapshotStore.write_snapshot(df, source, kind, scrape_date, path.stem, args.dest)
+        except Exception as e:
+            print(f"Failed: {label}: {str(e)[:200]}")
+            failed += 1
+            continue
+        converted += 1
+        bytes_in += path.stat().st_size
+        bytes_out += target.stat().st_size
+        print(f"{label} ({len(df)} rows)")
+
+    if not args.dry_run:
+        print(f"\nConverted {converted} files ({bytes_in / 1e6:.1f} MB -> {bytes_out / 1e6:.1f} MB), "
+              f"{skipped} already up to date, {failed} failed")
+
+
+if __name__ == '__main__':
+    main()
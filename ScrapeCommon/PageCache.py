@@ -0,0 +1,192 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import requests
+
+from ScrapeCommon.HttpFetch import get_session
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / "page_cache.sqlite"
+
+# How long a cached page is trusted without asking the server, per source (hours).
+# Kept under a day so each daily run revalidates with a cheap conditional request.
+SOURCE_TTL = {'kaiser': 12, 'dignity': 12, 'claremont': 20, 'uc': 12}
+DEFAULT_TTL = 12
+DEFAULT_MAX_MB = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    source TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    validated_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+"""
+
+# Outcomes counted by fetch(), in report order
+OUTCOMES = [
+    ('fresh', "served from cache within TTL"),
+    ('not_modified', "revalidated (304 Not Modified)"),
+    ('unchanged', "re-downloaded, same content hash"),
+    ('changed', "re-downloaded, content changed"),
+    ('miss', "not cached yet"),
+    ('error', "failed"),
+]
+
+
+def add_cache_arguments(parser):
+    """Add the shared --cache-ttl / --no-cache options to a detail scraper's argument parser"""
+    parser.add_argument("--cache-ttl", type=float, default=None, metavar="HOURS",
+                        help="Trust cached detail pages this long before revalidating (default: per source)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always download detail pages in full")
+    return parser
+
+
+class PageCache:
+    """SQLite-backed cache of detail pages, revalidated with conditional requests.
+
+    Each URL keeps its ETag, Last-Modified and a SHA-256 of the body. Within the TTL a
+    page is served without touching the network; after it, the request carries
+    If-None-Match / If-Modified-Since so unchanged pages come back as an empty 304
+    (and servers that ignore validators are still caught by the hash). The least
+    recently used pages are evicted once the cache grows past max_mb.
+    """
+
+    def __init__(self, path=CACHE_PATH, source=None, ttl_hours=None, max_mb=DEFAULT_MAX_MB):
+        self.source = source
+        if ttl_hours is None:
+            ttl_hours = SOURCE_TTL.get(source, DEFAULT_TTL)
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = max_mb * 1e6
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        self.stats = Counter()
+        self.bytes_saved = 0
+
+    @classmethod
+    def from_args(cls, args, source):
+        """Cache configured from --cache-ttl / --no-cache, or None when caching is off"""
+        if args.no_cache:
+            return None
+        return cls(source=source, ttl_hours=args.cache_ttl)
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, sha256, body, size, validated_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _count(self, outcome, saved=0):
+        with self._lock:
+            self.stats[outcome] += 1
+            self.bytes_saved += saved
+
+    def _touch(self, url, validated=False, etag=None, last_modified=None):
+        now = time.time()
+        with self._lock, self._conn:
+            if validated:
+                self._conn.execute(
+                    "UPDATE pages SET validated_at = ?, last_used = ?, etag = COALESCE(?, etag), "
+                    "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (now, now, etag, last_modified, url))
+            else:
+                self._conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (now, url))
+
+    def _store(self, url, text, sha256, etag, last_modified):
+        now = time.time()
+        body = zlib.compress(text.encode('utf-8'), 6)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, source, etag, last_modified, sha256, body, size, fetched_at, validated_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, self.source, etag, last_modified, sha256, body, len(body), now, now, now))
+
+    def fetch(self, url, headers=None, timeout=15):
+        """Text of a page, from the cache when it is fresh or still valid, else downloaded (None on failure)"""
+        entry = self._lookup(url)
+        if entry is not None:
+            etag, last_modified, cached_sha256, body, size, validated_at = entry
+            cached_text = zlib.decompress(body).decode('utf-8')
+            if time.time() - validated_at < self.ttl:
+                self._touch(url)
+                self._count('fresh', len(cached_text))
+                return cached_text
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+        try:
+            response = get_session().get(url, headers=request_headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                self._touch(url, validated=True, etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified'))
+                self._count('not_modified', len(cached_text))
+                return cached_text
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {str(e)[:200]}")
+            self._count('error')
+            return None
+
+        text = response.text
+        sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        if entry is None:
+            outcome = 'miss'
+        else:
+            outcome = 'unchanged' if sha256 == cached_sha256 else 'changed'
+        self._store(url, text, sha256, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self._count(outcome)
+        return text
+
+    def evict(self):
+        """Drop least recently used pages until the cache fits in max_mb; returns the number dropped"""
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            dropped = 0
+            for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                total -= size
+                dropped += 1
+        print(f"Page cache: evicted {dropped} least recently used pages")
+        return dropped
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
+
+    def report(self):
+        """Print hit, revalidation and miss rates for this run"""
+        with self._lock:
+            stats = Counter(self.stats)
+            saved = self.bytes_saved
+        total = sum(stats.values())
+        if not total:
+            return
+        print(f"\nPage cache ({self.source or 'all sources'}, TTL {self.ttl / 3600:g}h): {total} requests")
+        for outcome, label in OUTCOMES:
+            print(f"  {label:<34}{stats[outcome]:>7}  {stats[outcome] / total:>6.1%}")
+        print(f"  {'pages not re-downloaded':<34}{stats['fresh'] + stats['not_modified']:>7}  "
+              f"({saved / 1e6:.1f} MB)")
@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Installed once per document: counts in-flight fetch/XHR requests so a wait can
+# also require the network to go quiet, and keeps the armed mutation signals.
+INSTALL_JS = """
+if (!window.__pageReady) {
+    const ready = window.__pageReady = {signals: {}, inflight: 0, lastNetwork: performance.now()};
+    const settled = () => { ready.inflight--; ready.lastNetwork = performance.now(); };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            ready.inflight++;
+            return fetch.apply(this, arguments).finally(settled);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        ready.inflight++;
+        this.addEventListener('loadend', settled, {once: true});
+        return send.apply(this, arguments);
+    };
+}
+"""
+
+# Start watching for changes to elements matching `selector` (added, removed or
+# edited inside) and, when given, to the listed attributes anywhere in the page.
+ARM_JS = INSTALL_JS + """
+const [name, selector, attributes] = arguments;
+const ready = window.__pageReady;
+if (ready.signals[name]) ready.signals[name].observer.disconnect();
+const signal = {changes: 0, last: 0};
+const touches = node => node.nodeType === 1 && (node.matches(selector) || node.querySelector(selector));
+signal.observer = new MutationObserver(mutations => {
+    for (const m of mutations) {
+        const inside = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        if ((m.type === 'attributes' && attributes) ||
+                (inside && inside.closest(selector)) ||
+                [...m.addedNodes, ...m.removedNodes].some(touches)) {
+            signal.changes++;
+            signal.last = performance.now();
+        }
+    }
+});
+const options = {subtree: true, childList: true, characterData: true};
+if (attributes) {
+    options.attributes = true;
+    options.attributeFilter = attributes;
+}
+signal.observer.observe(document.documentElement, options);
+ready.signals[name] = signal;
+"""
+
+# Resolve as soon as the armed signal has fired and stayed quiet for `quiet` ms
+# (and the network is idle, if asked); 'missing' means the page navigated away.
+WAIT_JS = """
+const [name, quiet, timeout, network] = arguments;
+const done = arguments[arguments.length - 1];
+const ready = window.__pageReady;
+const signal = ready && ready.signals[name];
+if (!signal) { done('missing'); return; }
+const start = performance.now();
+const finish = state => { signal.observer.disconnect(); delete ready.signals[name]; done(state); };
+(function check() {
+    const now = performance.now();
+    const idle = !network || (ready.inflight <= 0 && now - ready.lastNetwork >= quiet);
+    if (signal.changes && now - signal.last >= quiet && idle) return finish('ready');
+    if (now - start >= timeout) return finish(signal.changes ? 'unsettled' : 'timeout');
+    setTimeout(check, 20);
+})();
+"""
+
+# Element has stopped moving (e.g. a smooth scrollIntoView has finished)
+LAYOUT_JS = """
+const [element, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+let previous = null, steady = 0;
+(function check() {
+    const rect = element.getBoundingClientRect();
+    const current = [rect.top, rect.left, rect.width, rect.height].join();
+    steady = current === previous ? steady + 1 : 0;
+    previous = current;
+    if (steady >= 3) return done('ready');
+    if (performance.now() - start >= timeout) return done('timeout');
+    setTimeout(check, 16);
+})();
+"""
+
+# Element has been removed or hidden (e.g. a banner or modal closing)
+HIDDEN_JS = """
+const [element, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+(function check() {
+    if (!element.isConnected || !element.getClientRects().length) return done('ready');
+    if (performance.now() - start >= timeout) return done('timeout');
+    setTimeout(check, 16);
+})();
+"""
+
+_lock = threading.Lock()
+_timings = defaultdict(list)  # wait name -> [(seconds waited, seconds the old fixed wait cost, state)]
+
+
+def _record(name, started, legacy, state):
+    waited = time.perf_counter() - started
+    with _lock:
+        _timings[name].append((waited, legacy, state))
+    return state == 'ready'
+
+
+def _run_async(driver, script, timeout, *args):
+    # Leave the script a little longer than its own timeout before WebDriver gives up
+    driver.set_script_timeout(timeout + 5)
+    try:
+        return driver.execute_async_script(script, *args)
+    except Exception as e:
+        print(f"Readiness check failed: {str(e)[:100]}")
+        return 'error'
+
+
+class Signal:
+    """An armed mutation signal; wait() blocks until the page has changed and settled"""
+
+    def __init__(self, driver, name, selector, attributes=None, quiet=0.15, timeout=10,
+                 network=False, legacy=0.0):
+        self.driver = driver
+        self.name = name
+        self.quiet = quiet
+        self.timeout = timeout
+        self.network = network
+        self.legacy = legacy
+        self.state = None
+        driver.execute_script(ARM_JS, name, selector, attributes)
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def wait(self):
+        if self.state is None:
+            started = time.perf_counter()
+            self.state = _run_async(self.driver, WAIT_JS, self.timeout,
+                                    self.name, self.quiet * 1000, self.timeout * 1000, self.network)
+            _record(self.name, started, self.legacy, self.state)
+        return self.ready
+
+
+@contextmanager
+def ready_after(driver, name, selector, attributes=None, quiet=0.15, timeout=10, network=False, legacy=0.0):
+    """Arm a change signal, run the action in the with-block, then wait for the page to settle.
+
+    The signal is armed before the action so a fast response can't be missed.
+    Afterwards `signal.ready` tells whether the page changed and went quiet for
+    `quiet` seconds (plus network idle when network=True) within `timeout`.
+    `legacy` is what the fixed sleep/poll this replaces used to cost, for report().
+    """
+    signal = Signal(driver, name, selector, attributes, quiet, timeout, network, legacy)
+    yield signal
+    signal.wait()
+
+
+def wait_for_layout(driver, element, name, timeout=3, legacy=0.0):
+    """Wait until an element stops moving, e.g. after a smooth scrollIntoView"""
+    started = time.perf_counter()
+    return _record(name, started, legacy, _run_async(driver, LAYOUT_JS, timeout, element, timeout * 1000))
+
+
+def wait_until_hidden(driver, element, name, timeout=3, legacy=0.0):
+    """Wait until an element is removed from the page or hidden, e.g. a closing banner"""
+    started = time.perf_counter()
+    return _record(name, started, legacy, _run_async(driver, HIDDEN_JS, timeout, element, timeout * 1000))
+
+
+def report():
+    """Print how long each kind of wait took compared with the fixed waits it replaced"""
+    with _lock:
+        timings = {name: list(entries) for name, entries in _timings.items()}
+    if not timings:
+        return
+    print("\nPage readiness waits:")
+    print(f"{'wait':<28}{'count':>7}{'waited s':>10}{'legacy s':>10}{'saved s':>10}{'not ready':>11}")
+    total_waited = total_legacy = 0.0
+    for name, entries in sorted(timings.items()):
+        waited = sum(entry[0] for entry in entries)
+        legacy = sum(entry[1] for entry in entries)
+        misses = sum(1 for entry in entries if entry[2] != 'ready')
+        total_waited += waited
+        total_legacy += legacy
+        print(f"{name:<28}{len(entries):>7}{waited:>10.1f}{legacy:>10.1f}{legacy - waited:>10.1f}{misses:>11}")
+    print(f"{'total':<28}{'':>7}{total_waited:>10.1f}{total_legacy:>10.1f}{total_legacy - total_waited:>10.1f}")
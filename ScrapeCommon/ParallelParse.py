@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+DEFAULT_CHUNK_SIZE = 250
+
+
+def add_parallel_arguments(parser):
+    """Add the shared --workers / --chunk-size options to a description parser's argument parser"""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse rows in this many processes, 0 for one per CPU (default: %(default)s, serial)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows handed to a worker process at a time (default: %(default)s)")
+    return parser
+
+
+def _run_chunk(function, extra, chunk):
+    return [function(*cells, *extra) for cells in chunk]
+
+
+def map_rows(function, rows, *extra, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """function(*cells, *extra) for every tuple of cells in rows, as a list in row order.
+
+    With more than one worker the rows are cut into chunks of chunk_size and parsed in
+    a process pool. Results are reassembled in row order whatever order the chunks
+    finish in, so the output is exactly what the serial run produces. function and
+    extra go to the workers by pickle: use module-level functions (the parser scripts
+    themselves can't be imported by a worker).
+    """
+    rows = list(rows)
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), max(chunk_size, 1))]
+    if workers <= 1 or len(chunks) <= 1:
+        return _run_chunk(function, extra, rows)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk_results in pool.map(partial(_run_chunk, function, extra), chunks):
+            results.extend(chunk_results)
+    return results
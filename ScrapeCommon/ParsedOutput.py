@@ -0,0 +1,56 @@
+import hashlib
+import re
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+
+from ScrapeCommon import PayCube, SnapshotStore
+
+# Shared code whose changes change what the parsers write: the extraction, how workbooks
+# and their archived HTML are read, and how the output is written
+SHARED_CODE = [
+    Path(__file__).resolve().parent / "DescriptionFields.py",
+    Path(__file__).resolve().parent / "HtmlParse.py",
+    Path(__file__).resolve().parent / "PayNormalize.py",
+    Path(__file__).resolve().parent / "HtmlArchive.py",
+    Path(__file__).resolve().parent / "WorkbookStream.py",
+    Path(__file__).resolve(),
+]
+VERSION_PREFIX = "parser-version:"
+KEYWORDS = re.compile(r'<cp:keywords>([^<]*)</cp:keywords>')
+
+
+def parser_version(parser_path, backend=None):
+    """Version of a parser: a hash of its code and the shared extraction code, plus the backend.
+
+    Any edit to the parser or to the SHARED_CODE modules gives a new version, so
+    outputs built before a parser fix are recognised as stale without bumping anything.
+    """
+    digest = hashlib.sha256()
+    for path in [Path(parser_path).resolve(), *SHARED_CODE]:
+        digest.update(path.read_bytes())
+    version = digest.hexdigest()[:12]
+    return f"{version}+{backend}" if backend else version
+
+
+def write_parsed(df, output_path, version):
+    """Write a parsed workbook stamped with the parser version (in its keywords), its snapshot and pay cube partition"""
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False)
+        writer.book.properties.keywords = VERSION_PREFIX + version
+    SnapshotStore.write_for_output(output_path, df)
+    PayCube.update_for_output(output_path, df)
+
+
+def read_version(path):
+    """Parser version a workbook was stamped with, or None (unstamped, missing or unreadable)"""
+    try:
+        with zipfile.ZipFile(path) as workbook:
+            core = workbook.read('docProps/core.xml').decode('utf-8')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    match = KEYWORDS.search(core)
+    if match and match.group(1).startswith(VERSION_PREFIX):
+        return match.group(1)[len(VERSION_PREFIX):]
+    return None
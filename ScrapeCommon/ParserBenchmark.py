@@ -0,0 +1,156 @@
+"""Compare the HtmlParse backends on the description workbooks already on disk.
+
+    python ScrapeCommon/ParserBenchmark.py [--sources dignity kaiser] [--days 3] [--rows 500]
+
+For each source, the newest description workbooks holding its HTML columns (UC's
+older HTML_1..HTML_20 chunks included) are run through the parser's extraction with
+every backend; workbooks without them are listed with the reason they were skipped. Reports rows per second, the
+speedup over BeautifulSoup, and how many rows each backend extracts exactly as
+BeautifulSoup does: `fields` compares the extracted values and text, `html`
+compares HTML the parser writes back out (which each library serializes its own way).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, HtmlArchive, HtmlParse
+from ScrapeCommon.DescriptionFields import kaiser_job_details, dignity_row, page_text
+
+
+def kaiser_fields(cells, backend):
+    return kaiser_job_details(cells[0], backend)
+
+
+def dignity_fields(cells, backend):
+    return dignity_row(*cells, backend)
+
+
+def uc_fields(cells, backend):
+    return {'text': page_text(cells[0], backend)}
+
+
+# Per source: the HTML columns a parser reads, and its extraction for one row of them
+TASKS = {
+    'kaiser': (['scraped_html'], kaiser_fields),
+    'dignity': (['section16_html', 'overview_html', 'job_details_html'], dignity_fields),
+    'uc': (['HTML'], uc_fields),
+}
+# BeautifulSoup options each parser uses (UC pages are read with lxml's parser)
+SOUP_OPTIONS = {'uc': {'features': 'lxml'}}
+# UC workbooks from before the archive kept each page in 30,000-character chunks
+UC_CHUNK_COLUMNS = [f"HTML_{i}" for i in range(1, 21)]
+# Columns only a parser writes, to tell a parsed output filed as a description workbook
+PARSED_COLUMNS = {'kaiser': ['job_number', 'pay_range', 'hourlypay_low']}
+
+
+def html_column(df, column):
+    """A workbook's HTML column with archive references resolved; UC workbooks from before the
+    archive split each page over HTML_1..HTML_20, which are joined back together"""
+    if column == 'HTML' and column not in df.columns:
+        chunks = [chunk for chunk in UC_CHUNK_COLUMNS if chunk in df.columns]
+        return df[chunks].astype(object).where(df[chunks].notna(), '').astype(str).agg(''.join, axis=1)
+    return HtmlArchive.resolve_column(df[column]).fillna('')
+
+
+def has_columns(df, columns):
+    return all(column in df.columns or (column == 'HTML' and 'HTML_1' in df.columns) for column in columns)
+
+
+def load_rows(source, columns, days=1, limit=None, project_root=SnapshotStore.PROJECT_ROOT):
+    """HTML cells of the newest `days` description workbooks that have every column.
+
+    Returns (rows, names of the workbooks read, [(workbook, why it was skipped)]).
+    """
+    rows, names, skipped = [], [], []
+    files = [(path, info) for path, info in SnapshotStore.legacy_files(project_root)
+             if info[0] == source and info[1] == 'descriptions']
+    for path, _ in reversed(files):
+        if len(names) >= days or (limit and len(rows) >= limit):
+            break
+        df = SnapshotStore.read_output(path)
+        if not has_columns(df, columns):
+            parsed = [column for column in PARSED_COLUMNS.get(source, []) if column in df.columns]
+            skipped.append((path.name, f"no {', '.join(columns)} column" +
+                            (f" (it holds parsed fields: {', '.join(parsed)})" if parsed else "")))
+            continue
+        try:
+            cells = [html_column(df, column) for column in columns]
+        except KeyError as e:
+            skipped.append((path.name, str(e).strip('"')))
+            continue
+        rows.extend(zip(*cells))
+        names.append(path.name)
+    return rows[:limit] if limit else rows, names, skipped
+
+
+def run(rows, extract, backend):
+    """(seconds, results) for extracting every row with one backend"""
+    start = time.perf_counter()
+    results = [extract(cells, backend) for cells in rows]
+    return time.perf_counter() - start, results
+
+
+def agreement(results, reference, html):
+    """Share of rows whose fields (html=False) or written-out HTML (html=True) match the reference"""
+    def pick(result):
+        return {key: value for key, value in result.items() if key.endswith('_html') == html}
+    matches = sum(pick(result) == pick(expected) for result, expected in zip(results, reference))
+    return matches / len(reference) if reference else float('nan')
+
+
+def benchmark(source, backends, days=1, limit=None, project_root=SnapshotStore.PROJECT_ROOT):
+    """Timing and agreement table for one source, or None when it has no usable workbooks"""
+    columns, extract = TASKS[source]
+    rows, names, skipped = load_rows(source, columns, days, limit, project_root)
+    for name, reason in skipped:
+        print(f"{source}: skipped {name}: {reason}")
+    if not rows:
+        found = f"none of its {len(skipped)} description workbooks has" if skipped else "no description workbooks, so none with"
+        print(f"\n{source}: {found} {', '.join(columns)}")
+        return None
+    print(f"\n{source}: {len(rows)} rows from {', '.join(names)}")
+
+    reference = None
+    table = []
+    # BeautifulSoup first: it is the reference the others are compared with
+    for name in ['bs4'] + [name for name in backends if name != 'bs4']:
+        options = SOUP_OPTIONS.get(source, {}) if name == 'bs4' else {}
+        seconds, results = run(rows, extract, HtmlParse.get_backend(name, **options))
+        if reference is None:
+            reference, baseline = results, seconds
+        if name not in backends:
+            continue
+        table.append({
+            'backend': name,
+            'seconds': round(seconds, 2),
+            'rows/s': round(len(rows) / seconds),
+            'speedup': round(baseline / seconds, 1),
+            'fields': f"{agreement(results, reference, html=False):.1%}",
+            'html': f"{agreement(results, reference, html=True):.1%}" if source == 'dignity' else '',
+        })
+    return pd.DataFrame(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML parsing backends on existing description workbooks")
+    parser.add_argument("--sources", nargs="+", choices=sorted(TASKS), default=sorted(TASKS))
+    parser.add_argument("--backends", nargs="+", choices=sorted(HtmlParse.BACKENDS), default=sorted(HtmlParse.BACKENDS))
+    parser.add_argument("--days", type=int, default=1, help="Workbooks per source, newest first (default: %(default)s)")
+    parser.add_argument("--rows", type=int, default=None, help="Stop after this many rows per source")
+    parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                        help="Folder holding ScrapeDescriptions/ (default: %(default)s)")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        table = benchmark(source, args.backends, args.days, args.rows, args.project_root)
+        if table is not None:
+            print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
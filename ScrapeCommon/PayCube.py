@@ -0,0 +1,249 @@
+"""Pre-aggregated hourly pay by source, day, normalized title and location.
+
+    python ScrapeCommon/PayCube.py update [--sources kaiser dignity] [--rebuild]
+    python ScrapeCommon/PayCube.py trend --title RN [--source kaiser] [--days 90] [--freq W] [--quantiles 0.5 0.9]
+
+Every parsed output (Kaiser's hourlypay_low/high, Dignity's pay_low/high, Claremont's
+salary, or the hourly_min/max all of them write now) is reduced to cells of
+source x scrape date x title x location x measure (the low, high and mid of each
+posting's hourly range). A cell is a percentile sketch: its values are counted in
+logarithmic buckets one RELATIVE_ACCURACY apart, and each bucket keeps the count,
+min, max and sum of its values. Sketches merge by adding buckets up, so any roll-up
+(a week, every location, all sources) is a groupby over the cube; counts, min, max
+and means are exact, percentiles are within RELATIVE_ACCURACY.
+
+The cube is stored next to the snapshots (Snapshots/pay_cube/source=.../scrape_date=.../),
+one partition per parsed output, written as each day is parsed (ParsedOutput calls
+update_for_output) and by `update` for outputs whose partition is missing or older
+than the output. Trend queries read only the cube, never the workbooks.
+"""
+import argparse
+import math
+import re
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, WorkbookStream
+from ScrapeCommon.PayNormalize import normalize_pay
+
+KIND = 'pay_cube'
+RELATIVE_ACCURACY = 0.01
+# Bucket i holds values in (GAMMA ** (i - 1), GAMMA ** i]
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+DIMENSIONS = ['title', 'location', 'measure']
+MEASURES = ['low', 'high', 'mid']
+
+# Per source: the parsed title and location columns, and its hourly low/high columns before hourly_min/max
+SOURCE_COLUMNS = {
+    'kaiser': ('Title', 'Location', ('hourlypay_low', 'hourlypay_high')),
+    'dignity': ('title', 'location', ('pay_low', 'pay_high')),
+    'claremont': ('title', 'location', None),
+}
+
+# Abbreviations spelled out in titles, so "RN II" and "Registered Nurse" land together
+TITLE_WORDS = {
+    'rn': 'registered nurse', 'lvn': 'licensed vocational nurse', 'np': 'nurse practitioner',
+    'cna': 'certified nursing assistant', 'ma': 'medical assistant', 'sr': 'senior', 'jr': 'junior',
+    'mgr': 'manager', 'asst': 'assistant', 'assoc': 'associate', 'tech': 'technician', 'spec': 'specialist',
+}
+TITLE_WORD = re.compile(r'\b(%s)\b' % '|'.join(TITLE_WORDS))
+
+
+def normalize_title(titles):
+    """Lowercase titles without punctuation, with common abbreviations spelled out"""
+    titles = (titles.astype('string').str.lower()
+              .str.replace(r'[^a-z0-9+#]+', ' ', regex=True).str.strip())
+    return titles.str.replace(TITLE_WORD, lambda match: TITLE_WORDS[match.group(1)], regex=True).fillna('')
+
+
+def normalize_location(locations):
+    """Locations with collapsed whitespace; Kaiser's ", California" written as ", CA" like the others"""
+    locations = locations.astype('string').str.replace(r'\s+', ' ', regex=True).str.strip()
+    return locations.str.replace(r',\s*California$', ', CA', regex=True).fillna('')
+
+
+def hourly_pay(df, source):
+    """(low, high) hourly pay of each parsed row"""
+    if 'hourly_min' in df.columns:
+        return pd.to_numeric(df['hourly_min'], errors='coerce'), pd.to_numeric(df['hourly_max'], errors='coerce')
+    columns = SOURCE_COLUMNS[source][2]
+    if columns is None:
+        pay = normalize_pay(df['salary'].where(df['salary'] != 'NoneFound'))
+        return pay['hourly_min'], pay['hourly_max']
+    return pd.to_numeric(df[columns[0]], errors='coerce'), pd.to_numeric(df[columns[1]], errors='coerce')
+
+
+def cells(df, source):
+    """The cube cells of one parsed output: one row per title x location x measure x bucket"""
+    title_column, location_column, _ = SOURCE_COLUMNS[source]
+    low, high = hourly_pay(df, source)
+    base = pd.DataFrame({
+        'title': normalize_title(df[title_column]) if title_column in df.columns else '',
+        'location': normalize_location(df[location_column]) if location_column in df.columns else '',
+    }, index=df.index)
+    values = pd.concat([base.assign(measure=measure, value=value.astype(float)) for measure, value in
+                        zip(MEASURES, [low, high, (low + high) / 2])], ignore_index=True)
+    values = values[values['value'] > 0]
+    values['bucket'] = np.ceil(np.log(values['value']) / LOG_GAMMA).astype('int32')
+    return (values.groupby(DIMENSIONS + ['bucket'], sort=False)['value']
+            .agg(count='size', min='min', max='max', sum='sum').reset_index())
+
+
+def merge(frames):
+    """Add up cube cells of the same title x location x measure x bucket (say, from batches of one file)"""
+    cube = pd.concat(frames, ignore_index=True)
+    return (cube.groupby(DIMENSIONS + ['bucket'], sort=False)
+            .agg(count=('count', 'sum'), min=('min', 'min'), max=('max', 'max'), sum=('sum', 'sum'))
+            .reset_index())
+
+
+def pay_columns(source, header):
+    """The columns of a parsed output that cells() reads, among those it has"""
+    title_column, location_column, columns = SOURCE_COLUMNS[source]
+    if 'hourly_min' in header:
+        columns = ('hourly_min', 'hourly_max')
+    elif columns is None:
+        columns = ('salary',)
+    return [column for column in (title_column, location_column, *columns) if column in header]
+
+
+def read_cells(path, source, batch_size=0, root=SnapshotStore.SNAPSHOT_ROOT):
+    """The cube cells of a parsed output file, reading only its title, location and pay columns,
+    batch_size rows at a time (0: at once); returns (cells, rows read)"""
+    columns = pay_columns(source, SnapshotStore.output_columns(path, root))
+    frames, rows = [], 0
+    for df in SnapshotStore.iter_output(path, batch_size, root, columns=columns):
+        frames.append(cells(df, source))
+        rows += len(df)
+    return (frames[0] if len(frames) == 1 else merge(frames)), rows
+
+
+def update_for_output(output_path, df, root=SnapshotStore.SNAPSHOT_ROOT):
+    """Write the cube partition of a parsed output just written; reported, never raised, like its snapshot"""
+    info = SnapshotStore.classify_snapshot_file(output_path)
+    if info is None or info[1] != 'parsed' or info[0] not in SOURCE_COLUMNS:
+        return None
+    source, _, scrape_date = info
+    try:
+        return SnapshotStore.write_snapshot(cells(df, source), source, KIND, scrape_date, Path(output_path).stem, root)
+    except Exception as e:
+        print(f"Could not update the pay cube for {output_path}: {str(e)[:200]}")
+        return None
+
+
+def update(sources=None, rebuild=False, project_root=SnapshotStore.PROJECT_ROOT, root=SnapshotStore.SNAPSHOT_ROOT,
+           batch_size=0):
+    """Write the partition of every parsed output that has none or an older one; returns how many were written"""
+    written = 0
+    for path, (source, kind, scrape_date) in SnapshotStore.legacy_files(project_root):
+        if kind != 'parsed' or source not in SOURCE_COLUMNS or (sources and source not in sources):
+            continue
+        partition = SnapshotStore.snapshot_path(source, KIND, scrape_date, path.stem, root)
+        if not rebuild and partition.exists() and partition.stat().st_mtime >= path.stat().st_mtime:
+            continue
+        started = time.perf_counter()
+        try:
+            output_cells, rows = read_cells(path, source, batch_size, root)
+            SnapshotStore.write_snapshot(output_cells, source, KIND, scrape_date, path.stem, root)
+        except Exception as e:
+            print(f"Failed: {path.name}: {str(e)[:200]}")
+            continue
+        written += 1
+        print(f"{source} {scrape_date}: {path.name} ({rows} rows, {time.perf_counter() - started:.1f}s)")
+    return written
+
+
+def load(sources=None, start=None, end=None, root=SnapshotStore.SNAPSHOT_ROOT):
+    """The cube cells within [start, end] for the sources"""
+    return SnapshotStore.load_snapshots(KIND, sources, start, end, root=root)
+
+
+def _quantile(buckets, by, q):
+    """Estimate the q-quantile of each group from its merged buckets (sorted by bucket within the group)"""
+    cumulative = buckets.groupby(by, sort=False)['count'].cumsum()
+    total = buckets.groupby(by, sort=False)['count'].transform('sum')
+    rank = q * (total - 1)
+    below = cumulative - buckets['count']
+    # The bucket holding the rank; interpolate between its min and max
+    holding = buckets[(cumulative > rank) & (below <= rank)]
+    position = (rank[holding.index] - below[holding.index]) / (holding['count'] - 1).clip(lower=1)
+    estimate = holding['min'] + (holding['max'] - holding['min']) * position.clip(upper=1)
+    return estimate.groupby([holding[column] for column in by]).first()
+
+
+def trend(cube, freq='W', measure='mid', quantiles=(0.5,), by=()):
+    """Count, min, max, mean and quantiles of hourly pay per period (and per `by` columns)"""
+    cube = cube[cube['measure'] == measure]
+    period = pd.to_datetime(cube['scrape_date']).dt.to_period(freq).dt.start_time.rename('period')
+    keys = ['period', *by]
+    buckets = (cube.assign(period=period)
+               .groupby(keys + ['bucket'], sort=True)
+               .agg(count=('count', 'sum'), min=('min', 'min'), max=('max', 'max'), sum=('sum', 'sum'))
+               .reset_index())
+    grouped = buckets.groupby(keys, sort=True)
+    result = pd.DataFrame({
+        'count': grouped['count'].sum(),
+        'min': grouped['min'].min(),
+        'max': grouped['max'].max(),
+    })
+    result['mean'] = (grouped['sum'].sum() / result['count']).round(2)
+    for q in quantiles:
+        result[f'p{q * 100:g}'] = _quantile(buckets, keys, q).round(2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-aggregated hourly pay by source, day, title and location")
+    commands = parser.add_subparsers(dest="command", required=True)
+    update_parser = commands.add_parser("update", help="Add the parsed outputs not in the cube yet")
+    update_parser.add_argument("--sources", nargs="+", choices=sorted(SOURCE_COLUMNS), default=None)
+    update_parser.add_argument("--rebuild", action="store_true", help="Rewrite every partition")
+    WorkbookStream.add_batch_argument(update_parser)
+    update_parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                               help="Folder holding ScrapeLinks/ and ScrapeDescriptions/ (default: %(default)s)")
+    trend_parser = commands.add_parser("trend", help="Print pay per period from the cube")
+    trend_parser.add_argument("--source", nargs="+", choices=sorted(SOURCE_COLUMNS), default=None)
+    trend_parser.add_argument("--title", default=None, help="Words the normalized title contains (e.g. RN)")
+    trend_parser.add_argument("--location", default=None, help="Text the location contains (e.g. Oakland)")
+    trend_parser.add_argument("--days", type=int, default=90, help="Days back from the latest scrape (default: %(default)s)")
+    trend_parser.add_argument("--freq", default="W", help="Period: D, W or M (default: %(default)s)")
+    trend_parser.add_argument("--measure", choices=MEASURES, default="mid",
+                              help="Low, high or middle of each posted range (default: %(default)s)")
+    trend_parser.add_argument("--quantiles", nargs="+", type=float, default=[0.5])
+    trend_parser.add_argument("--by-source", action="store_true", help="One row per source and period")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        written = update(args.sources, args.rebuild, args.project_root, batch_size=args.batch_size)
+        print(f"\nPay cube: {written} partitions written")
+        return
+
+    started = time.perf_counter()
+    cube = load(args.source)
+    if cube.empty:
+        print("The pay cube is empty; run the update command first")
+        return
+    end = date.fromisoformat(cube['scrape_date'].max())
+    cube = cube[cube['scrape_date'] >= (end - timedelta(days=args.days)).isoformat()]
+    if args.title:
+        words = normalize_title(pd.Series([args.title])).iloc[0]
+        cube = cube[cube['title'].str.contains(rf'\b{re.escape(words)}\b', regex=True)]
+    if args.location:
+        cube = cube[cube['location'].str.contains(args.location, case=False, regex=False)]
+    result = trend(cube, args.freq, args.measure, args.quantiles, by=['source'] if args.by_source else [])
+    with pd.option_context('display.max_rows', 200, 'display.width', 200):
+        print(result.to_string())
+    print(f"\n({time.perf_counter() - started:.2f}s from {len(cube)} cube rows)")
+
+
+if __name__ == '__main__':
+    main()
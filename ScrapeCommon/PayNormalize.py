@@ -0,0 +1,226 @@
+"""One pay parser for every source, run over whole columns at once.
+
+    python ScrapeCommon/PayNormalize.py [--sources kaiser uc] [--start 2025-03-01] [--output pay.parquet]
+
+normalize_pay() takes a column of pay text (Kaiser's pay_range, Dignity's posted pay
+range, whole Claremont/UC descriptions) and returns, per row:
+
+    pay_min, pay_max          the amounts as posted
+    pay_period                hour, week, month or year
+    hourly_min, hourly_max    normalized to an hourly rate (2080 hours a year)
+    annual_min, annual_max    normalized to a yearly salary
+    pay_confidence            high: the period is stated and fits the amount
+                              medium: the period is inferred from the amount, next to pay wording
+                              low: a stated period contradicts the amount (the amount wins
+                                   when it implies another), or a bare amount with nothing
+                                   saying it is pay
+    pay_text                  the text the figures came from
+
+Every amount in a cell is found in one pass of a single compiled pattern; when a cell
+mentions several, the most confident one (then the first range) is kept. Budgets
+("$20 million", "$6 billion+") are not pay. Running it over the Parquet snapshots
+(the command above) re-derives pay for every source and day in one go.
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore
+
+HOURS_PER_YEAR = 2080
+HOURS_PER = {'hour': 1, 'week': 40, 'month': HOURS_PER_YEAR / 12, 'year': HOURS_PER_YEAR}
+
+# Amounts that are plausible for each period (upper bound exclusive)
+PLAUSIBLE = {'hour': (5, 500), 'week': (200, 5000), 'month': (1000, 40000), 'year': (15000, 2000000)}
+# Period assumed for an amount when none is stated: below 250 hourly, from 1,000 monthly, from 20,000 yearly
+INFERRED = [(5, 250, 'hour'), (1000, 20000, 'month'), (20000, 2000000, 'year')]
+
+AMOUNT = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+# An amount (or range) with its period, matched at a '$'
+PAY_PATTERN = re.compile(rf"""
+    \A(?P<text>
+        \$\s?(?P<low>{AMOUNT})\s?(?P<low_k>k\b)?
+        (?!\s?(?:million|billion|mil|[mb])\b|\+)(?![.,]?\d)
+        (?:\s*(?:-|–|—|to|and)\s*\$?\s?(?P<high>{AMOUNT})\s?(?P<high_k>k\b)?(?![.,]?\d))?
+        (?:\s*\(?\s*(?:/|per|an?|each)?\s*(?P<period>hourly|hour|hr|weekly|week|wk|monthly|month|mo|yearly|year|yr|annum|annually|annualized|annual)\b\)?)?
+    )
+""", re.IGNORECASE | re.VERBOSE)
+# Pay wording shortly before the '$' (same line): "Hourly rate: $16.50", "Salary range: $90,000"
+LABEL_PATTERN = re.compile(r'(?P<label>hourly|per hour|monthly|annual(?:ly|ized)?|salary|wages?|pay|compensation)\b[^\n]{0,60}\Z',
+                           re.IGNORECASE)
+# Text after a '$' that a range can reach into ("$70,000 - $76,500")
+RANGE_REACH = 40
+
+PERIOD_WORDS = {
+    'hourly': 'hour', 'hour': 'hour', 'hr': 'hour', 'per hour': 'hour',
+    'weekly': 'week', 'week': 'week', 'wk': 'week',
+    'monthly': 'month', 'month': 'month', 'mo': 'month',
+    'yearly': 'year', 'year': 'year', 'yr': 'year', 'annum': 'year',
+    'annually': 'year', 'annualized': 'year', 'annual': 'year',
+}
+CONFIDENCE = ['low', 'medium', 'high']
+
+PAY_COLUMNS = ['pay_min', 'pay_max', 'pay_period', 'hourly_min', 'hourly_max',
+               'annual_min', 'annual_max', 'pay_confidence', 'pay_text']
+
+
+def _amount(values, thousands):
+    amounts = pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce')
+    return amounts.where(thousands.isna(), amounts * 1000)
+
+
+def _period_for(amounts):
+    """Period implied by the size of an amount (NaN when it fits none)"""
+    conditions = [(amounts >= low) & (amounts < high) for low, high, _ in INFERRED]
+    return pd.Series(np.select(conditions, [period for _, _, period in INFERRED], default=None),
+                     index=amounts.index, dtype=object)
+
+
+def _plausible(low, high, periods):
+    """Whether both ends of each range are plausible amounts for its period"""
+    fits = pd.Series(False, index=low.index)
+    for period, (bottom, top) in PLAUSIBLE.items():
+        fits |= (periods == period) & (low >= bottom) & (high < top)
+    return fits
+
+
+def _pieces(values):
+    """The text between each '$' of every cell, indexed by (row, piece)"""
+    exploded = values.str.split('$', regex=False).explode()
+    index = pd.MultiIndex.from_arrays([exploded.index, exploded.groupby(level=0).cumcount()], names=[None, 'match'])
+    return pd.Series(exploded.to_numpy(), index=index, dtype='string')
+
+
+def _matches(values):
+    """Every pay amount in the column, scored: one row per match, indexed by (row, match).
+
+    Cells are split at each '$', and the pattern is matched at the start of every
+    piece (plus the head of the next one, for the other end of a range). Anchored
+    matches are what keeps this fast on whole descriptions; the pay wording that
+    precedes an amount is read from the end of the piece before it.
+    """
+    pieces = _pieces(values)
+    before = pieces.groupby(level=0).shift(1)
+    after = pieces.groupby(level=0).shift(-1)
+    # Every piece but a cell's first follows a '$'
+    follows = before.notna()
+    pieces, before, after = pieces[follows], before[follows], after[follows]
+
+    found = ('$' + pieces + ('$' + after.str[:RANGE_REACH]).fillna('')).str.extract(PAY_PATTERN)
+    # A range that reached into the next piece has used up that piece's amount
+    reached = (found['text'].str.len() > pieces.str.len() + 1).fillna(False)
+    used = reached.groupby(level=0).shift(1, fill_value=False).astype(bool)
+    found = found[found['low'].notna() & ~used]
+    if found.empty:
+        return found
+    found['label'] = before[found.index].str[-80:].str.extract(LABEL_PATTERN)['label']
+
+    low = _amount(found['low'], found['low_k'])
+    high = _amount(found['high'], found['high_k'])
+    high = high.where(high.notna(), low)
+    stated = found['period'].str.lower().map(PERIOD_WORDS)
+    labelled = found['label'].str.lower().map(PERIOD_WORDS)
+    stated = stated.where(stated.notna(), labelled)
+
+    # Infer the period from the top of the range (an hourly range never reaches 250)
+    bottom = pd.concat([low, high], axis=1).min(axis=1)
+    top = pd.concat([low, high], axis=1).max(axis=1)
+    inferred = _period_for(top)
+    fits = _plausible(bottom, top, stated)
+    has_context = found['label'].notna() | found['period'].notna()
+
+    # A stated period that fits wins; else the inferred one; else the stated one after all
+    period = stated.where(fits, inferred)
+    period = period.where(period.notna(), stated)
+    confidence = np.select(
+        [stated.notna() & fits, stated.isna() & has_context, period.notna()],
+        ['high', 'medium', 'low'], default=None)
+    confidence = pd.Series(confidence, index=found.index, dtype=object)
+    # A range running backwards is suspect whatever its wording
+    confidence = confidence.where((high >= low) | confidence.isna(), 'low')
+
+    matches = pd.DataFrame({
+        'pay_min': low, 'pay_max': high, 'pay_period': period,
+        'pay_confidence': confidence, 'pay_text': found['text'].str.strip(),
+    })
+    matches = matches[matches['pay_period'].notna()]
+    rank = matches['pay_confidence'].map(CONFIDENCE.index) * 2 + (matches['pay_max'] > matches['pay_min'])
+    return matches.assign(_rank=rank)
+
+
+def normalize_pay(values):
+    """Pay figures for a column of text, as a DataFrame of PAY_COLUMNS with the column's index"""
+    # Work on positions, so any index (even one with duplicates) comes back as it was
+    text = values.reset_index(drop=True).astype('string')
+    # Only cells mentioning a dollar amount go through the pattern
+    text = text[text.str.contains('$', regex=False, na=False)]
+    result = pd.DataFrame(index=pd.RangeIndex(len(values)), columns=PAY_COLUMNS).astype(
+        {'pay_min': float, 'pay_max': float, 'hourly_min': float, 'hourly_max': float,
+         'annual_min': float, 'annual_max': float})
+    matches = _matches(text) if not text.empty else pd.DataFrame()
+    if matches.empty:
+        return result.set_axis(values.index)
+    # The best match of each row: highest rank, first in the text on ties
+    best = (matches.sort_values('_rank', ascending=False, kind='stable')
+            .groupby(level=0, sort=False).head(1)
+            .droplevel('match'))
+
+    hours = best['pay_period'].map(HOURS_PER).astype(float)
+    best = best.assign(
+        hourly_min=(best['pay_min'] / hours).round(2),
+        hourly_max=(best['pay_max'] / hours).round(2),
+        annual_min=(best['pay_min'] / hours * HOURS_PER_YEAR).round(2),
+        annual_max=(best['pay_max'] / hours * HOURS_PER_YEAR).round(2),
+    )
+    for column in PAY_COLUMNS:
+        result.loc[best.index, column] = best[column]
+    return result.set_axis(values.index)
+
+
+# Per source: the snapshot kind and column holding its pay text, and its job URL column
+SOURCE_TEXT = {
+    'kaiser': ('parsed', 'pay_range', 'URL'),
+    'dignity': ('descriptions', 'job-info posted-pay-range', 'url'),
+    'claremont': ('descriptions', 'description', 'url'),
+    'uc': ('links', 'Description', 'Job Link'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize pay across the Parquet snapshots of every source")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCE_TEXT), default=sorted(SOURCE_TEXT))
+    parser.add_argument("--start", default=None, help="First scrape date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Last scrape date (YYYY-MM-DD)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the normalized rows to this Parquet file")
+    args = parser.parse_args()
+
+    frames = []
+    for source in args.sources:
+        kind, column, url = SOURCE_TEXT[source]
+        df = SnapshotStore.load_snapshots(kind, [source], args.start, args.end, columns=[url, column])
+        if df.empty:
+            print(f"{source}: no {kind} snapshots")
+            continue
+        started = time.perf_counter()
+        pay = normalize_pay(df[column])
+        seconds = time.perf_counter() - started
+        confidence = pay['pay_confidence'].value_counts()
+        print(f"{source}: {len(df)} rows in {seconds:.2f}s, pay found for {pay['pay_period'].notna().sum()} "
+              f"({', '.join(f'{confidence.get(level, 0)} {level}' for level in reversed(CONFIDENCE))})")
+        frames.append(pd.concat([df[['source', 'scrape_date']], df[url].rename('job_url'), pay], axis=1))
+
+    if args.output and frames:
+        combined = pd.concat(frames, ignore_index=True)
+        combined.to_parquet(args.output, index=False)
+        print(f"Normalized pay written to {args.output} ({len(combined)} rows)")
+
+
+if __name__ == '__main__':
+    main()
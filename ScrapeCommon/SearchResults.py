@@ -0,0 +1,178 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from ScrapeCommon.HttpFetch import fetch_html, get_session
+
+# Kaiser and CommonSpirit (Dignity) run on the same search platform. Its search
+# page loads every results page from this endpoint as a JSON-wrapped HTML
+# fragment, so we can request any page number directly instead of clicking.
+RESULTS_PATH = "/search-jobs/results"
+RECORDS_PER_PAGE = 100  # Ask for the largest page; the server reports what it actually used
+CALIFORNIA = {'ID': '5332921', 'FacetType': '3', 'Display': 'California'}  # GeoNames id of the state
+AJAX_HEADERS = {'Accept': 'application/json, text/javascript, */*; q=0.01', 'X-Requested-With': 'XMLHttpRequest'}
+RETRIES = 3  # Attempts per results page before it is reported as failed
+BACKOFF = 2.0  # Seconds before the second attempt, doubled after every further failure
+
+
+def text_of(element):
+    """Whitespace-collapsed text, matching what WebDriver's .text returns"""
+    return " ".join(element.get_text().split()) if element else "N/A"
+
+
+def find_region_facet(search_url, region="California"):
+    """Read the region filter checkbox for `region` off the search page"""
+    html = fetch_html(search_url)
+    soup = BeautifulSoup(html or "", 'html.parser')
+    for checkbox in soup.select("input[id^='region-filter-']"):
+        label = soup.select_one(f"label[for='{checkbox['id']}']")
+        display = checkbox.get('data-display') or text_of(label)
+        if region.lower() in display.lower():
+            return {
+                'ID': checkbox.get('data-id'),
+                'FacetType': checkbox.get('data-facet-type', CALIFORNIA['FacetType']),
+                'Count': checkbox.get('data-count', ''),
+                'Display': region,
+            }
+    print(f"No '{region}' region filter found on {search_url}; using the built-in facet")
+    return dict(CALIFORNIA)
+
+
+def results_params(page, facet, records_per_page):
+    """Query string the search page sends for one page of filtered results"""
+    return {
+        'ActiveFacetID': facet['ID'],
+        'CurrentPage': page,
+        'RecordsPerPage': records_per_page,
+        'Distance': 50,
+        'RadiusUnitType': 0,
+        'Keywords': '',
+        'Location': '',
+        'ShowRadius': 'False',
+        'IsPagination': 'True',
+        'FacetType': 0,
+        'FacetFilters[0].ID': facet['ID'],
+        'FacetFilters[0].FacetType': facet['FacetType'],
+        'FacetFilters[0].Count': facet.get('Count', ''),
+        'FacetFilters[0].Display': facet['Display'],
+        'FacetFilters[0].IsApplied': 'true',
+        'FacetFilters[0].FieldName': '',
+        'SearchResultsModuleName': 'Search Results',
+        'SearchFiltersModuleName': 'Search Filters',
+        'SortCriteria': 0,
+        'SortDirection': 0,
+        'SearchType': 5,
+    }
+
+
+def fetch_results_page(site_url, page, facet, records_per_page):
+    """Fetch one results fragment and return it parsed"""
+    response = get_session().get(
+        urljoin(site_url, RESULTS_PATH),
+        params=results_params(page, facet, records_per_page),
+        headers=AJAX_HEADERS,
+        timeout=30,
+    )
+    response.raise_for_status()
+    return BeautifulSoup(response.json().get('results', ''), 'html.parser')
+
+
+def page_info(results):
+    """The data-* paging attributes of the #search-results section"""
+    section = results.select_one("#search-results")
+    if section is None:
+        return {'total_pages': 0, 'records_per_page': 0, 'total_job_results': 0}
+    return {
+        'total_pages': int(section.get('data-total-pages') or 0),
+        'records_per_page': int(section.get('data-records-per-page') or 0),
+        'total_job_results': int(section.get('data-total-job-results') or 0),
+    }
+
+
+def fetch_page_with_retry(site_url, page, facet, records_per_page, retries=RETRIES, backoff=BACKOFF):
+    """fetch_results_page, retried with exponential backoff on request errors and bad JSON"""
+    for attempt in range(retries):
+        try:
+            return fetch_results_page(site_url, page, facet, records_per_page)
+        except (requests.RequestException, ValueError) as e:
+            if attempt == retries - 1:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"Page {page}: {str(e)[:200]}; retrying in {delay:g}s")
+            time.sleep(delay)
+
+
+def load_finished_pages(path):
+    """Page numbers recorded by mark_page_finished (an unreadable last line is ignored)"""
+    path = Path(path)
+    if not path.exists():
+        return set()
+    return {int(line) for line in path.read_text().split() if line.isdigit()}
+
+
+def mark_page_finished(path, page):
+    """Record a page as journaled, so a re-run of the crawl can skip it"""
+    with open(path, 'a') as file:
+        file.write(f"{page}\n")
+
+
+def crawl(site_url, search_path, parse_rows, region="California",
+          records_per_page=RECORDS_PER_PAGE, workers=8, on_page=None, skip_pages=(),
+          retries=RETRIES, backoff=BACKOFF):
+    """Crawl every filtered results page directly and return the parsed rows in page order.
+
+    parse_rows(results, site_url) turns one parsed fragment into a list of rows.
+    Page 1 is fetched alone to learn the page count, then the rest are fetched
+    concurrently. Each page is retried with backoff; a page that still fails fails
+    only itself. As each page arrives, on_page(page, rows) is called right away (in
+    completion order, on the calling thread), so a later failure or interruption
+    can't lose it. Pages in skip_pages (already journaled by an earlier run) are
+    not fetched again, apart from page 1, which is always needed for the page count.
+
+    Returns ([row, ...] of the pages fetched, in page order, {page: error} of the
+    pages that failed).
+    """
+    facet = find_region_facet(urljoin(site_url, search_path), region)
+    try:
+        first = fetch_page_with_retry(site_url, 1, facet, records_per_page, retries, backoff)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Page 1 failed, so the page count is unknown: {str(e)[:200]}")
+        return [], {1: str(e)[:200]}
+    info = page_info(first)
+    print(f"{region}: {info['total_job_results']} jobs on {info['total_pages']} pages "
+          f"of {info['records_per_page']} (direct results endpoint)")
+
+    page_rows = {}
+    failed = {}
+
+    def finish(page_number, results):
+        page_rows[page_number] = parse_rows(results, site_url)
+        print(f"Page {page_number}: {len(page_rows[page_number])} jobs")
+        if on_page is not None:
+            on_page(page_number, page_rows[page_number])
+
+    if 1 not in skip_pages:
+        finish(1, first)
+    pages = [page for page in range(2, info['total_pages'] + 1) if page not in skip_pages]
+    if len(pages) < info['total_pages'] - 1:
+        print(f"Skipping {info['total_pages'] - 1 - len(pages)} pages journaled by an earlier run")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {pool.submit(fetch_page_with_retry, site_url, page, facet, records_per_page,
+                               retries, backoff): page for page in pages}
+        for future in as_completed(running):
+            page_number = running[future]
+            try:
+                results = future.result()
+            except (requests.RequestException, ValueError) as e:
+                failed[page_number] = str(e)[:200]
+                print(f"Page {page_number} failed after {retries} attempts: {failed[page_number]}")
+                continue
+            finish(page_number, results)
+
+    rows = [row for page_number in sorted(page_rows) for row in page_rows[page_number]]
+    return rows, dict(sorted(failed.items()))
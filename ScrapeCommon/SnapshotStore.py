@@ -0,0 +1,251 @@
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ScrapeCommon import WorkbookStream
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Hive-style layout: Snapshots/{kind}/source={source}/scrape_date={YYYY-MM-DD}/{file stem}.parquet
+SNAPSHOT_ROOT = PROJECT_ROOT / "Snapshots"
+KINDS = ('links', 'descriptions', 'parsed')
+
+# File name prefix -> source, for every naming scheme the scrapers have used
+SOURCES = {
+    'kpjobs': 'kaiser',
+    'DignityHospitals': 'dignity',
+    'ClaremontCollegesJobs': 'claremont',
+    'claremont_job_details': 'claremont',
+    'ucjobs': 'uc',
+}
+SNAPSHOT_FILE = re.compile(r'^(%s)(?:_(.*))?\.(xlsx|csv|parquet)$' % '|'.join(SOURCES))
+DESCRIPTION_TOKENS = {'description', 'html', 'details'}
+
+
+def _parse_date_token(token):
+    """Date written as MM-DD-YYYY, MMDDYYYY or MMDDYY (the three formats in use), else None"""
+    formats = {10: '%m-%d-%Y', 8: '%m%d%Y', 6: '%m%d%y'}
+    if len(token) not in formats or not re.fullmatch(r'[\d-]+', token):
+        return None
+    try:
+        return datetime.strptime(token, formats[len(token)]).date()
+    except ValueError:
+        return None
+
+
+def classify_snapshot_file(path):
+    """Work out (source, kind, scrape date) from a snapshot file's name and folder.
+
+    Understands the current names (kpjobs_03182025_description_parsed.xlsx,
+    ClaremontCollegesJobs_031825.xlsx, ucjobs_html_04012025.xlsx, ...) as well as the
+    older dated-folder CSVs (03-10-2025/claremont_job_details.csv). The folder date is
+    used when the name has none or a malformed one. Returns None for anything else.
+    """
+    path = Path(path)
+    match = SNAPSHOT_FILE.match(path.name)
+    if not match:
+        return None
+    source = SOURCES[match.group(1)]
+    tokens = (match.group(2) or '').split('_')
+
+    lowered = {token.lower() for token in tokens}
+    if 'parsed' in lowered:
+        kind = 'parsed'
+    elif lowered & DESCRIPTION_TOKENS or match.group(1) == 'claremont_job_details' or 'ScrapeDescriptions' in path.parts:
+        kind = 'descriptions'
+    else:
+        kind = 'links'
+
+    scrape_date = next((d for d in map(_parse_date_token, tokens) if d), None)
+    if scrape_date is None:
+        scrape_date = _parse_date_token(path.parent.name)
+    if scrape_date is None:
+        return None
+    return source, kind, scrape_date.isoformat()
+
+
+def read_legacy(path):
+    """Read a legacy workbook (first sheet) or CSV"""
+    path = Path(path)
+    if path.suffix == '.xlsx':
+        return pd.read_excel(path)
+    try:
+        return pd.read_csv(path, low_memory=False)
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding='latin-1', low_memory=False)
+
+
+def legacy_files(project_root=PROJECT_ROOT):
+    """(path, (source, kind, date)) for every recognised workbook/CSV under ScrapeLinks and ScrapeDescriptions, oldest first"""
+    project_root = Path(project_root)
+    found = []
+    for folder in ("ScrapeLinks", "ScrapeDescriptions"):
+        for path in sorted((project_root / folder).rglob("*")):
+            if path.suffix not in ('.xlsx', '.csv') or path.name.startswith(('.~lock', '~$')):
+                continue
+            info = classify_snapshot_file(path)
+            if info is None:
+                print(f"Skipping unrecognised file: {path.relative_to(project_root)}")
+                continue
+            found.append((path, info))
+    return sorted(found, key=lambda item: item[1][2])
+
+
+def _iso(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def snapshot_path(source, kind, scrape_date, name, root=SNAPSHOT_ROOT):
+    return Path(root) / kind / f"source={source}" / f"scrape_date={_iso(scrape_date)}" / f"{name}.parquet"
+
+
+def _arrow_table(df):
+    """Arrow table for a scraped frame; mixed-type text columns (common in Excel) become strings"""
+    df = df.copy()
+    df.columns = [str(column) for column in df.columns]
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].astype('string')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_snapshot(df, source, kind, scrape_date, name, root=SNAPSHOT_ROOT):
+    """Write one snapshot into its partition (replacing an earlier write of the same name)"""
+    path = snapshot_path(source, kind, scrape_date, name, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    pq.write_table(_arrow_table(df), temp_path, compression='zstd')
+    os.replace(temp_path, path)
+    return path
+
+
+def write_for_output(output_path, df, root=SNAPSHOT_ROOT):
+    """Mirror a workbook a scraper or parser just wrote into the Parquet dataset.
+
+    The partition comes from the workbook's own name, so this is a no-op for names
+    classify_snapshot_file() doesn't recognise. Failures are reported, never raised:
+    the workbook is still the deliverable.
+    """
+    info = classify_snapshot_file(output_path)
+    if info is None:
+        return None
+    source, kind, scrape_date = info
+    try:
+        path = write_snapshot(df, source, kind, scrape_date, Path(output_path).stem, root)
+    except Exception as e:
+        print(f"Could not write Parquet snapshot for {output_path}: {str(e)[:200]}")
+        return None
+    print(f"Snapshot written: {path.relative_to(root)}")
+    return path
+
+
+def snapshot_files(kind, sources=None, start=None, end=None, root=SNAPSHOT_ROOT):
+    """(source, scrape_date, path) for every snapshot file in the partitions that match.
+
+    Partitions are pruned by directory name, so files outside the date range or
+    sources are never opened.
+    """
+    start, end = _iso(start), _iso(end)
+    files = []
+    for source_dir in sorted((Path(root) / kind).glob("source=*")):
+        source = source_dir.name.split('=', 1)[1]
+        if sources and source not in sources:
+            continue
+        for date_dir in sorted(source_dir.glob("scrape_date=*")):
+            scrape_date = date_dir.name.split('=', 1)[1]
+            if (start and scrape_date < start) or (end and scrape_date > end):
+                continue
+            files.extend((source, scrape_date, path) for path in sorted(date_dir.glob("*.parquet")))
+    return files
+
+
+def _current_snapshot(path, root=SNAPSHOT_ROOT):
+    """The Parquet snapshot of a workbook/CSV when it is at least as new as the file, else None"""
+    info = classify_snapshot_file(path)
+    if info is not None:
+        snapshot = snapshot_path(*info, path.stem, root)
+        if snapshot.exists() and snapshot.stat().st_mtime >= path.stat().st_mtime:
+            return snapshot
+    return None
+
+
+def read_output(path, root=SNAPSHOT_ROOT):
+    """Rows of a workbook/CSV, read from its Parquet snapshot when that is up to date (much faster than openpyxl)"""
+    path = Path(path)
+    snapshot = _current_snapshot(path, root)
+    if snapshot is not None:
+        return pd.read_parquet(snapshot)
+    return read_legacy(path)
+
+
+def output_columns(path, root=SNAPSHOT_ROOT):
+    """Column names of a workbook/CSV (from its snapshot when current), without reading its rows"""
+    path = Path(path)
+    snapshot = _current_snapshot(path, root)
+    if snapshot is not None:
+        return pq.read_schema(snapshot).names
+    return WorkbookStream.read_header(path)
+
+
+def iter_output(path, batch_size, root=SNAPSHOT_ROOT, columns=None):
+    """read_output() in DataFrames of up to batch_size rows (0: the whole file), for bounded memory.
+
+    With columns, only those are read (in that order; ones the file lacks come back as NA).
+    """
+    path = Path(path)
+    if batch_size <= 0 and columns is None:
+        yield read_output(path, root)
+        return
+    snapshot = _current_snapshot(path, root)
+    if snapshot is not None:
+        parquet = pq.ParquetFile(snapshot)
+        names = None if columns is None else [column for column in columns if column in parquet.schema_arrow.names]
+        rows = parquet.metadata.num_rows
+        if rows:
+            batches = parquet.iter_batches(batch_size=batch_size if batch_size > 0 else rows, columns=names)
+        else:
+            # An empty snapshot still yields its (empty) frame, as the workbook reader does
+            empty = parquet.schema_arrow.empty_table()
+            batches = [empty if names is None else empty.select(names)]
+        for batch in batches:
+            df = batch.to_pandas()
+            yield df if columns is None else df.reindex(columns=columns)
+        return
+    yield from WorkbookStream.iter_batches(path, columns=columns, batch_size=batch_size)
+
+
+def load_snapshots(kind, sources=None, start=None, end=None, columns=None, root=SNAPSHOT_ROOT):
+    """Load snapshots of one kind as a single DataFrame with `source` and `scrape_date` columns.
+
+    Only the requested columns are read from each file (columns a file lacks come
+    back as NA), and only partitions within [start, end] for the given sources.
+    """
+    if columns is not None:
+        columns = [column for column in columns if column not in ('source', 'scrape_date')]
+    frames = []
+    for source, scrape_date, path in snapshot_files(kind, sources, start, end, root):
+        if columns is None:
+            table = pq.read_table(path)
+        else:
+            available = set(pq.read_schema(path).names)
+            table = pq.read_table(path, columns=[column for column in columns if column in available])
+        frame = table.to_pandas()
+        if columns is not None:
+            frame = frame.reindex(columns=list(columns))
+        # Partition values win over same-named columns in the file (e.g. Claremont's scrape_date)
+        frame = frame.drop(columns=['source', 'scrape_date'], errors='ignore')
+        frame.insert(0, 'source', source)
+        frame.insert(1, 'scrape_date', scrape_date)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['source', 'scrape_date'] + list(columns or []))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,228 @@
+"""Local SQLite warehouse of every link, description and parsed snapshot.
+
+    python ScrapeCommon/Warehouse.py ingest [--db warehouse.sqlite] [--batch-size 500]
+    python ScrapeCommon/Warehouse.py query "SELECT source, scrape_date, COUNT(*) FROM links GROUP BY 1, 2"
+
+Each kind has its own table (links, descriptions, parsed) shared by all four sources.
+The columns every question needs (source, scrape_date, job_url, job_id, title) are real,
+indexed columns; the full scraped row is kept as JSON in `record`, so source-specific
+fields stay reachable with json_extract(record, '$."Date Posted"').
+
+Ingest is incremental: every file is tracked by its path and the SHA-256 of its content,
+and a file is only loaded when its path is new or its content changed (which replaces
+the rows it loaded last time). Copies of the same file under different paths (say, in
+a dated folder) are each loaded under their own source and date. With --batch-size,
+files are read and loaded in batches of rows, so memory stays flat however large the
+workbooks are.
+"""
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ScrapeCommon import SnapshotStore, WorkbookStream
+
+DB_PATH = SnapshotStore.PROJECT_ROOT / "warehouse.sqlite"
+
+# Per source: the scraped column holding each key (the first one present wins)
+KEY_COLUMNS = {
+    'kaiser': {'job_url': ['URL'], 'job_id': [], 'title': ['Title']},
+    'dignity': {'job_url': ['url'], 'job_id': ['job_id'], 'title': ['title']},
+    'claremont': {'job_url': ['url'], 'job_id': ['requisition_id'], 'title': ['title']},
+    'uc': {'job_url': ['Job Link'], 'job_id': ['Requisition'], 'title': ['Job Title']},
+}
+# Kaiser has no id column; its job URLs end in the numeric job id (.../job/Title/641/78238898256)
+URL_JOB_ID = re.compile(r'/(\d+)/?$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    scrape_date TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+"""
+
+TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {kind} (
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    scrape_date TEXT NOT NULL,
+    job_url TEXT,
+    job_id TEXT,
+    title TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {kind}_source_date ON {kind} (source, scrape_date);
+CREATE INDEX IF NOT EXISTS {kind}_job_url ON {kind} (job_url);
+CREATE INDEX IF NOT EXISTS {kind}_job_id ON {kind} (source, job_id);
+CREATE INDEX IF NOT EXISTS {kind}_file ON {kind} (file_id);
+"""
+
+
+def connect(db_path=DB_PATH):
+    """Open (creating if needed) the warehouse"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    for kind in SnapshotStore.KINDS:
+        conn.executescript(TABLE_SCHEMA.format(kind=kind))
+    return conn
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _first_column(df, candidates):
+    return next((column for column in candidates if column in df.columns), None)
+
+
+def _clean(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def key_column_names(source):
+    """Every column key_columns() may read for a source, for reading only those"""
+    return [column for candidates in KEY_COLUMNS[source].values() for column in candidates]
+
+
+def key_columns(df, source):
+    """(job_url, job_id, title) lists for a frame, using the source's column names"""
+    keys = {}
+    for key, candidates in KEY_COLUMNS[source].items():
+        column = _first_column(df, candidates)
+        keys[key] = [_clean(value) for value in df[column]] if column else [None] * len(df)
+    if not KEY_COLUMNS[source]['job_id']:
+        keys['job_id'] = [URL_JOB_ID.search(url).group(1) if url and URL_JOB_ID.search(url) else None
+                          for url in keys['job_url']]
+    return keys['job_url'], keys['job_id'], keys['title']
+
+
+def records(df):
+    """Each row as a JSON object, with NaN as null and timestamps as ISO text"""
+    df = df.astype(object).where(df.notna(), None)
+    columns = [str(column) for column in df.columns]
+    return [json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False)
+            for row in df.itertuples(index=False, name=None)]
+
+
+def ingest_file(conn, path, source, kind, scrape_date, sha256, stat, batch_size=0):
+    """Load one file's rows, replacing whatever an earlier version of the same path loaded.
+
+    With a batch_size, rows are read and inserted that many at a time (in the same
+    transaction), so memory doesn't grow with the file.
+    """
+    rows = 0
+    with conn:
+        conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+        file_id = conn.execute(
+            "INSERT INTO files (path, sha256, size, mtime, source, kind, scrape_date, rows, ingested_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(path), sha256, stat.st_size, stat.st_mtime, source, kind, scrape_date, 0,
+             datetime.now().isoformat(timespec='seconds'))
+        ).lastrowid
+        for df in SnapshotStore.iter_output(path, batch_size):
+            job_urls, job_ids, titles = key_columns(df, source)
+            conn.executemany(
+                f"INSERT INTO {kind} (file_id, source, scrape_date, job_url, job_id, title, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((file_id, source, scrape_date, url, job_id, title, record)
+                 for url, job_id, title, record in zip(job_urls, job_ids, titles, records(df)))
+            )
+            rows += len(df)
+        conn.execute("UPDATE files SET rows = ? WHERE id = ?", (rows, file_id))
+    return rows
+
+
+def ingest(conn, project_root=SnapshotStore.PROJECT_ROOT, force=False, batch_size=0):
+    """Load every snapshot file not already in the warehouse; returns (files loaded, rows loaded)"""
+    known = {row[0]: row[1:] for row in conn.execute("SELECT path, size, mtime, sha256 FROM files")}
+    loaded_files = loaded_rows = 0
+    for path, (source, kind, scrape_date) in SnapshotStore.legacy_files(project_root):
+        stat = path.stat()
+        previous = known.get(str(path))
+        # Unchanged size and mtime: trust the recorded hash rather than re-reading the file
+        if not force and previous and previous[:2] == (stat.st_size, stat.st_mtime):
+            continue
+        sha256 = file_sha256(path)
+        if not force and previous and previous[2] == sha256:
+            # Touched but not changed: remember the new mtime so it isn't hashed again
+            with conn:
+                conn.execute("UPDATE files SET size = ?, mtime = ? WHERE path = ?",
+                             (stat.st_size, stat.st_mtime, str(path)))
+            continue
+        try:
+            rows = ingest_file(conn, path, source, kind, scrape_date, sha256, stat, batch_size)
+        except Exception as e:
+            print(f"Failed: {path.relative_to(project_root)}: {str(e)[:200]}")
+            continue
+        loaded_files += 1
+        loaded_rows += rows
+        print(f"Loaded {path.relative_to(project_root)} as {source} {kind} {scrape_date} ({rows} rows)")
+    return loaded_files, loaded_rows
+
+
+def query(sql, params=(), db_path=DB_PATH):
+    """Run a query against the warehouse and return the result as a DataFrame"""
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load scrape snapshots into the local SQLite warehouse")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Warehouse file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Load files the warehouse has not seen yet")
+    ingest_parser.add_argument("--project-root", type=Path, default=SnapshotStore.PROJECT_ROOT,
+                               help="Folder holding ScrapeLinks/ and ScrapeDescriptions/ (default: %(default)s)")
+    ingest_parser.add_argument("--force", action="store_true", help="Reload every file")
+    WorkbookStream.add_batch_argument(ingest_parser)
+    query_parser = commands.add_parser("query", help="Run a SQL query and print the result")
+    query_parser.add_argument("sql")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        conn = connect(args.db)
+        try:
+            files, rows = ingest(conn, args.project_root, args.force, args.batch_size)
+        finally:
+            conn.close()
+        print(f"\nIngested {files} new files ({rows} rows) into {args.db}")
+    else:
+        with pd.option_context('display.max_rows', 200, 'display.width', 200):
+            print(query(args.sql, db_path=args.db))
+
+
+if __name__ == '__main__':
+    main()
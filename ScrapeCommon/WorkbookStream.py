@@ -0,0 +1,165 @@
+"""Read scrape workbooks (and CSVs) in row batches instead of whole.
+
+    for batch in WorkbookStream.iter_batches(path, columns=['url', 'scraped_html'], batch_size=200):
+        ...
+
+Workbooks are read with openpyxl's read-only mode, which walks the sheet XML rather
+than building every cell, and only the requested columns are kept, so the memory a
+consumer needs depends on the batch size rather than on the file (or on how many
+files it goes through). The one exception is the workbook's shared-strings table,
+which openpyxl loads whole for the file being read.
+
+Batches come out as pd.read_excel would have read the same rows: they go through
+the same text parser, so blank cells are NaN and numbers stored as text are numbers,
+trailing blank rows are dropped and unnamed or repeated headers become "Unnamed: 2"
+and "a.1". The index continues from one batch to the next, so concatenating every
+batch gives the pd.read_excel frame. Types are inferred per batch, so a column that
+is empty in one batch can come back with a different dtype in another.
+"""
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def add_batch_argument(parser):
+    """Add the --batch-size option shared by the streaming consumers"""
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Read input in batches of this many rows, bounding memory (default: whole file at once)")
+
+
+def _cell(value):
+    """A cell as pd.read_excel passes it on: blanks as '', whole numbers as ints"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _column_names(header):
+    """Column names as pd.read_excel gives them for a header row"""
+    names = []
+    seen = {}
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None or value == '' else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _open_sheet(path):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    sheet = workbook.worksheets[0]
+    # Sheets written by some tools record a wrong size; read what is actually there
+    sheet.reset_dimensions()
+    return workbook, sheet
+
+
+def read_header(path):
+    """Column names of a workbook's first sheet (or a CSV), without reading its rows"""
+    path = Path(path)
+    if path.suffix == '.csv':
+        return list(_read_csv(path, nrows=0).columns)
+    workbook, sheet = _open_sheet(path)
+    try:
+        header = next(sheet.iter_rows(values_only=True), ())
+    finally:
+        workbook.close()
+    return _column_names(header)
+
+
+def _csv_encoding(path):
+    """utf-8, or latin-1 for the CSVs that aren't (decided before reading, since chunks are read lazily)"""
+    try:
+        with open(path, encoding='utf-8') as file:
+            for _ in file:
+                pass
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'utf-8'
+
+
+def _read_csv(path, **options):
+    return pd.read_csv(path, encoding=_csv_encoding(path), low_memory=False, **options)
+
+
+def _batch(rows, names, positions, start, columns):
+    """A DataFrame for a batch of sheet rows, through the same text parser pd.read_excel uses
+    (so numbers stored as text become numbers and blanks become NaN, exactly as there)"""
+    data = [[names[i] for i in positions]]
+    data.extend([row[i] if i < len(row) else '' for i in positions] for row in rows)
+    frame = TextParser(data, header=0, skip_blank_lines=False).read()
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame.reindex(columns=columns) if columns is not None else frame
+
+
+def _iter_workbook(path, columns, batch_size):
+    workbook, sheet = _open_sheet(path)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        names = _column_names(next(rows, ()))
+        wanted = set(names) if columns is None else set(columns)
+        positions = [i for i, name in enumerate(names) if name in wanted]
+
+        batch, blank_rows, start = [], 0, 0
+        for row in rows:
+            row = [_cell(value) for value in row]
+            if all(value == '' for value in row):
+                # Blank rows only count once a row with data follows them
+                blank_rows += 1
+                continue
+            batch.extend([[]] * blank_rows)
+            blank_rows = 0
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield _batch(batch, names, positions, start, columns)
+                start += len(batch)
+                batch = []
+        if batch or start == 0:
+            yield _batch(batch, names, positions, start, columns)
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path, columns, batch_size):
+    usecols = None if columns is None else set(columns).__contains__
+    if batch_size is None:
+        frames = [_read_csv(path, usecols=usecols)]
+    else:
+        frames = _read_csv(path, usecols=usecols, chunksize=batch_size)
+    for frame in frames:
+        yield frame.reindex(columns=columns) if columns is not None else frame
+
+
+def iter_batches(path, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    """DataFrames of up to batch_size rows from a workbook's first sheet or a CSV.
+
+    With columns, only those are read (in that order; ones the file lacks come back
+    as NA). A batch_size of 0 or less reads the file as a single batch.
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        yield from _iter_csv(path, columns, batch_size if batch_size > 0 else None)
+    else:
+        yield from _iter_workbook(path, columns, batch_size if batch_size > 0 else float('inf'))
+
+
+def iter_files(paths, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    """(path, batch) for every batch of every file in turn; only one batch is held at a time"""
+    for path in paths:
+        for batch in iter_batches(path, columns, batch_size):
+            yield path, batch
+
+
+def read(path, columns=None, batch_size=0):
+    """A whole workbook or CSV as one DataFrame, read batch by batch (with column projection)"""
+    batches = list(iter_batches(path, columns, batch_size))
+    return batches[0] if len(batches) == 1 else pd.concat(batches)
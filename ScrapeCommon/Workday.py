@@ -0,0 +1,161 @@
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+from ScrapeCommon.HttpFetch import get_session
+
+PAGE_SIZE = 20  # Workday rejects search requests with a larger limit
+JSON_HEADERS = {'Accept': 'application/json'}
+BLOCK_TAGS = ['p', 'div', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr']
+
+
+def parse_career_page(url):
+    """Split a Workday career page URL into (origin, tenant, locale, site)"""
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    site = segments[-1]
+    locale = segments[0] if len(segments) > 1 else 'en-US'
+    tenant = parts.netloc.split('.')[0]
+    return f"{parts.scheme}://{parts.netloc}", tenant, locale, site
+
+
+def api_root(url):
+    """Base of the tenant's JSON (cxs) API for a career page"""
+    origin, tenant, _, site = parse_career_page(url)
+    return f"{origin}/wday/cxs/{tenant}/{site}"
+
+
+def department_for(url):
+    """Same department label the browser crawler derives from the career page URL"""
+    return url.split('/')[-1].replace('_Careers', '').replace('_Staff', '')
+
+
+def search_page(url, offset):
+    """POST one jobs/search request for a career page"""
+    response = get_session().post(
+        f"{api_root(url)}/jobs",
+        json={"appliedFacets": {}, "limit": PAGE_SIZE, "offset": offset, "searchText": ""},
+        headers=JSON_HEADERS,
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def posting_to_row(url, posting):
+    """Map a jobs/search posting onto the columns the browser crawler produces"""
+    origin, _, locale, site = parse_career_page(url)
+    bullets = posting.get('bulletFields') or []
+    now = datetime.now()
+    return {
+        'scrape_date': now.strftime('%Y-%m-%d'),
+        'title': posting.get('title'),
+        'url': f"{origin}/{locale}/{site}{posting['externalPath']}",
+        'source_page': url,
+        'department': department_for(url),
+        'location': posting.get('locationsText'),
+        'time_type': posting.get('timeType'),
+        'posted': posting.get('postedOn'),
+        'requisition_id': bullets[0] if bullets else None,
+        'scrape_time': now.strftime('%H:%M:%S'),
+        'scrape_day': now.strftime('%a')
+    }
+
+
+def fetch_listings(career_pages, workers=8, on_board=None):
+    """Fetch every posting on every career page with concurrent jobs/search calls.
+
+    The first page of each board is requested up front (Workday only reports `total`
+    on offset 0); as it arrives, the board's remaining pages are queued, so all boards
+    page concurrently. A board is finished once all its pages are in: on_board(url, rows)
+    is called right away (in completion order), so a later failure or interruption can't
+    lose it. A request error fails only its own board.
+
+    Returns ({career page URL: [row, ...]} of the boards fetched, in board order,
+    {career page URL: error} of the boards that failed).
+    """
+    pages = {url: {} for url in career_pages}  # url -> {offset: search response}
+    expected = {}  # url -> number of pages, once its first page is in
+    failed = {}
+    listings = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {pool.submit(search_page, url, 0): (url, 0) for url in career_pages}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, offset = running.pop(future)
+                if url in failed:
+                    continue
+                try:
+                    page = future.result()
+                except (requests.RequestException, ValueError) as e:
+                    failed[url] = str(e)[:200]
+                    print(f"{url}: failed at offset {offset}: {failed[url]}")
+                    continue
+                pages[url][offset] = page
+                if offset == 0:
+                    later = range(PAGE_SIZE, page.get('total', 0), PAGE_SIZE)
+                    expected[url] = 1 + len(later)
+                    running.update({pool.submit(search_page, url, later_offset): (url, later_offset)
+                                    for later_offset in later})
+                if len(pages[url]) == expected[url]:
+                    postings = [posting for _, board_page in sorted(pages[url].items())
+                                for posting in board_page.get('jobPostings', [])]
+                    listings[url] = [posting_to_row(url, posting) for posting in postings
+                                     if posting.get('externalPath')]
+                    print(f"{url}: {len(listings[url])} of {pages[url][0].get('total', 0)} postings")
+                    if on_board is not None:
+                        on_board(url, listings[url])
+
+    return {url: listings[url] for url in career_pages if url in listings}, failed
+
+
+def description_text(html):
+    """Plain text of a jobDescription, one line per block like the rendered page"""
+    if not html:
+        return None
+    soup = BeautifulSoup(html, 'html.parser')
+    # Break lines after block elements only, so inline tags (<b>, <a>) stay on their line
+    for br in soup.find_all('br'):
+        br.replace_with('\n')
+    for block in soup.find_all(BLOCK_TAGS):
+        block.append('\n')
+    return "\n".join(line for line in soup.get_text().splitlines() if line.strip())
+
+
+def fetch_job_detail(job_url, source_page, cache=None):
+    """Fetch a posting's job-detail JSON and map it onto the description scraper's fields.
+
+    With a PageCache the JSON is served from / revalidated against the cache; None
+    means the cached fetch failed.
+    """
+    _, _, _, site = parse_career_page(source_page)
+    external_path = urlsplit(job_url).path.split(f"/{site}", 1)[1]
+    detail_url = f"{api_root(source_page)}{external_path}"
+    if cache is not None:
+        text = cache.fetch(detail_url, headers=JSON_HEADERS, timeout=30)
+        if text is None:
+            return None
+        info = json.loads(text).get('jobPostingInfo', {})
+    else:
+        response = get_session().get(detail_url, headers=JSON_HEADERS, timeout=30)
+        response.raise_for_status()
+        info = response.json().get('jobPostingInfo', {})
+
+    details = {
+        'locations': info.get('location'),
+        'time type': info.get('timeType'),
+        'posted on': info.get('postedOn'),
+        'job requisition id': info.get('jobReqId'),
+    }
+    return {
+        'url': job_url,
+        'title': info.get('title'),
+        'description': description_text(info.get('jobDescription')),
+        'details': {label: value for label, value in details.items() if value}
+    }
@@ -1,19 +1,20 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import pandas as pd
-import time
 import os
+import sys
+import argparse
+from functools import partial
 from pathlib import Path
 from datetime import datetime  # Import datetime for timestamp generation
 
-# Configure Chrome options
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon.DriverPool import add_pool_arguments, scrape_in_pool
+from ScrapeCommon import Workday, DriverFactory, DeltaCrawl, PageCache
 
 # 👇 Add path calculation here (before `main()`)
 parent_dir = Path(__file__).resolve().parent.parent.parent  # Go up 3 levels to C:\Scrape
@@ -27,11 +28,6 @@ input_path = parent_dir / "ScrapeLinks" / "ClaremontColleges" / input_filename
 output_filename = f"ClaremontCollegesJobs_{timestamp}_description.xlsx"  # Add "description" to the filename (now .xlsx)
 output_path = parent_dir / "ScrapeDescriptions" / "ClaremontColleges" / output_filename  # Output file path
 
-def setup_driver():
-    driver = webdriver.Chrome(options=options)
-    driver.implicitly_wait(3)
-    return driver
-
 def safe_find(parent, selector, default=None):
     """Safely find element with default return"""
     try:
@@ -92,7 +88,44 @@ def scrape_job_details(driver, url):
         print(f"Error processing job page {url}: {str(e)[:100]}...")
         return None
 
+def fetch_job_details(url, source_page, cache=None):
+    """Fetch a posting through the Workday job-detail JSON endpoint"""
+    try:
+        print(f"Fetching job: {url}")
+        return Workday.fetch_job_detail(url, source_page, cache)
+    except Exception as e:
+        print(f"Error fetching job {url}: {str(e)[:100]}...")
+        return None
+
+def scrape_row(driver, row, mode='browser', cache=None):
+    """Scrape one link row into a journal record (None leaves it for the next run)"""
+    if mode == 'api':
+        job_details = fetch_job_details(row['url'], row['source_page'], cache)
+    else:
+        job_details = scrape_job_details(driver, row['url'])
+    if job_details:
+        # Add metadata from original listing
+        job_details.update({
+            'source_page': row['source_page'],
+            'department': row['department'],
+            'location': row['location'],
+            'time_type': row['time_type'],
+            'posted': row['posted'],
+            'requisition_id': row['requisition_id']
+        })
+        print(f"Saved progress for URL: {row['url']}")
+    return job_details
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape Claremont Colleges job descriptions for today's link file")
+    add_pool_arguments(parser)
+    DriverFactory.add_browser_arguments(parser)
+    DeltaCrawl.add_delta_arguments(parser)
+    PageCache.add_cache_arguments(parser)
+    parser.add_argument("--mode", choices=["api", "browser"], default="api",
+                        help="'api' reads the Workday job-detail JSON, 'browser' renders each posting (default: %(default)s)")
+    args = parser.parse_args()
+    
     # Load the previously collected job links
     try:
         job_links = pd.read_excel(input_path)  # Updated to read Excel
@@ -113,43 +146,32 @@ def main():
         ])
         # Create the output directory if it doesn't exist
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unchanged postings keep yesterday's description and count as already processed
+        links = job_links.assign(description=None, details=None)
+        links = DeltaCrawl.carry_forward(links, output_path, 'url', ['description', 'details'],
+                                         args.full, args.revalidate)
+        df = links.loc[links['description'].notna(), list(df.columns) + ['details']].reset_index(drop=True)
+    
+    # Each scraped job is journaled; the workbook is only written once at the end
+    journal = CrawlJournal.for_output(output_path)
+    page_cache = PageCache.PageCache.from_args(args, 'claremont') if args.mode == 'api' else None
     
-    driver = setup_driver()
+    # Skip URLs that are already processed
+    pending = job_links[~job_links['url'].isin(df['url'])]
+    print(f"Skipping {len(job_links) - len(pending)} already processed URLs")
     
     try:
-        for index, row in job_links.iterrows():
-            url = row['url']
-            
-            # Skip if URL is already processed
-            if not df[df['url'] == url].empty:
-                print(f"Skipping already processed URL: {url}")
-                continue
-            
-            # Scrape job details
-            job_details = scrape_job_details(driver, url)
-            if job_details:
-                # Add metadata from original listing
-                job_details.update({
-                    'source_page': row['source_page'],
-                    'department': row['department'],
-                    'location': row['location'],
-                    'time_type': row['time_type'],
-                    'posted': row['posted'],
-                    'requisition_id': row['requisition_id']
-                })
-                
-                # Append the new data to the DataFrame
-                df = pd.concat([df, pd.DataFrame([job_details])], ignore_index=True)
-                
-                # Save progress after each row
-                df.to_excel(output_path, index=False)
-                print(f"Saved progress for URL: {url}")
-            
-            # Add delay between requests
-            time.sleep(1.5)  # Adjust as needed
-            
+        # Shard the remaining URLs across parallel workers (no browser is started in api mode)
+        scrape_in_pool(pending.to_dict('records'), partial(scrape_row, mode=args.mode, cache=page_cache),
+                       DriverFactory.driver_factory(args, implicit_wait=3), journal,
+                       key='url', workers=args.workers, delay=args.delay)
     finally:
-        driver.quit()
+        # Write the workbook once from the journal, in input order
+        df = journal.compact(output_path, base=df, key='url', order=list(job_links['url']))
+        DriverFactory.report()
+        if page_cache:
+            page_cache.report()
+            page_cache.close()
     
     print(f"\nSuccess! Saved {len(df)} job details to {output_path}.")
 
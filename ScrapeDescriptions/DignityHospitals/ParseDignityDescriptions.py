@@ -1,259 +1,121 @@
+import argparse
 import pandas as pd
-from bs4 import BeautifulSoup
-import re  # Import the regular expressions module
 import os
+import sys
+from pathlib import Path
 from datetime import datetime  # Import the datetime module
 
-# Get the current date and format it as 'MMDDYYYY'
-current_date = datetime.now().strftime("%m%d%Y")
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon import HtmlArchive, HtmlParse, ParallelParse, ParsedOutput
+from ScrapeCommon.DescriptionFields import dignity_row
+from ScrapeCommon.PayNormalize import normalize_pay
 
-# Construct the file path dynamically
-file_path = f"DignityHospitals_{current_date}_description.xlsx"
-
-# Check if the file exists
-if not os.path.exists(file_path):
-    print(f"File '{file_path}' does not exist.")
-    exit()
-
-# Load the dataset
-data = pd.read_excel(file_path).fillna('')
-
-# Function to extract structured data from HTML
-def extract_overview_data(html_content):
-    if not html_content:
-        return {}
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-    details = {}
-
-    # Find all <span> tags with class 'job-info'
-    for span in soup.find_all('span', class_='job-info'):
-        # Find the <b> tag within the <span>
-        b_tag = span.find('b')
-        if b_tag:
-            # Extract the label (text within <b>)
-            label = b_tag.get_text(strip=True).strip(':')
-            # Extract the value (text after </b> until </span>)
-            value = ''.join(b_tag.next_siblings).strip()
-            details[label] = value
-
-    return details
-
-# Function to extract the relevant section16 HTML segment
-def extract_section16_segment(html_content):
-    if not html_content:
-        return None
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-    section16_panel = soup.find('div', class_='section16__panel')
-    
-    if section16_panel:
-        return str(section16_panel)
-    return None
-
-# Function to extract the ats-description segment
-def extract_ats_description(html_content):
-    if not html_content:
-        return None
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-    ats_description = soup.find('div', class_='ats-description')
-    
-    # Stop if the job-apply button is encountered
-    job_apply_button = soup.find('a', class_='button job-apply bottom')
-    if job_apply_button:
-        # Extract only the content before the job-apply button
-        ats_description = str(ats_description).split(str(job_apply_button))[0]
-        return ats_description
-    
-    if ats_description:
-        return str(ats_description)
-    return None
-
-# Function to extract desc-overview segment from job_details_html
-def extract_desc_overview(html_content):
-    if not html_content:
-        return None
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-    desc_overview = soup.find('span', class_='desc-overview')
-    
-    if desc_overview:
-        # Find the parent container (e.g., <div class="ats-description">)
-        parent_container = desc_overview.find_parent('div', class_='ats-description')
-        if parent_container:
-            # Extract the content until the read-more button
-            read_more_button = parent_container.find('button', class_='read-more__btn')
-            if read_more_button:
-                # Extract only the content before the read-more button
-                content = str(parent_container).split(str(read_more_button))[0]
-                return content
-            else:
-                # If no read-more button, return the entire parent container
-                return str(parent_container)
-    return None
+# Pay range pattern in the 'job-info posted-pay-range' column (e.g., $34.50 - $50.97 /hour)
+PAY_RANGE_PATTERN = r"(\$\d+\.\d+\s*-\s*\$\d+\.\d+\s*\/hour)"
 
 # Function to extract the pay range from the 'job-info posted-pay-range' column
-def extract_pay_range(text):
-    if not text:
-        return text  # Return the original text if it's empty
-    
-    # Use regex to find the pay range pattern (e.g., $34.50 - $50.97 /hour)
-    pay_range_pattern = r"\$\d+\.\d+\s*-\s*\$\d+\.\d+\s*\/hour"
-    match = re.search(pay_range_pattern, text)
-    
-    if match:
-        return match.group()  # Return the matched pay range
-    else:
-        return text  # Return the original text if no match is found
-
-# Function to remove HTML tags and extract plain text
-def extract_plain_text(html_content):
-    if not html_content:
-        return ""
-    
-    # Parse the HTML content using BeautifulSoup
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Extract and return the plain text
-    return soup.get_text(separator="\n").strip()
+def extract_pay_range(values):
+    # The matched pay range, or the original text if no match is found
+    found = values.str.extract(PAY_RANGE_PATTERN, expand=False)
+    return found.where(found.notna(), values)
 
 # Function to split the text into sections
 def split_sections(text):
-    sections = {
-        "Overview": "",
-        "Responsibilities": "",
-        "Qualifications": ""
-    }
-    
-    # Split the text into sections
-    overview_start = text.find("Overview")
-    responsibilities_start = text.find("Responsibilities")
-    qualifications_start = text.find("Qualifications")
-    
-    if overview_start != -1 and responsibilities_start != -1:
-        sections["Overview"] = text[overview_start:responsibilities_start].strip()
-    if responsibilities_start != -1 and qualifications_start != -1:
-        sections["Responsibilities"] = text[responsibilities_start:qualifications_start].strip()
-    if qualifications_start != -1:
-        sections["Qualifications"] = text[qualifications_start:].strip()
-    
-    return sections
-
-# Function to extract low and high pay values
-def extract_pay_values(pay_range):
-    if not pay_range:
-        return None, None
-    
-    # Use regex to find the two pay values in the range
-    pay_values = re.findall(r"\$\d+\.\d+", pay_range)
-    
-    if len(pay_values) == 2:
-        pay_low = float(pay_values[0].replace("$", ""))  # Remove the dollar sign and convert to float
-        pay_high = float(pay_values[1].replace("$", ""))  # Remove the dollar sign and convert to float
-        return pay_low, pay_high
-    else:
-        return None, None  # Return None if the pay range is invalid
-    
-# Extract structured data from 'overview_html'
-overview_data = data['overview_html'].apply(extract_overview_data)
-overview_df = pd.DataFrame(overview_data.tolist()).fillna('')
-
-# Extract the relevant segment from 'section16_html'
-section16_segment = data['section16_html'].apply(extract_section16_segment)
-
-# If 'overview_html' is empty, copy the extracted segment from 'section16_html'
-for idx, row in data.iterrows():
-    if not row['overview_html'] and section16_segment[idx]:
-        data.at[idx, 'overview_html'] = section16_segment[idx]
-
-# Extract the ats-description segment from 'section16_html'
-ats_description_segment = data['section16_html'].apply(extract_ats_description)
-
-# If 'job_details_html' is empty, copy the extracted segment from 'section16_html'
-for idx, row in data.iterrows():
-    if not row['job_details_html'] and ats_description_segment[idx]:
-        data.at[idx, 'job_details_html'] = ats_description_segment[idx]
-
-# If 'section16_html' is empty, extract desc-overview from 'job_details_html'
-for idx, row in data.iterrows():
-    if not row['section16_html'] and row['job_details_html']:
-        desc_overview_segment = extract_desc_overview(row['job_details_html'])
-        if desc_overview_segment:
-            data.at[idx, 'job_details_html'] = desc_overview_segment
-
-# Re-extract structured data from the updated 'overview_html'
-overview_data = data['overview_html'].apply(extract_overview_data)
-overview_df = pd.DataFrame(overview_data.tolist()).fillna('')
-
-# Extract structured data from 'section16_html'
-section16_data = data['section16_html'].apply(extract_overview_data)
-section16_df = pd.DataFrame(section16_data.tolist()).fillna('')
-
-# Combine original data with extracted overview and section16 data
-cleaned_data = pd.concat([data, overview_df.add_prefix('overview_'), section16_df.add_prefix('section16_')], axis=1)
-
-# Extract and clean the 'job-info posted-pay-range' column
-cleaned_data['job-info posted-pay-range'] = cleaned_data['job-info posted-pay-range'].apply(extract_pay_range)
-
-# List of source columns to preserve
-source_columns = ['section16_html', 'overview_html', 'job_details_html']
-
-# Combine columns with shared suffixes
-columns = cleaned_data.columns.tolist()
-suffixes = set()
-
-# Identify shared suffixes (excluding source columns)
-for col in columns:
-    if (col.startswith('overview_') or col.startswith('section16_')) and col not in source_columns:
-        suffix = col.split('_', 1)[1]
-        suffixes.add(suffix)
-
-# Merge columns with shared suffixes
-for suffix in suffixes:
-    overview_col = f'overview_{suffix}'
-    section16_col = f'section16_{suffix}'
-    
-    # Check if both columns exist
-    if overview_col in columns and section16_col in columns:
-        # Combine the columns, prioritizing non-empty values
-        cleaned_data[suffix] = cleaned_data[overview_col].combine_first(cleaned_data[section16_col])
-        
-        # Drop the original columns (only if they are not source columns)
-        if overview_col not in source_columns and section16_col not in source_columns:
-            cleaned_data.drop(columns=[overview_col, section16_col], inplace=True)
-    elif overview_col in columns and overview_col not in source_columns:
-        # Rename the overview column to the suffix
-        cleaned_data.rename(columns={overview_col: suffix}, inplace=True)
-    elif section16_col in columns and section16_col not in source_columns:
-        # Rename the section16 column to the suffix
-        cleaned_data.rename(columns={section16_col: suffix}, inplace=True)
-
-# Apply the function to the 'job_details_html' column
-cleaned_data['job_details_plain_text'] = cleaned_data['job_details_html'].apply(extract_plain_text)
-
-# Apply the function to the 'job_details_plain_text' column
-split_data = cleaned_data['job_details_plain_text'].apply(split_sections).apply(pd.Series)
-
-# Combine the split data with the original DataFrame
-cleaned_data = pd.concat([cleaned_data, split_data], axis=1)
-
-# Apply the function to the 'job-info posted-pay-range' column
-cleaned_data[['pay_low', 'pay_high']] = cleaned_data['job-info posted-pay-range'].apply(
-    lambda x: pd.Series(extract_pay_values(x))
-)
-
-# Calculate the difference between pay_high and pay_low
-cleaned_data['pay_difference'] = (cleaned_data['pay_high'] - cleaned_data['pay_low']).round(2)
-
-# Extract the base filename (without extension) from the input file path
-base_filename = os.path.splitext(os.path.basename(file_path))[0]
-
-# Construct the output filename by appending '_parsed.xlsx'
-output_filename = f"{base_filename}_parsed.xlsx"
-
-# Save the combined data to Excel with the new filename
-output_path = os.path.join(os.path.dirname(file_path), output_filename)
-cleaned_data.to_excel(output_path, index=False, engine='openpyxl')
-
-print(f"Combined structured data saved to '{output_path}'.")
+    # Each section runs from the first mention of its heading to the first mention of the next
+    # heading, and is empty unless both are found (Qualifications runs to the end of the text)
+    before_qualifications = text.str.partition("Qualifications")
+    before_responsibilities = text.str.partition("Responsibilities")
+    overview = before_responsibilities[0].str.partition("Overview")
+    responsibilities = before_qualifications[0].str.partition("Responsibilities")
+
+    has_responsibilities = before_responsibilities[1] != ''
+    has_qualifications = before_qualifications[1] != ''
+    return pd.DataFrame({
+        "Overview": ("Overview" + overview[2]).str.strip().where(has_responsibilities & (overview[1] != ''), ''),
+        "Responsibilities": ("Responsibilities" + responsibilities[2]).str.strip().where(
+            has_qualifications & (responsibilities[1] != ''), ''),
+        "Qualifications": ("Qualifications" + before_qualifications[2]).str.strip().where(has_qualifications, ''),
+    })
+
+def merge_job_info(overview_df, section16_df):
+    # Job-info fields found in only one of the sections keep their place (overview first);
+    # fields found in both come after them in sorted order, the overview value wins
+    shared = sorted(set(overview_df.columns) & set(section16_df.columns))
+    overview_only = [col for col in overview_df.columns if col not in shared]
+    section16_only = [col for col in section16_df.columns if col not in shared]
+    merged = overview_df[shared].where(overview_df[shared].notna(), section16_df[shared])
+    return pd.concat([overview_df[overview_only], section16_df[section16_only], merged], axis=1)
+
+def main():
+    # Get the current date and format it as 'MMDDYYYY'
+    current_date = datetime.now().strftime("%m%d%Y")
+
+    parser = argparse.ArgumentParser(description="Parse a Dignity description workbook")
+    parser.add_argument("input", nargs="?", default=f"DignityHospitals_{current_date}_description.xlsx",
+                        help="Description workbook to parse (default: today's, %(default)s)")
+    HtmlParse.add_parser_argument(parser)
+    ParallelParse.add_parallel_arguments(parser)
+    args = parser.parse_args()
+    backend = HtmlParse.get_backend(args.parser)
+    file_path = args.input
+
+    # Check if the file exists
+    if not os.path.exists(file_path):
+        print(f"File '{file_path}' does not exist.")
+        return
+
+    # Load the dataset
+    data = pd.read_excel(file_path).fillna('')
+    # The HTML columns hold archive references (older workbooks hold the HTML itself)
+    for column in ['section16_html', 'overview_html', 'job_details_html']:
+        data[column] = HtmlArchive.resolve_column(data[column]).fillna('')
+
+    # Parse every row once: fill empty overview/job details from section16 (or trim job details
+    # to desc-overview) and extract the job-info fields and plain text from the same trees
+    # (in worker processes with --workers)
+    parsed_rows = ParallelParse.map_rows(dignity_row, zip(data['section16_html'], data['overview_html'], data['job_details_html']),
+                                         backend, workers=args.workers, chunk_size=args.chunk_size)
+    data['overview_html'] = [row['overview_html'] for row in parsed_rows]
+    data['job_details_html'] = [row['job_details_html'] for row in parsed_rows]
+    overview_df = pd.DataFrame([row['overview_data'] for row in parsed_rows]).fillna('')
+    section16_df = pd.DataFrame([row['section16_data'] for row in parsed_rows]).fillna('')
+
+    # Extract and clean the 'job-info posted-pay-range' column
+    data['job-info posted-pay-range'] = extract_pay_range(data['job-info posted-pay-range'])
+
+    # Combine the job-info fields of both sections into one column per field
+    job_info_df = merge_job_info(overview_df, section16_df)
+
+    # Plain text of the final 'job_details_html', read off the trees parsed above, split into sections
+    plain_text = pd.Series([row['job_details_plain_text'] for row in parsed_rows], index=data.index,
+                           name='job_details_plain_text')
+    split_data = split_sections(plain_text)
+
+    # Normalize the 'job-info posted-pay-range' column
+    pay_data = normalize_pay(data['job-info posted-pay-range'])
+    # pay_low/pay_high stay hourly: ranges posted per week, month or year are left empty there
+    posted_hourly = pay_data['pay_period'].eq('hour').fillna(False).astype(bool)
+    pay_data['pay_low'] = pay_data['pay_min'].where(posted_hourly)
+    pay_data['pay_high'] = pay_data['pay_max'].where(posted_hourly)
+
+    # Calculate the difference between pay_high and pay_low
+    pay_data['pay_difference'] = (pay_data['pay_high'] - pay_data['pay_low']).round(2)
+
+    # Combine original data with the extracted fields, sections and pay
+    cleaned_data = pd.concat([data, job_info_df, plain_text, split_data, pay_data], axis=1)
+
+    # Extract the base filename (without extension) from the input file path
+    base_filename = os.path.splitext(os.path.basename(file_path))[0]
+
+    # Construct the output filename by appending '_parsed.xlsx'
+    output_filename = f"{base_filename}_parsed.xlsx"
+
+    # Save the combined data to Excel with the new filename
+    output_path = os.path.join(os.path.dirname(file_path), output_filename)
+    ParsedOutput.write_parsed(cleaned_data, output_path, ParsedOutput.parser_version(__file__, args.parser))
+
+    print(f"Combined structured data saved to '{output_path}'.")
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,20 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
-import time
+from bs4 import BeautifulSoup
 import os
+import sys
+import argparse
 from pathlib import Path
 from datetime import datetime  # Import datetime for timestamp generation
 
-def setup_driver():
-    """Initialize and configure the Selenium WebDriver."""
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    
-    # Suppress unnecessary browser logs
-    options.add_argument("--log-level=3")  # Only show fatal errors
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    
-    driver = webdriver.Chrome(options=options)
-    driver.implicitly_wait(2)
-    return driver
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon.DriverPool import add_pool_arguments, scrape_in_pool
+from ScrapeCommon.HttpFetch import add_fetch_argument, fetch_extract
+from ScrapeCommon import DriverFactory, DeltaCrawl, PageCache, HtmlArchive
 
 def has_section16(driver):
     """Check if the page uses section16 format using JavaScript."""
@@ -97,6 +90,98 @@ def scrape_pay_range(driver):
         print(f"Pay range not found: {str(e)[:200]}")
         return None
 
+def extract_sections_from_html(page_html):
+    """Run the section16 / AJD extraction on raw page HTML (None if neither container is present)"""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    record = {}
+
+    # Rendered text collapses whitespace, so do the same for the pay range
+    pay_range = soup.select_one("p.job-info.posted-pay-range")
+    if pay_range:
+        record['job-info posted-pay-range'] = " ".join(pay_range.get_text().split())
+
+    section16 = soup.select_one("div.section16.section-spacing")
+    if section16:
+        record['section16_html'] = str(section16).strip()
+        return record
+
+    overview = soup.select_one("div.ajd_overview__info")
+    job_container = soup.select_one("section.ajd_job-details")
+    if overview or job_container:
+        record['overview_html'] = str(overview).strip() if overview else None
+        record['job_details_html'] = str(job_container).strip() if job_container else None
+        return record
+
+    return None
+
+def fetch_row(url):
+    """Fast path: read the server-rendered page over plain HTTP"""
+    sections = fetch_extract(url, extract_sections_from_html, cache=page_cache)
+    if sections:
+        return {'url': url, **sections}
+    return None
+
+def archive_sections(record):
+    """Swap the HTML sections of a record for archive references (failure notes stay inline)"""
+    for column in ['section16_html', 'overview_html', 'job_details_html']:
+        html = record.get(column)
+        if isinstance(html, str) and html.startswith('<'):
+            record[column] = archive.put(html, key=f"{record['url']}#{column}")
+    return record
+
+def scrape_row(driver, row):
+    """Scrape one link row into a journal record"""
+    url = row['url']
+    print(f"Processing: {url}")
+    if args.fetch == 'http':
+        record = fetch_row(url)
+        if record:
+            return archive_sections(record)
+        print(f"Expected containers missing over HTTP, falling back to the browser: {url}")
+    record = {'url': url}
+    
+    try:
+        # Scrape job sections (this loads the page once for both sections and pay)
+        result = scrape_job_sections(driver, url)
+
+        # Scrape pay range
+        pay_range = scrape_pay_range(driver)
+        if pay_range:
+            record['job-info posted-pay-range'] = pay_range
+        
+        if result:
+            # Handle section16 result
+            if 'section16_html' in result:
+                record['section16_html'] = result['section16_html']
+            
+            # Handle AJD sections
+            elif 'overview_html' in result or 'job_details_html' in result:
+                record['overview_html'] = result.get('overview_html')
+                record['job_details_html'] = result.get('job_details_html')
+            
+            # Handle errors
+            elif 'error' in result:
+                record['section16_html'] = f"SCRAPE_FAILED: {result['error']}"
+        else:
+            record['section16_html'] = "SCRAPE_FAILED: No results"
+        
+    except Exception as e:
+        print(f"Critical error processing {url}: {str(e)[:200]}")
+        record['section16_html'] = f"CRITICAL_ERROR: {str(e)[:200]}"
+    
+    return archive_sections(record)
+
+parser = argparse.ArgumentParser(description="Scrape Dignity job descriptions for today's link file")
+add_pool_arguments(parser)
+add_fetch_argument(parser)
+DriverFactory.add_browser_arguments(parser)
+DeltaCrawl.add_delta_arguments(parser)
+PageCache.add_cache_arguments(parser)
+HtmlArchive.add_archive_argument(parser)
+args = parser.parse_args()
+page_cache = PageCache.PageCache.from_args(args, 'dignity')
+archive = HtmlArchive.for_args(args, 'dignity')
+
 # Configure paths
 parent_dir = Path(__file__).resolve().parent.parent.parent
 
@@ -109,75 +194,44 @@ input_path = parent_dir / "ScrapeLinks" / "DignityHospitals" / input_filename  #
 output_filename = f"DignityHospitals_{timestamp}_description.xlsx"  # Add "description" to the filename
 output_path = parent_dir / "ScrapeDescriptions" / "DignityHospitals" / output_filename  # Output file path
 
-# Initialize driver
-driver = setup_driver()
+DESCRIPTION_COLUMNS = ['section16_html', 'overview_html', 'job_details_html', 'job-info posted-pay-range']
+
+# Each processed row is journaled; the workbook is only written once at the end
+journal = CrawlJournal.for_output(output_path)
+
+# Prepare DataFrame
+if os.path.exists(output_path):
+    df = pd.read_excel(output_path)  # Updated to read Excel
+    for col in DESCRIPTION_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+else:
+    df = pd.read_excel(input_path)  # Updated to read Excel
+    df['section16_html'] = None
+    df['overview_html'] = None
+    df['job_details_html'] = None
+    df['job-info posted-pay-range'] = None  # New column for pay range
+    # Only fetch new/changed postings; unchanged ones keep yesterday's sections
+    df = DeltaCrawl.carry_forward(df, output_path, 'url', DESCRIPTION_COLUMNS, args.full, args.revalidate)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+# Resume: pick up everything an interrupted run (or any pool worker) already journaled
+df = journal.to_dataframe(base=df, key='url')
+pending = df[df['section16_html'].isna() & df['overview_html'].isna()]
 
 try:
-    # Prepare DataFrame
-    if os.path.exists(output_path):
-        df = pd.read_excel(output_path)  # Updated to read Excel
-        for col in ['section16_html', 'overview_html', 'job_details_html', 'job-info posted-pay-range']:
-            if col not in df.columns:
-                df[col] = None
-    else:
-        df = pd.read_excel(input_path)  # Updated to read Excel
-        df['section16_html'] = None
-        df['overview_html'] = None
-        df['job_details_html'] = None
-        df['job-info posted-pay-range'] = None  # New column for pay range
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Process rows with individual error handling
-    processed = 0
-    for index, row in df.iterrows():
-        if pd.isna(row['section16_html']) and pd.isna(row['overview_html']):
-            url = row['url']
-            print(f"Processing {index}: {url}")
-            
-            try:
-                driver.get(url)
-                
-                # Wait for page to load
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState === 'complete'")
-                )
-
-                # Scrape pay range
-                pay_range = scrape_pay_range(driver)
-                if pay_range:
-                    df.at[index, 'job-info posted-pay-range'] = pay_range
-
-                # Scrape job sections
-                result = scrape_job_sections(driver, url)
-                
-                if result:
-                    # Handle section16 result
-                    if 'section16_html' in result:
-                        df.at[index, 'section16_html'] = result['section16_html']
-                        processed += 1
-                    
-                    # Handle AJD sections
-                    elif 'overview_html' in result or 'job_details_html' in result:
-                        df.at[index, 'overview_html'] = result.get('overview_html')
-                        df.at[index, 'job_details_html'] = result.get('job_details_html')
-                        processed += 1
-                    
-                    # Handle errors
-                    elif 'error' in result:
-                        df.at[index, 'section16_html'] = f"SCRAPE_FAILED: {result['error']}"
-                else:
-                    df.at[index, 'section16_html'] = "SCRAPE_FAILED: No results"
-                
-                # Save after each processed row
-                df.to_excel(output_path, index=False)  # Updated to write Excel
-                time.sleep(0.5)  # Reduced sleep time
-                
-            except Exception as e:
-                print(f"Critical error processing row {index}: {str(e)[:200]}")
-                df.at[index, 'section16_html'] = f"CRITICAL_ERROR: {str(e)[:200]}"
-                df.to_excel(output_path, index=False)  # Updated to write Excel
-
-    print(f"\nCompleted! Processed {processed} new records")
+    # Shard the remaining URLs across parallel browsers
+    setup_driver = DriverFactory.driver_factory(args, implicit_wait=2)
+    records = scrape_in_pool(pending.to_dict('records'), scrape_row, setup_driver, journal,
+                             key='url', workers=args.workers, delay=args.delay)
+    print(f"\nCompleted! Processed {len(records)} of {len(pending)} pending records")
 
 finally:
-    driver.quit()
+    # Write the workbook once from the journal, in input order
+    journal.compact(output_path, base=df, key='url')
+    DriverFactory.report()
+    archive.report()
+    archive.close()
+    if page_cache:
+        page_cache.report()
+        page_cache.close()
@@ -1,86 +1,62 @@
+import argparse
 import pandas as pd
-from bs4 import BeautifulSoup
 from datetime import datetime
-
-# Get the current date in the required format (e.g., "03182025" for March 18, 2025)
-current_date = datetime.now().strftime('%m%d%Y')
-
-# Construct the input filename dynamically
-input_filename = f'kpjobs_{current_date}_description.xlsx'
-
-# Load the Excel file
-df = pd.read_excel(input_filename)
-
-# Function to extract job details from the HTML
-def extract_job_details(html):
-    if pd.isna(html):  # Skip NaN values
-        return {}
-
-    soup = BeautifulSoup(html, 'html.parser')
-    details = {}
-
-    # Extract from <div class="ats-extras">
-    ats_extras = soup.find('div', class_='ats-extras')
-    if ats_extras:
-        for span in ats_extras.find_all('span', class_='job-info'):
-            key = span.find('strong').get_text(strip=True).replace(':', '').strip()
-            value = span.get_text(strip=True).replace(span.find('strong').get_text(strip=True), '').strip()
-            details[key.lower().replace(' ', '_')] = value
-
-    # Extract from <div class="job-description__info-wrap">
-    info_wrap = soup.find('div', class_='job-description__info-wrap')
-    if info_wrap:
-        for span in info_wrap.find_all('span', class_='job-info'):
-            key = span.find('b').get_text(strip=True).lower().replace(' ', '_')
-            value = span.get_text(strip=True).replace(span.find('b').get_text(strip=True), '').strip()
-            details[key] = value
-
-    return details
-
-# Apply the function to each row in the DataFrame
-parsed_data = df['scraped_html'].apply(lambda x: extract_job_details(x) if pd.notna(x) else {}).apply(pd.Series)
-
-# Concatenate the original DataFrame with the parsed data
-df = pd.concat([df, parsed_data], axis=1)
-
-# Function to parse the "pay_range" column
-def parse_pay_range(pay_range):
-    if pd.isna(pay_range):
-        return None, None, None
-
-    pay_range = pay_range.strip()
-    if ' - ' in pay_range:
-        pay_parts = pay_range.split(' - ')
-        pay_low = pay_parts[0].replace('$', '').replace(',', '').strip()
-        pay_high = pay_parts[1].split('/')[0].replace('$', '').replace(',', '').strip()
-
-        try:
-            pay_low = float(pay_low)
-            pay_high = float(pay_high)
-        except ValueError:
-            return None, None, None
-
-        if (pay_low > 10000 or pay_high > 10000):
-            pay_low = pay_low / 2080
-            pay_high = pay_high / 2080
-
-        pay_low = round(pay_low, 2)
-        pay_high = round(pay_high, 2)
-        pay_spread = round(pay_high - pay_low, 2)
-
-        return pay_low, pay_high, pay_spread
-    return None, None, None
-
-# Apply the pay_range parsing function
-df[['hourlypay_low', 'hourlypay_high', 'hourlypay_spread']] = df['pay_range'].apply(parse_pay_range).apply(pd.Series)
-
-# Drop the "scraped_html" column
-df.drop(columns=['scraped_html'], inplace=True)
-
-# Construct the output filename by appending "_parsed" to the input filename
-output_filename = input_filename.replace('.xlsx', '_parsed.xlsx')
-
-# Save the updated DataFrame to the new Excel file
-df.to_excel(output_filename, index=False)
-
-print(f"File saved as {output_filename}")
+import sys
+from pathlib import Path
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon import HtmlArchive, HtmlParse, ParallelParse, ParsedOutput, WorkbookStream
+from ScrapeCommon.DescriptionFields import kaiser_job_details
+from ScrapeCommon.PayNormalize import PAY_COLUMNS, normalize_pay
+
+def main():
+    # Get the current date in the required format (e.g., "03182025" for March 18, 2025)
+    current_date = datetime.now().strftime('%m%d%Y')
+
+    parser = argparse.ArgumentParser(description="Parse a Kaiser description workbook")
+    parser.add_argument("input", nargs="?", default=f'kpjobs_{current_date}_description.xlsx',
+                        help="Description workbook to parse (default: today's, %(default)s)")
+    HtmlParse.add_parser_argument(parser)
+    ParallelParse.add_parallel_arguments(parser)
+    WorkbookStream.add_batch_argument(parser)
+    args = parser.parse_args()
+    backend = HtmlParse.get_backend(args.parser)
+    input_filename = args.input
+
+    # Load the Excel file, --batch-size rows at a time: each batch's HTML is parsed and dropped
+    # before the next is read, so only the parsed fields of the whole file are held
+    frames = []
+    details = []
+    for batch in WorkbookStream.iter_batches(input_filename, batch_size=args.batch_size):
+        # scraped_html holds archive references (older workbooks hold the HTML itself)
+        html = HtmlArchive.resolve_column(batch['scraped_html'])
+
+        # Extract the job details from each row's HTML (in worker processes with --workers)
+        details.extend(ParallelParse.map_rows(kaiser_job_details, zip(html), backend,
+                                              workers=args.workers, chunk_size=args.chunk_size))
+
+        # Drop the "scraped_html" column
+        frames.append(batch.drop(columns=['scraped_html']))
+    df = pd.concat(frames) if len(frames) > 1 else frames[0]
+    parsed_data = pd.Series(details, index=df.index, dtype=object).apply(pd.Series)
+
+    # Concatenate the original DataFrame with the parsed data
+    df = pd.concat([df, parsed_data], axis=1)
+
+    # Normalize the pay_range column (hourly figures, as the workbook has always had)
+    df[PAY_COLUMNS] = normalize_pay(df['pay_range'])
+    df['hourlypay_low'] = df['hourly_min']
+    df['hourlypay_high'] = df['hourly_max']
+    df['hourlypay_spread'] = (df['hourly_max'] - df['hourly_min']).round(2)
+
+    # Construct the output filename by appending "_parsed" to the input filename
+    output_filename = input_filename.replace('.xlsx', '_parsed.xlsx')
+
+    # Save the updated DataFrame to the new Excel file
+    ParsedOutput.write_parsed(df, output_filename, ParsedOutput.parser_version(__file__, args.parser))
+
+    print(f"File saved as {output_filename}")
+
+if __name__ == '__main__':
+    main()
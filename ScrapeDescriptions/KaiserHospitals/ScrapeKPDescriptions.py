@@ -1,14 +1,22 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import pandas as pd
-import time
+from bs4 import BeautifulSoup
 import re
 import os
+import sys
+import argparse
 from pathlib import Path
 from datetime import datetime  # Import datetime for timestamp generation
 
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon.DriverPool import add_pool_arguments, scrape_in_pool
+from ScrapeCommon.HttpFetch import add_fetch_argument, fetch_extract
+from ScrapeCommon import DriverFactory, DeltaCrawl, PageCache, HtmlArchive
+
 def clean_html_content(html):
     """Remove extra newlines and spaces from HTML content while preserving structure."""
     # Remove leading and trailing whitespace
@@ -48,6 +56,40 @@ def scrape_job_html(driver, url):
         print(f"Error scraping {url}: {str(e)}")
         return None
 
+def extract_job_html(page_html):
+    """Run the job-left extraction on raw page HTML (None if the container is missing)"""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    job_left = soup.select_one("div.job-left")
+    if job_left is None:
+        return None
+    return clean_html_content(job_left.decode_contents())
+
+def scrape_row(driver, row):
+    """Scrape one link row into a journal record (None leaves it for the next run)"""
+    url = row['URL']  # Assuming the column with URLs is named 'URL'
+    if args.fetch == 'http':
+        # Fall back to the full browser only when the plain page lacks the container
+        scraped_html = fetch_extract(url, extract_job_html, lambda: scrape_job_html(driver, url), cache=page_cache)
+    else:
+        scraped_html = scrape_job_html(driver, url)
+    if scraped_html:
+        print(f"Scraped and saved HTML for URL: {url}")
+        # The workbook keeps a reference; the HTML itself goes to the compressed archive
+        return {'URL': url, 'scraped_html': archive.put(scraped_html, key=url)}
+    print(f"Failed to scrape HTML for URL: {url}")
+    return None
+
+parser = argparse.ArgumentParser(description="Scrape Kaiser job descriptions for today's link file")
+add_pool_arguments(parser)
+add_fetch_argument(parser)
+DriverFactory.add_browser_arguments(parser)
+DeltaCrawl.add_delta_arguments(parser)
+PageCache.add_cache_arguments(parser)
+HtmlArchive.add_archive_argument(parser)
+args = parser.parse_args()
+page_cache = PageCache.PageCache.from_args(args, 'kaiser')
+archive = HtmlArchive.for_args(args, 'kaiser')
+
 # 👇 Calculate paths relative to project root
 parent_dir = Path(__file__).resolve().parent.parent.parent  # Goes up to C:\Scrape
 
@@ -60,8 +102,8 @@ input_path = parent_dir / "ScrapeLinks" / "KaiserHospitals" / input_filename  #
 output_filename = f"kpjobs_{timestamp}_description.xlsx"  # Add "description" to the filename (now .xlsx)
 output_path = parent_dir / "ScrapeDescriptions" / "KaiserHospitals" / output_filename  # Output file path
 
-# Initialize the Selenium WebDriver
-driver = webdriver.Chrome()  # or whichever driver you are using
+# Scraped HTML is journaled one record per URL; the workbook is only written at the end
+journal = CrawlJournal.for_output(output_path)
 
 # Check if the output file exists
 if os.path.exists(output_path):
@@ -75,21 +117,24 @@ else:
     # Load from input Excel file
     df = pd.read_excel(input_path)  # Updated to read Excel
     df['scraped_html'] = None
+    # Only fetch new/changed postings; unchanged ones keep yesterday's HTML
+    df = DeltaCrawl.carry_forward(df, output_path, 'URL', ['scraped_html'], args.full, args.revalidate)
 
-# Iterate through each row
-total_rows = len(df)  # Total number of rows in the DataFrame
-for index, row in df.iterrows():
-    if pd.isna(row['scraped_html']):  # Check if 'scraped_html' is empty
-        url = row['URL']  # Assuming the column with URLs is named 'URL'
-        scraped_html = scrape_job_html(driver, url)
-        if scraped_html:
-            df.at[index, 'scraped_html'] = scraped_html
-            df.to_excel(output_path, index=False)  # Updated to write Excel
-            print(f"Scraped and saved HTML for URL: {url} ({index + 1} out of {total_rows})")
-        else:
-            print(f"Failed to scrape HTML for URL: {url} ({index + 1} out of {total_rows})")
-    else:
-        print(f"Skipping URL: {row['URL']} (Data already present in 'scraped_html') ({index + 1} out of {total_rows})")
+# Resume: pick up everything an interrupted run (or any pool worker) already journaled
+df = journal.to_dataframe(base=df, key='URL')
+pending = df[df['scraped_html'].isna()]
+print(f"Skipping {len(df) - len(pending)} of {len(df)} URLs (data already present in 'scraped_html')")
 
-# Close the WebDriver
-driver.quit()
+try:
+    # Shard the remaining URLs across parallel browsers, one lean Chrome each
+    scrape_in_pool(pending.to_dict('records'), scrape_row, DriverFactory.driver_factory(args), journal,
+                   key='URL', workers=args.workers, delay=args.delay)
+finally:
+    # Write the workbook once from the journal, in input order
+    journal.compact(output_path, base=df, key='URL')
+    DriverFactory.report()
+    archive.report()
+    archive.close()
+    if page_cache:
+        page_cache.report()
+        page_cache.close()
@@ -1,42 +1,25 @@
 import os
+import sys
+import argparse
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from datetime import datetime
-import time
+from pathlib import Path
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon.DriverPool import add_pool_arguments, scrape_in_pool
+from ScrapeCommon import DriverFactory, DeltaCrawl, HtmlArchive
 
 # Constants
-MAX_CELL_SIZE = 30000  # Conservative limit for Excel cell size
 SCRAPE_DIR = r"C:\Scrape\ScrapeLinks\UCSystems"
 OUTPUT_DIR = r"C:\Scrape\ScrapeDescriptions\UCSystems"
 
-def split_html_for_excel(html):
-    """Split HTML content into chunks that fit in Excel cells"""
-    if not html or not isinstance(html, str):
-        return [""]
-    
-    chunks = []
-    for i in range(0, len(html), MAX_CELL_SIZE):
-        chunks.append(html[i:i+MAX_CELL_SIZE])
-    return chunks
-
-def setup_driver():
-    """Configure and return Chrome WebDriver"""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.set_page_load_timeout(30)
-    return driver
-
 def get_input_file():
     """Find and select the appropriate input file"""
     today = datetime.now().strftime("%m%d%Y")
@@ -55,8 +38,8 @@ def get_input_file():
     selection = int(input("Enter the number of the file to use: ")) - 1
     return os.path.join(SCRAPE_DIR, matching_files[selection])
 
-def initialize_output_df(input_file, output_path):
-    """Initialize or load existing output dataframe"""
+def initialize_output_df(input_file, output_path, full=False, revalidate=0.05):
+    """Initialize or load existing output dataframe (a new one starts with the unchanged postings carried forward)"""
     if os.path.exists(output_path):
         print(f"Loading existing output file: {output_path}")
         existing_df = pd.read_excel(output_path)
@@ -65,14 +48,18 @@ def initialize_output_df(input_file, output_path):
     
     print("Creating new output file")
     original_df = pd.read_excel(input_file)
-    processed_urls = set()
     
-    # Create output dataframe with columns for HTML chunks
-    base_columns = list(original_df.columns) + ['Status', 'Final URL']
-    html_columns = [f'HTML_{i+1}' for i in range(20)]  # Support up to 300,000 characters
-    output_columns = base_columns + html_columns
+    # Page HTML lives in the archive and the HTML column holds its reference (or the HTML, with --inline-html)
+    output_columns = list(original_df.columns) + ['Status', 'Final URL', 'HTML']
+    
+    # Unchanged postings keep yesterday's page HTML and count as already processed
+    links = original_df.reindex(columns=output_columns)
+    links = DeltaCrawl.carry_forward(links, output_path, 'Job Link', ['Status', 'Final URL', 'HTML'],
+                                     full, revalidate)
+    carried = links[links['Status'].notna()].reset_index(drop=True)
+    processed_urls = set(carried['Job Link'])
     
-    return pd.DataFrame(columns=output_columns), processed_urls
+    return carried, processed_urls
 
 def process_url(driver, job_link, job_title):
     """Process a single URL and return results"""
@@ -116,59 +103,76 @@ def process_url(driver, job_link, job_title):
     
     return result
 
+def scrape_row(driver, row):
+    """Process one link row and return its output row for the journal"""
+    job_title = row['Job Title']
+    job_link = row['Job Link']
+    print(f"Processing: {str(job_title)[:50]}...")
+    result = process_url(driver, job_link, job_title)
+    
+    # Prepare new row data
+    new_row = dict(row)
+    new_row.update({
+        'Status': result['Status'],
+        'Final URL': result['Final URL'],
+        'HTML': archive.put(result['HTML'], key=job_link) if result['HTML'] else ''
+    })
+    
+    return new_row
+
+# Set in main(): the UC archive, or the workbook itself with --inline-html
+archive = None
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape UC job description pages for today's link file")
+    add_pool_arguments(parser)
+    DriverFactory.add_browser_arguments(parser)
+    DeltaCrawl.add_delta_arguments(parser)
+    HtmlArchive.add_archive_argument(parser)
+    args = parser.parse_args()
+    global archive
+    archive = HtmlArchive.for_args(args, 'uc')
+    
     input_file = get_input_file()
     print(f"Using input file: {input_file}")
     
     today = datetime.now().strftime("%m%d%Y")
     output_path = os.path.join(OUTPUT_DIR, f"ucjobs_html_{today}.xlsx")
     
-    output_df, processed_urls = initialize_output_df(input_file, output_path)
+    output_df, processed_urls = initialize_output_df(input_file, output_path, args.full, args.revalidate)
     original_df = pd.read_excel(input_file)
-    driver = setup_driver()
+    
+    # Each processed URL is journaled; the workbook is only written once at the end
+    journal = CrawlJournal.for_output(output_path)
+    
+    pending = []
+    for index, row in original_df.iterrows():
+        job_title = row['Job Title']
+        job_link = row['Job Link']
+        
+        if pd.isna(job_link) or not isinstance(job_link, str) or not job_link.startswith('http'):
+            print(f"Skipping invalid link for: {job_title}")
+            continue
+        
+        if job_link in processed_urls:
+            print(f"Skipping already processed URL: {job_link}")
+            continue
+        
+        pending.append(row.to_dict())
     
     try:
-        for index, row in original_df.iterrows():
-            job_title = row['Job Title']
-            job_link = row['Job Link']
-            
-            if pd.isna(job_link) or not isinstance(job_link, str) or not job_link.startswith('http'):
-                print(f"Skipping invalid link for: {job_title}")
-                continue
-            
-            if job_link in processed_urls:
-                print(f"Skipping already processed URL: {job_link}")
-                continue
-            
-            print(f"Processing {index + 1}/{len(original_df)}: {job_title[:50]}...")
-            result = process_url(driver, job_link, job_title)
-            
-            # Prepare new row data
-            new_row = row.to_dict()
-            new_row.update({
-                'Status': result['Status'],
-                'Final URL': result['Final URL']
-            })
-            
-            # Split HTML into chunks and add to columns
-            html_chunks = split_html_for_excel(result['HTML'])
-            for i, chunk in enumerate(html_chunks):
-                if i < 20:  # Only keep first 10 chunks
-                    new_row[f'HTML_{i+1}'] = chunk
-            
-            # Add to output dataframe
-            output_df = pd.concat([output_df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            # Save progress after each URL
-            output_df.to_excel(output_path, index=False)
-            processed_urls.add(job_link)
-            
-            time.sleep(1)
-            
+        # Shard the remaining URLs across parallel browsers
+        setup_driver = DriverFactory.driver_factory(args, page_load_timeout=30)
+        scrape_in_pool(pending, scrape_row, setup_driver, journal,
+                       key='Job Link', workers=args.workers, delay=args.delay)
     finally:
-        driver.quit()
-        output_df.to_excel(output_path, index=False)
+        # Write the workbook once from the journal, in input order
+        journal.compact(output_path, base=output_df, key='Job Link', columns=list(output_df.columns),
+                        order=list(original_df['Job Link']))
         print(f"Processing complete. Results saved to: {output_path}")
+        DriverFactory.report()
+        archive.report()
+        archive.close()
 
 if __name__ == "__main__":
     main()
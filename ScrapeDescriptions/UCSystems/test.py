@@ -1,17 +1,43 @@
+import argparse
+import sys
+from pathlib import Path
+
 import pandas as pd
-from bs4 import BeautifulSoup
 
-def clean_html_in_columns(output_path):
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon import HtmlArchive, HtmlParse
+from ScrapeCommon.DescriptionFields import page_text
+from ScrapeCommon.PayNormalize import PAY_COLUMNS, normalize_pay
+
+def page_html(row, columns):
+    """Page HTML for a row: resolved from the archive reference in 'HTML', or rebuilt
+    from the HTML_1..HTML_20 chunk columns (L to AE) of older workbooks"""
+    if 'HTML' in columns:
+        return HtmlArchive.resolve(row['HTML']) if pd.notna(row['HTML']) else ''
+    return ''.join([str(row[col]) for col in columns[11:32] if pd.notna(row[col])])
+
+def clean_html_in_columns(output_path, backend):
     # Load the Excel file into a pandas DataFrame
     df = pd.read_excel(output_path)
+    archive = HtmlArchive.open_archive('uc')
+    texts = pd.Series('', index=df.index, dtype=object)
     
-    # Iterate through rows to rebuild HTML from columns L to AE
+    # Iterate through rows to rebuild the HTML
     for index, row in df.iterrows():
-        # Rebuild the HTML content by concatenating columns L to AE (skip NaN values)
-        html_content = ''.join([str(row[col]) for col in df.columns[11:32] if pd.notna(row[col])])
+        html_content = page_html(row, df.columns) or ''
 
-        # Use BeautifulSoup to parse and strip HTML
-        cleaned_html = BeautifulSoup(html_content, 'lxml').get_text()
+        # Parse and strip HTML
+        cleaned_html = page_text(html_content, backend)
+        texts[index] = cleaned_html
+
+        if 'HTML' in df.columns:
+            # Archive the cleaned text and point the row at it (inline HTML is replaced inline)
+            if HtmlArchive.is_ref(row['HTML']):
+                df.at[index, 'HTML'] = archive.put(cleaned_html, key=f"{row['Job Link']}#text")
+            else:
+                df.at[index, 'HTML'] = cleaned_html
+            continue
 
         # Reinsert the cleaned HTML back into the corresponding columns (L to AE)
         html_chunks = [cleaned_html[i:i+30000] for i in range(0, len(cleaned_html), 30000)]  # Split into chunks if needed
@@ -19,9 +45,18 @@ def clean_html_in_columns(output_path):
             if i < 20:  # Limit to 20 chunks to fit within the HTML columns
                 df.at[index, f'HTML_{i+1}'] = chunk  # Reinsert cleaned HTML chunks into the columns
 
+    # Normalize the pay posted in each page's text
+    df[PAY_COLUMNS] = normalize_pay(texts)
+
     # Save the updated DataFrame back to Excel
     df.to_excel(output_path, index=False)
+    archive.close()
     print(f"HTML cleaned and file saved to: {output_path}")
 
-# Example usage:
-clean_html_in_columns(r"C:\Scrape\ScrapeDescriptions\UCSystems\test.xlsx")
+parser = argparse.ArgumentParser(description="Strip the HTML in a UC description workbook down to its text")
+parser.add_argument("path", nargs="?", default=r"C:\Scrape\ScrapeDescriptions\UCSystems\test.xlsx")
+HtmlParse.add_parser_argument(parser)
+args = parser.parse_args()
+# BeautifulSoup reads these pages with lxml's parser, as it always has
+options = {'features': 'lxml'} if args.parser == 'bs4' else {}
+clean_html_in_columns(args.path, HtmlParse.get_backend(args.parser, **options))
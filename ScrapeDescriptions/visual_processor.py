@@ -7,7 +7,10 @@ def process_file(filepath):
     print(f"Processing {filepath}...")
     
     # Load and standardize data
-    df = pd.read_excel(filepath) if str(filepath).endswith('.xlsx') else pd.read_csv(filepath)
+    if str(filepath).endswith('.parquet'):
+        df = pd.read_parquet(filepath)
+    else:
+        df = pd.read_excel(filepath) if str(filepath).endswith('.xlsx') else pd.read_csv(filepath)
     
     # Generate trending dashboard
     output_html = f"dashboard_{Path(filepath).stem}.html"
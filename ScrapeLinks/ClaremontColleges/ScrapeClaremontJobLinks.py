@@ -1,18 +1,19 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import pandas as pd
-import time
 import os
+import sys
+import argparse
+from pathlib import Path
 from datetime import datetime
 
-# Configure Chrome options
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon import Workday
+from ScrapeCommon.BulkExtract import Field, extract_rows
+from ScrapeCommon import PageReady, DriverFactory, SnapshotStore
 
 CAREER_PAGES = [
     "https://theclaremontcolleges.wd1.myworkdayjobs.com/TCCS_Careers",
@@ -25,19 +26,19 @@ CAREER_PAGES = [
     "https://theclaremontcolleges.wd1.myworkdayjobs.com/POM_Careers"
 ]
 
-def safe_find(parent, selector, default=None):
-    """Safely find element with default return"""
-    try:
-        elements = parent.find_elements(By.CSS_SELECTOR, selector)
-        return elements[0].text if elements else default
-    except Exception as e:
-        print(f"Error in safe_find: {str(e)[:100]}...")
-        return default
+# Fields of one job card, read for the whole page in a single round trip
+JOB_FIELDS = {
+    'title': Field('a[data-automation-id="jobTitle"]'),
+    'url': Field('a[data-automation-id="jobTitle"]', 'href'),
+    'location': Field('div[data-automation-id="locations"] dd'),
+    'time_type': Field('div[data-automation-id="time"] dd'),
+    'posted': Field('div[data-automation-id="postedOn"] dd'),
+    'requisition_id': Field('li.css-h2nt8k'),
+}
 
-def setup_driver():
+def setup_driver(args):
     print("Setting up Chrome driver...")
-    driver = webdriver.Chrome(options=options)
-    driver.implicitly_wait(3)
+    driver = DriverFactory.driver_factory(args, implicit_wait=3)()
     print("Driver setup complete.")
     return driver
 
@@ -55,48 +56,29 @@ def get_page_count(driver):
 def process_page(driver, url):
     """Process a single page of results"""
     print(f"Processing page: {url}")
+    # Title and URL are critical; cards without a title link are skipped
+    cards = extract_rows(driver, "li.css-1q2dra3", JOB_FIELDS, required=('title', 'url'))
+    print(f"Found {len(cards)} job containers on this page.")
+
     jobs = []
-    job_containers = driver.find_elements(By.CSS_SELECTOR, "li.css-1q2dra3")
-    print(f"Found {len(job_containers)} job containers on this page.")
-    
-    for index, job in enumerate(job_containers):
-        try:
-            print(f"Processing job {index + 1} of {len(job_containers)}...")
-            
-            # Extract title and URL first as they're critical
-            title_elem = job.find_element(By.CSS_SELECTOR, 'a[data-automation-id="jobTitle"]')
-            title = title_elem.text
-            job_url = title_elem.get_attribute('href')
-            print(f"Job title: {title}")
-            
-            # Use safe extraction for other elements
-            location = safe_find(job, 'div[data-automation-id="locations"] dd')
-            time_type = safe_find(job, 'div[data-automation-id="time"] dd')
-            posted = safe_find(job, 'div[data-automation-id="postedOn"] dd')
-            req_id = safe_find(job, 'li.css-h2nt8k')
-            
-            # Get current timestamp
-            now = datetime.now()
-            job_data = {
-                'scrape_date': now.strftime('%Y-%m-%d'),
-                'title': title,
-                'url': job_url,
-                'source_page': url,
-                'department': url.split('/')[-1].replace('_Careers', '').replace('_Staff', ''),
-                'location': location,
-                'time_type': time_type,
-                'posted': posted,
-                'requisition_id': req_id,
-                'scrape_time': now.strftime('%H:%M:%S'),
-                'scrape_day': now.strftime('%a')
-            }
-            jobs.append(job_data)
-            print(f"Job {index + 1} processed successfully.")
-            
-        except Exception as job_error:
-            print(f"Error processing job {index + 1} on {url}: {str(job_error)[:100]}...")
-            continue
-    
+    for card in cards:
+        # Get current timestamp
+        now = datetime.now()
+        job_data = {
+            'scrape_date': now.strftime('%Y-%m-%d'),
+            'title': card['title'],
+            'url': card['url'],
+            'source_page': url,
+            'department': url.split('/')[-1].replace('_Careers', '').replace('_Staff', ''),
+            'location': card['location'],
+            'time_type': card['time_type'],
+            'posted': card['posted'],
+            'requisition_id': card['requisition_id'],
+            'scrape_time': now.strftime('%H:%M:%S'),
+            'scrape_day': now.strftime('%a')
+        }
+        jobs.append(job_data)
+
     print(f"Finished processing {len(jobs)} jobs on this page.")
     return jobs
 
@@ -115,10 +97,16 @@ def wait_for_page_change(driver, target_page):
         print(f"Timeout waiting for page {target_page} to load.")
         return False
 
-def scrape_jobs(driver):
+def scrape_jobs(driver, journal):
+    """Scrape every career page, journaling each board's jobs once it is complete"""
     all_jobs = []
+    finished_pages = journal.keys('source_page')
     
     for url in CAREER_PAGES:
+        if url in finished_pages:
+            print(f"\nSkipping already journaled: {url}")
+            continue
+        board_jobs = []
         try:
             print(f"\nProcessing: {url}")
             driver.get(url)
@@ -141,7 +129,7 @@ def scrape_jobs(driver):
                 # Process current page
                 print("Processing jobs on current page...")
                 page_jobs = process_page(driver, url)
-                all_jobs.extend(page_jobs)
+                board_jobs.extend(page_jobs)
                 print(f"Found {len(page_jobs)} jobs on current page")
                 
                 # If not last page, click next page button
@@ -158,16 +146,15 @@ def scrape_jobs(driver):
                         print("Scrolling to the next page button...")
                         driver.execute_script("arguments[0].scrollIntoView();", next_button)
                         print("Clicking the next page button...")
-                        driver.execute_script("arguments[0].click();", next_button)
+                        # Armed before the click, so the new listings can't be missed
+                        with PageReady.ready_after(driver, "claremont.next page listings", "li.css-1q2dra3",
+                                                   quiet=0.3, timeout=10, network=True, legacy=1.5):
+                            driver.execute_script("arguments[0].click();", next_button)
                         
                         # Wait for the new page to become active
                         if not wait_for_page_change(driver, page_num + 1):
                             print(f"Failed to load page {page_num + 1}")
                             break
-                            
-                        # Additional wait for job listings to load
-                        print("Waiting for job listings to load on the new page...")
-                        time.sleep(1.5)
                         
                     except Exception as e:
                         print(f"Error navigating to page {page_num + 1}: {str(e)[:100]}...")
@@ -175,13 +162,32 @@ def scrape_jobs(driver):
                     
         except TimeoutException:
             print(f"Timeout loading {url} - possible empty job list")
-            continue
         except Exception as page_error:
             print(f"Critical error with {url}: {str(page_error)[:100]}...")
-            continue
+        
+        # Journal whatever this board produced, one record per job
+        journal.extend(board_jobs)
+        all_jobs.extend(board_jobs)
             
     return all_jobs
 
+def scrape_jobs_api(journal, workers=8):
+    """Fetch every board through the Workday JSON API instead of clicking through the UI.
+
+    Returns {career page URL: error} of the boards that failed; every other board is
+    journaled as soon as it is fetched, so a re-run only fetches the failed ones.
+    """
+    finished_pages = journal.keys('source_page')
+    pending_pages = [url for url in CAREER_PAGES if url not in finished_pages]
+    for url in CAREER_PAGES:
+        if url in finished_pages:
+            print(f"Skipping already journaled: {url}")
+    
+    # Journal each board's jobs the moment the board is complete, one record per job
+    _, failed = Workday.fetch_listings(pending_pages, workers=workers,
+                                       on_board=lambda url, board_jobs: journal.extend(board_jobs))
+    return failed
+
 def validate_data(df):
     """Simple validation method to check if the scraped data meets certain criteria"""
     print("Validating scraped data...")
@@ -218,12 +224,35 @@ def generate_filename(base_name):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect Claremont Colleges job links from every Workday board")
+    parser.add_argument("--mode", choices=["api", "browser"], default="api",
+                        help="'api' calls the Workday JSON endpoints directly, 'browser' drives the UI (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent API requests in api mode (default: %(default)s)")
+    args = parser.parse_args()
+    
     print("Starting script...")
-    driver = setup_driver()
+    # Generate unique filename (an interrupted run resumes from its journal)
+    base_name = "ClaremontCollegesJobs"
+    filename = generate_filename(base_name)
+    journal = CrawlJournal.for_output(filename)
+    
+    # The browser is only needed when driving the UI
+    driver = setup_driver(args) if args.mode == "browser" else None
     try:
         print("Scraping jobs...")
-        jobs = scrape_jobs(driver)
-        df = pd.DataFrame(jobs)
+        if args.mode == "api":
+            failed = scrape_jobs_api(journal, workers=args.workers)
+            if failed:
+                # Leave the workbook unwritten so a re-run resumes from the journal with just these boards
+                print(f"\n{len(failed)} of {len(CAREER_PAGES)} boards failed; re-run to fetch them:")
+                for url, error in failed.items():
+                    print(f"  {url}: {error}")
+                return
+        else:
+            scrape_jobs(driver, journal)
+        journal.close()
+        df = journal.to_dataframe()
         
         # Clean department names
         print("Cleaning department names...")
@@ -241,19 +270,20 @@ def main():
         # Validate the data
         validate_data(df)
         
-        # Generate unique filename
-        base_name = "ClaremontCollegesJobs"
-        filename = generate_filename(base_name)
-        
         # Save to Excel
         print("Saving data to Excel...")
         df.to_excel(filename, index=False, engine="openpyxl")  # Save as .xlsx
+        SnapshotStore.write_for_output(filename, df)
         print(f"\nSuccess! Saved {len(df)} jobs to '{filename}'. Missing data counts:")
         print(df.isnull().sum())
         
     finally:
-        print("Quitting driver...")
-        driver.quit()
+        if driver:
+            print("Quitting driver...")
+            driver.quit()
+            PageReady.report()
+            DriverFactory.report()
+        journal.close()
         print("Script execution complete.")
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -6,24 +5,41 @@ import time
 from datetime import datetime
 import signal
 import sys
+import argparse
+from pathlib import Path
+from urllib.parse import urljoin
 import pandas as pd  # Add pandas for Excel handling
 
-# Initialize WebDriver
-driver = webdriver.Chrome()
-driver.maximize_window()
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon import SearchResults
+from ScrapeCommon.BulkExtract import Field, extract_rows
+from ScrapeCommon import PageReady, DriverFactory, SnapshotStore
+
+# WebDriver is only started for the browser crawl (see __main__)
+driver = None
 
 # Global variable for data persistence
 ALL_JOBS = []
 CURRENT_PAGE = 1
 FILENAME = ""
+JOURNAL = None
 
 # Add these new functions at the top with other function definitions
 def load_existing_data(filename):
     """Load existing jobs to avoid duplicates when restarting"""
     try:
+        jobs = JOURNAL.read()
+        if jobs:
+            print(f"Loaded {len(jobs)} existing jobs from {JOURNAL.path.name}")
+            return jobs
         df = pd.read_excel(filename)
         print(f"Loaded {len(df)} existing jobs from {filename}")
-        return df.to_dict('records')
+        # Seed the journal so it stays the single source of truth from here on
+        jobs = df.to_dict('records')
+        JOURNAL.extend(jobs)
+        return jobs
     except FileNotFoundError:
         print("No existing data file found - starting fresh")
         return []
@@ -60,7 +76,7 @@ def create_filename():
 
 # Modify the save_to_excel function to include progress tracking
 def save_to_excel(jobs):
-    """Save data to Excel with progress tracking"""
+    """Compact the journal into the Excel workbook with progress tracking"""
     if not jobs:
         print("No data to save!")
         return
@@ -70,7 +86,8 @@ def save_to_excel(jobs):
         FILENAME = create_filename()
 
     try:
-        df = pd.DataFrame(jobs)
+        JOURNAL.close()
+        df = JOURNAL.to_dataframe()
         
         # Create Excel writer object
         with pd.ExcelWriter(FILENAME, engine='openpyxl') as writer:
@@ -80,6 +97,7 @@ def save_to_excel(jobs):
             # Save progress metadata
             progress = get_current_progress()
             pd.DataFrame([progress]).to_excel(writer, sheet_name='Progress', index=False)
+        SnapshotStore.write_for_output(FILENAME, df)
         
         print(f"\n💾 DATA SAVED: {len(jobs)} records (Page {progress['current_page']}/{progress['total_pages']}) -> {FILENAME}")
     except Exception as e:
@@ -134,35 +152,90 @@ def setup_scraper():
         driver.quit()
         sys.exit(1)
 
+# Fields of one job link in #search-results; all three text fields are required
+JOB_FIELDS = {
+    'title': Field("h2.headline__medium"),
+    'department': Field("span.job-department"),
+    'location': Field("span.job-location"),
+    'job_id': Field(None, "data-job-id"),
+    'url': Field(None, "href"),
+}
+
 def scrape_page():
     """Scrape current page and return jobs"""
     try:
         WebDriverWait(driver, 3).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "#search-results a[data-job-id]")))
         
-        jobs = driver.find_elements(By.CSS_SELECTOR, "#search-results a[data-job-id]")
-        debug_print(f"Found {len(jobs)} job listings")
+        # Every job on the page in a single execute_script round trip
+        rows = extract_rows(driver, "#search-results a[data-job-id]", JOB_FIELDS,
+                            required=('title', 'department', 'location'))
+        debug_print(f"Found {len(rows)} job listings")
         
-        return [extract_job_data(job) for job in jobs if extract_job_data(job)]
+        return [extract_job_data(row) for row in rows]
     except Exception as e:
         debug_print(f"Scraping failed: {str(e)}", False)
         return []
 
-def extract_job_data(job_element):
-    """Extract detailed job information"""
-    try:
-        return {
+def extract_job_data(row):
+    """Add the scrape timestamps to an extracted job row"""
+    return {
+        'scraped_date': datetime.now().strftime("%Y-%m-%d"),
+        'title': row['title'],
+        'department': row['department'],
+        'location': row['location'],
+        'job_id': row['job_id'],
+        'url': row['url'],
+        'scraped_time': datetime.now().strftime("%H:%M:%S")
+    }
+
+def parse_result_rows(results, site_url):
+    """Turn one results fragment into job rows (same fields as extract_job_data)"""
+    rows = []
+    for job in results.select("#search-results a[data-job-id]"):
+        title = job.select_one("h2.headline__medium")
+        department = job.select_one("span.job-department")
+        location = job.select_one("span.job-location")
+        if not (title and department and location):
+            debug_print(f"Failed to extract job {job.get('data-job-id')}: missing fields", False)
+            continue
+        rows.append({
             'scraped_date': datetime.now().strftime("%Y-%m-%d"),
-            'title': job_element.find_element(By.CSS_SELECTOR, "h2.headline__medium").text.strip(),
-            'department': job_element.find_element(By.CSS_SELECTOR, "span.job-department").text.strip(),
-            'location': job_element.find_element(By.CSS_SELECTOR, "span.job-location").text.strip(),
-            'job_id': job_element.get_attribute("data-job-id"),
-            'url': job_element.get_attribute("href"),
+            'title': SearchResults.text_of(title),
+            'department': SearchResults.text_of(department),
+            'location': SearchResults.text_of(location),
+            'job_id': job.get("data-job-id"),
+            'url': urljoin(site_url, job.get("href")),
             'scraped_time': datetime.now().strftime("%H:%M:%S")
-        }
-    except Exception as e:
-        debug_print(f"Failed to extract job: {str(e)}", False)
-        return None
+        })
+    return rows
+
+def crawl_direct(workers):
+    """Request every filtered results page from the search endpoint and journal the jobs.
+
+    Returns False, without writing the workbook, if any page failed.
+    """
+    global ALL_JOBS
+    # Each results page is journaled as it arrives, then recorded as finished
+    pages_checkpoint = JOURNAL.path.with_suffix('.pages.txt')
+    def journal_page(page, page_jobs):
+        JOURNAL.extend(page_jobs)
+        SearchResults.mark_page_finished(pages_checkpoint, page)
+    _, failed = SearchResults.crawl("https://www.commonspirit.careers", "/search-jobs",
+                                    parse_result_rows, region="California", workers=workers,
+                                    on_page=journal_page,
+                                    skip_pages=SearchResults.load_finished_pages(pages_checkpoint))
+    JOURNAL.close()
+    if failed:
+        print(f"\nPages {sorted(failed)} failed; rerun to fetch only those (the workbook was not written).")
+        return False
+    # Direct crawls always cover every page, so dedupe against any earlier run today
+    df = JOURNAL.to_dataframe(key='url')
+    df.to_excel(FILENAME, sheet_name='Jobs', index=False, engine='openpyxl')
+    SnapshotStore.write_for_output(FILENAME, df)
+    ALL_JOBS = df.to_dict('records')
+    print(f"\n🏁 FINAL RESULTS: {len(df)} jobs saved to {FILENAME}")
+    return True
 
 def paginate():
     """
@@ -211,7 +284,7 @@ def paginate():
                             EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn-learn-more.pagination-view-more")))
                         
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", view_more_btn)
-                        time.sleep(0.5)
+                        PageReady.wait_for_layout(driver, view_more_btn, "dignity.scroll to view more", legacy=0.5)
                         driver.execute_script("arguments[0].click();", view_more_btn)
                         
                         WebDriverWait(driver, 10).until(
@@ -234,7 +307,7 @@ def paginate():
                             EC.element_to_be_clickable((By.CSS_SELECTOR, "a.next:not([disabled])")))
                         
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", next_btn)
-                        time.sleep(0.5)
+                        PageReady.wait_for_layout(driver, next_btn, "dignity.scroll to next", legacy=0.5)
                         driver.execute_script("arguments[0].click();", next_btn)
                         
                         WebDriverWait(driver, 15).until(
@@ -302,8 +375,24 @@ def get_pagination():
 
 # Modify the main execution flow
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect CommonSpirit (Dignity) California job links")
+    parser.add_argument("--mode", choices=["direct", "browser"], default="direct",
+                        help="'direct' requests every results page from the search endpoint, "
+                             "'browser' clicks through the search page (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent results-page requests in direct mode (default: %(default)s)")
+    DriverFactory.add_browser_arguments(parser)
+    args = parser.parse_args()
+
     # Initialize with restart capability
     FILENAME = create_filename()
+    # Jobs are journaled page by page; the workbook is only written when the run ends
+    JOURNAL = CrawlJournal.for_output(FILENAME)
+
+    if args.mode == "direct":
+        sys.exit(0 if crawl_direct(args.workers) else 1)
+
+    driver = DriverFactory.driver_factory(args)()
     ALL_JOBS = load_existing_data(FILENAME)
     
     # Get starting page from existing data if available
@@ -325,8 +414,9 @@ if __name__ == "__main__":
             page_jobs = scrape_page()
             if page_jobs:
                 ALL_JOBS.extend(page_jobs)
-                # Save every page (or adjust to save every N pages)
-                save_to_excel(ALL_JOBS)
+                # Journal every page; the workbook is compacted once at the end
+                JOURNAL.extend(page_jobs)
+            driver.count_page()
             
             if not paginate():
                 break
@@ -335,10 +425,12 @@ if __name__ == "__main__":
 
     except Exception as e:
         debug_print(f"Unexpected error: {str(e)}", False)
-        # Save progress when crashing
-        save_to_excel(ALL_JOBS)
     finally:
+        # Compact the journal into the workbook (also covers crashes)
+        save_to_excel(ALL_JOBS)
         driver.quit()
+        PageReady.report()
+        DriverFactory.report()
         if ALL_JOBS:
             print(f"\n🏁 FINAL RESULTS: {len(ALL_JOBS)} jobs saved to {FILENAME}")
             print(f"📋 Pages processed: {get_current_progress()['current_page']}/{get_current_progress()['total_pages']}")
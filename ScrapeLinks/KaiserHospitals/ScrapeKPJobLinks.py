@@ -1,292 +1,297 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, ElementClickInterceptedException  
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, ElementClickInterceptedException
 import time
 from datetime import datetime
 import os
-import pandas as pd
+import sys
+import argparse
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon import SearchResults
+from ScrapeCommon.BulkExtract import Field, extract_rows
+from ScrapeCommon import PageReady, DriverFactory
+
+COLUMNS = [
+    "Timestamp", "Title", "URL", "Location", "Setting",
+    "Date Posted", "Scrape Date", "Scrape Day"
+]
+
+SEARCH_URL = "https://www.kaiserpermanentejobs.org/search-jobs/"
+
+# Define the filename with the current date in MM-DD-YYYY format
+scrape_date = datetime.now().strftime("%m%d%Y")
+filename = f"kpjobs_{scrape_date}.xlsx"  # Change extension to .xlsx
+
+# Every job is journaled as it is scraped; the workbook is built once at the end
+journal = CrawlJournal.for_output(filename)
 
 # Function to load the last scraped page from a checkpoint file
-def load_checkpoint():
-    if os.path.exists("checkpoint.txt"):
-        with open("checkpoint.txt", "r") as file:
+def load_checkpoint(path="checkpoint.txt"):
+    if os.path.exists(path):
+        with open(path, "r") as file:
             return int(file.read().strip())
     return 1  # Start from page 1 if no checkpoint exists
 
 # Function to save the current page to a checkpoint file
-def save_checkpoint(page):
-    with open("checkpoint.txt", "w") as file:
+def save_checkpoint(page, path="checkpoint.txt"):
+    with open(path, "w") as file:
         file.write(str(page))
 
+def shard_checkpoint_path(shard):
+    return f"checkpoint.shard{shard}.txt"
+
+def load_shard_checkpoint(shard, start, end):
+    """Last page a shard finished, if it was saved today for the same page range"""
+    path = shard_checkpoint_path(shard)
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            saved_date, saved_range, page = file.read().split()
+        if saved_date == scrape_date and saved_range == f"{start}-{end}":
+            return int(page)
+    return None
+
+def save_shard_checkpoint(shard, start, end, page):
+    with open(shard_checkpoint_path(shard), "w") as file:
+        file.write(f"{scrape_date} {start}-{end} {page}")
+
 def handle_not_now_button(driver):
+    """Dismiss the 'Not Now' prompt if it is showing (rare: the lean driver's stylesheet hides it)"""
     try:
-        # Wait a short time for the button to potentially appear
-        not_now_button = WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "button.btn-not-now"))
-        )
-        
-        # Make sure button is visible and clickable
-        if not_now_button.is_displayed() and not_now_button.is_enabled():
-            # Scroll into view and click using JavaScript for reliability
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", not_now_button)
-            driver.execute_script("arguments[0].click();", not_now_button)
-            print("Clicked 'Not Now' button")
-            time.sleep(1)  # Give time for any modal to close
-            return True
-    except TimeoutException:
-        # Button didn't appear, which is fine
-        return False
+        # Check without waiting; the prompt is only ever handled when it is actually visible
+        for not_now_button in driver.find_elements(By.CSS_SELECTOR, "button.btn-not-now"):
+            # Make sure button is visible and clickable
+            if not_now_button.is_displayed() and not_now_button.is_enabled():
+                # Scroll into view and click using JavaScript for reliability
+                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", not_now_button)
+                driver.execute_script("arguments[0].click();", not_now_button)
+                print("Clicked 'Not Now' button")
+                # Give time for any modal to close
+                PageReady.wait_until_hidden(driver, not_now_button, "kp.not-now closed", legacy=1)
+                return True
     except Exception as e:
         print(f"Error handling 'Not Now' button: {e}")
-        return False
-
-# Initialize the WebDriver
-driver = webdriver.Chrome()
-driver.get("https://www.kaiserpermanentejobs.org/search-jobs/")
-
-try:
-    # New Step: Handle cookie consent popup
-    print("Step 1: Handling cookie consent...")
-    try:
-        # Wait for the GDPR banner and click Accept using the correct ID
-        cookie_accept_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, "igdpr-button"))
-        )
-        # Use JavaScript click to avoid potential overlay issues
-        driver.execute_script("arguments[0].click();", cookie_accept_button)
-        print("Cookie consent accepted.")
-        
-        # Wait for banner to disappear (optional but recommended)
-        WebDriverWait(driver, 1).until(
-            EC.invisibility_of_element_located((By.ID, "igdpr-alert"))
-        )
-        time.sleep(0.5)  # Small pause for any final UI updates
-    except (NoSuchElementException, TimeoutException):
+    return False
+
+def parse_result_rows(results, site_url):
+    """Turn one results fragment into job rows (same fields as the browser scrape)"""
+    now = datetime.now()
+    rows = []
+    for job in results.select("#search-results li"):
+        link = job.find("a", href=True)
+        locations = job.select(".job-location")
+        title = SearchResults.text_of(job.find("h2"))
+        url = urljoin(site_url, link["href"]) if link else "N/A"
+        primary_location = SearchResults.text_of(locations[0]) if len(locations) > 0 else "N/A"
+        secondary_location = SearchResults.text_of(locations[1]) if len(locations) > 1 else "N/A"
+        date_posted = SearchResults.text_of(job.select_one(".job-date-posted"))
+
+        # Keep the row only if not all values are "N/A"
+        if not all(value == "N/A" for value in [title, url, primary_location, secondary_location, date_posted]):
+            rows.append(dict(zip(COLUMNS, [
+                now.strftime("%H:%M:%S"), title, url, primary_location, secondary_location,
+                date_posted, now.strftime("%m-%d-%Y"), now.strftime("%a")
+            ])))
+    return rows
+
+def accept_cookies(driver):
+    """Accept the cookie consent popup if the page has one, and save the consent for next time.
+
+    Seeded consent cookies usually mean there is no banner at all, and the lean driver
+    hides it regardless, so this never waits for it to appear.
+    """
+    buttons = driver.find_elements(By.ID, "igdpr-button")
+    if not buttons:
         print("No cookie consent popup found or already dismissed.")
-
-    print("Step 2: Page loaded successfully.")
-    # 1. Extract initial data from the page (before filtering)
-    print("Step 2: Extracting initial data from the page...")
-    results_section = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.ID, "search-results"))
-    )
-
-    # Initialize variables
+        return False
+    # Use JavaScript click to avoid potential overlay issues (and reach a hidden banner)
+    driver.execute_script("arguments[0].click();", buttons[0])
+    print("Cookie consent accepted.")
+    DriverFactory.save_consent_cookies(driver, "kaiserpermanentejobs.org")
+    return True
+
+def read_results_info(driver, label):
+    """Print and return the paging attributes of #search-results"""
+    results_section = driver.find_element(By.ID, "search-results")
     total_results = results_section.get_attribute("data-total-results")
     total_job_results = results_section.get_attribute("data-total-job-results")
     total_pages = int(results_section.get_attribute("data-total-pages"))
     records_per_page = results_section.get_attribute("data-records-per-page")
 
-    print(f"Initial Data:")
+    print(f"{label}:")
     print(f"Total Results: {total_results}")
     print(f"Total Job Results: {total_job_results}")
     print(f"Total Pages: {total_pages}")
     print(f"Records Per Page: {records_per_page}")
+    return total_pages
+
+def click_and_wait_for_results(driver, element, name, timeout=30, legacy=0.0):
+    """Click via JavaScript, then wait until the result list has been replaced and gone quiet"""
+    with PageReady.ready_after(driver, name, "#search-results li",
+                               attributes=["data-total-job-results", "data-current-page"],
+                               quiet=0.3, timeout=timeout, network=True, legacy=legacy) as results:
+        driver.execute_script("arguments[0].click();", element)
+    if results.ready:
+        print("Results have stabilized.")
+    else:
+        print("Timed out waiting for results to stabilize.")
+    return results.ready
 
-    # 2. Scroll to the "State" filter button and click it
+def apply_california_filter(driver):
+    """Open the State filter, tick California and wait for the results to update"""
+    # Scroll to the "State" filter button and click it
     print("Step 3: Attempting to find and click the 'State' filter button...")
     state_toggle = WebDriverWait(driver, 10).until(
         EC.presence_of_element_located((By.ID, "region-toggle"))
     )
     # Scroll into view using JavaScript
     driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", state_toggle)
-    time.sleep(1)  # Allow time for scrolling to finish
+    PageReady.wait_for_layout(driver, state_toggle, "kp.scroll to state filter", legacy=1)  # Scrolling finished
     state_toggle.click()
     print("Step 3: 'State' filter button clicked successfully.")
 
-    # 3. Click the California filter checkbox
+    # Click the California filter checkbox
     print("Step 4: Attempting to find and click the California filter checkbox...")
     california_filter = WebDriverWait(driver, 10).until(
         EC.element_to_be_clickable((By.ID, "region-filter-0"))
     )
-    driver.execute_script("arguments[0].click();", california_filter)  # Click via JavaScript to bypass overlays
-    print("Step 4: California filter checkbox clicked successfully.")
-
-    # 4. Wait for the results to fully update after filtering
-    print("Step 5: Waiting for results to update after filtering...")
-
-    # Function to wait for the results to stabilize
-    def wait_for_results_to_stabilize(driver, timeout=30):
-        start_time = time.time()
-        previous_total_jobs = None
-
-        while time.time() - start_time < timeout:
-            results_section = driver.find_element(By.ID, "search-results")
-            current_total_jobs = results_section.get_attribute("data-total-job-results")
-
-            if current_total_jobs == previous_total_jobs:
-                print("Results have stabilized.")
-                return True
-
-            previous_total_jobs = current_total_jobs
-            time.sleep(1)  # Wait before checking again
-
-        print("Timed out waiting for results to stabilize.")
-        return False
-
-    # Wait for results to stabilize
-    if wait_for_results_to_stabilize(driver):
+    # Click via JavaScript to bypass overlays, and wait for the results to fully update after filtering
+    print("Step 4/5: Clicking the California filter checkbox and waiting for results to update...")
+    if click_and_wait_for_results(driver, california_filter, "kp.california filter", legacy=1):
         print("Step 5: Results updated successfully. Filter applied!")
     else:
         raise TimeoutException("Results did not stabilize within the timeout period.")
 
-    def wait_for_pagination_ready(driver, timeout=30):
-        WebDriverWait(driver, timeout).until(
-            lambda d: d.execute_script(
-                "return document.readyState === 'complete' && "
-                "typeof jQuery !== 'undefined' && "
-                "jQuery('.pagination-controls:visible').length > 0 && "
-                "!jQuery('#search-results').hasClass('loading')"
-            )
-        )    
-
-    # 5. Extract updated data after filtering
-    print("Step 6: Extracting updated data after filtering...")
-    results_section = driver.find_element(By.ID, "search-results")
-    total_results = results_section.get_attribute("data-total-results")
-    total_job_results = results_section.get_attribute("data-total-job-results")
-    total_pages = int(results_section.get_attribute("data-total-pages"))
-    records_per_page = results_section.get_attribute("data-records-per-page")
+def reapply_filters(driver):
+    """Re-apply filters properly after a refresh"""
+    try:
+        # Re-open State filter panel
+        state_toggle = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.ID, "region-toggle"))
+        )
+        driver.execute_script("arguments[0].click();", state_toggle)
+        # Re-check California filter
+        california_filter = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.ID, "region-filter-0"))
+        )
+        click_and_wait_for_results(driver, california_filter, "kp.california filter", legacy=1)
+    except Exception as filter_error:
+        print(f"Failed to re-apply filters: {filter_error}")
 
-    print(f"Updated Data:")
-    print(f"Total Results: {total_results}")
-    print(f"Total Job Results: {total_job_results}")
-    print(f"Total Pages: {total_pages}")
-    print(f"Records Per Page: {records_per_page}")
+def open_filtered_search(driver):
+    """Load the search page, accept cookies, apply the California filter; return total pages"""
+    driver.get(SEARCH_URL)
 
-    # 6. Load the last scraped page from the checkpoint
-    current_page = load_checkpoint()
-    print(f"Resuming from page {current_page}...")
-
-    # 7. Navigate to the desired page (e.g., page 34)
-    if current_page > 1:
-        print(f"Navigating to page {current_page}...")
-        retries = 3
-        for attempt in range(retries):
-            try:
-                # Re-locate elements after potential DOM changes
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.ID, "pagination-current-bottom"))
-                )
-                
-                # Scroll to pagination input and set value using JavaScript
-                pagination_input = driver.find_element(By.ID, "pagination-current-bottom")
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", pagination_input)
-                driver.execute_script(f"arguments[0].value = '{current_page}';", pagination_input)
-                
-                # Trigger any required events (e.g., input, change)
-                driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", pagination_input)
-                driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", pagination_input)
-                time.sleep(1)  # Allow time for UI update
-                
-                # Click the Go button using JavaScript
-                go_button = driver.find_element(By.CSS_SELECTOR, "button.pagination-page-jump")
-                driver.execute_script("arguments[0].click();", go_button)
-                
-                # Wait for page load verification
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.find_element(By.ID, "search-results").get_attribute("data-current-page") == str(current_page)
-                )
-                print(f"Successfully navigated to page {current_page}.")
-                break
-            except Exception as e:
-                print(f"Navigation attempt {attempt + 1} failed: {str(e)[:100]}...")
-                if attempt == retries - 1:
-                    raise
-                print("Refreshing page and retrying...")
-                driver.refresh()
-                time.sleep(1)
-                
-                # Re-apply filters properly after refresh
-                try:
-                    # Re-open State filter panel
-                    state_toggle = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "region-toggle"))
-                    )
-                    driver.execute_script("arguments[0].click();", state_toggle)
-                    # Re-check California filter
-                    california_filter = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "region-filter-0"))
-                    )
-                    driver.execute_script("arguments[0].click();", california_filter)
-                    wait_for_results_to_stabilize(driver)
-                except Exception as filter_error:
-                    print(f"Failed to re-apply filters: {filter_error}")
-
-    # 8. Scrape all pages of job listings
-    print("Step 7: Scraping job listings from all pages...")
-    all_jobs = []
-
-    while current_page <= total_pages:
-        print(f"Scraping page {current_page} of {total_pages}...")
-
-        # Function to scrape job listings from the current page
-        def scrape_jobs():
-            job_listings = driver.find_elements(By.CSS_SELECTOR, "#search-results li")
-            for job in job_listings:
-                try:
-                    # Extract job title
-                    title = job.find_element(By.TAG_NAME, "h2").text
-                except NoSuchElementException:
-                    title = "N/A"
+    print("Step 1: Handling cookie consent...")
+    accept_cookies(driver)
 
-                try:
-                    # Extract job URL
-                    url = job.find_element(By.TAG_NAME, "a").get_attribute("href")
-                except NoSuchElementException:
-                    url = "N/A"
+    print("Step 2: Page loaded successfully.")
+    # Extract initial data from the page (before filtering)
+    print("Step 2: Extracting initial data from the page...")
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.ID, "search-results"))
+    )
+    read_results_info(driver, "Initial Data")
 
-                try:
-                    # Extract job locations
-                    locations = job.find_elements(By.CLASS_NAME, "job-location")
-                    primary_location = locations[0].text if len(locations) > 0 else "N/A"
-                    secondary_location = locations[1].text if len(locations) > 1 else "N/A"
-                except NoSuchElementException:
-                    primary_location = "N/A"
-                    secondary_location = "N/A"
+    apply_california_filter(driver)
 
-                try:
-                    # Extract job posted date
-                    date_posted = job.find_element(By.CLASS_NAME, "job-date-posted").text
-                except NoSuchElementException:
-                    date_posted = "N/A"
-
-                # Get current timestamp and format it
-                scrape_timestamp = datetime.now().strftime("%H:%M:%S")
-                scrape_date = datetime.now().strftime("%m-%d-%Y")  # MM-DD-YYYY format
-                scrape_day = datetime.now().strftime("%a")  # Abbreviated day (e.g., Mon, Tue)
-
-                # Add job details to the list only if not all values are "N/A"
-                if not all(value == "N/A" for value in [title, url, primary_location, secondary_location, date_posted]):
-                    all_jobs.append([
-                        scrape_timestamp, title, url, primary_location, secondary_location,
-                        date_posted, scrape_date, scrape_day
-                    ])
-
-        # Retry scraping if stale elements are encountered
-        retries = 5  # Increased number of retries
-        for attempt in range(retries):
-            try:
-                # Wait for job listings to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#search-results li"))
-                )
-                scrape_jobs()
-                break  # Exit retry loop if successful
-            except StaleElementReferenceException:
-                print(f"Stale element detected. Retrying... ({attempt + 1}/{retries})")
-                time.sleep(1)  # Wait 5 seconds before retrying
-            except Exception as e:
-                print(f"Unexpected error during job listing extraction: {e}")
-                time.sleep(1)  # Wait 5 seconds before retrying
+    # Extract updated data after filtering
+    print("Step 6: Extracting updated data after filtering...")
+    return read_results_info(driver, "Updated Data")
+
+def jump_to_page(driver, page, retries=3):
+    """Navigate straight to a results page through the pagination box"""
+    print(f"Navigating to page {page}...")
+    for attempt in range(retries):
+        try:
+            # Re-locate elements after potential DOM changes
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.ID, "pagination-current-bottom"))
+            )
+            
+            # Scroll to pagination input and set value using JavaScript
+            pagination_input = driver.find_element(By.ID, "pagination-current-bottom")
+            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", pagination_input)
+            driver.execute_script(f"arguments[0].value = '{page}';", pagination_input)
+            
+            # Trigger any required events (e.g., input, change)
+            driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", pagination_input)
+            driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", pagination_input)
+            
+            # Click the Go button using JavaScript and wait for the new page of results
+            go_button = driver.find_element(By.CSS_SELECTOR, "button.pagination-page-jump")
+            click_and_wait_for_results(driver, go_button, "kp.jump to page", timeout=10, legacy=1)
+            
+            # Wait for page load verification
+            WebDriverWait(driver, 10).until(
+                lambda d: d.find_element(By.ID, "search-results").get_attribute("data-current-page") == str(page)
+            )
+            print(f"Successfully navigated to page {page}.")
+            return
+        except Exception as e:
+            print(f"Navigation attempt {attempt + 1} failed: {str(e)[:100]}...")
+            if attempt == retries - 1:
+                raise
+            print("Refreshing page and retrying...")
+            driver.refresh()
+            reapply_filters(driver)  # Waits for the filter controls itself
+
+# Fields of one listing in #search-results, read in a single round trip per page
+JOB_FIELDS = {
+    "Title": Field("h2"),
+    "URL": Field("a", "href"),
+    "Location": Field(".job-location", index=0),
+    "Setting": Field(".job-location", index=1),
+    "Date Posted": Field(".job-date-posted"),
+}
+
+# Function to scrape job listings from the current page
+def scrape_jobs(driver):
+    page_jobs = []
+    for row in extract_rows(driver, "#search-results li", JOB_FIELDS):
+        # Missing fields are reported as "N/A", as before
+        job = {name: "N/A" if value is None else value for name, value in row.items()}
+
+        # Get current timestamp and format it
+        scrape_timestamp = datetime.now().strftime("%H:%M:%S")
+        scrape_date = datetime.now().strftime("%m-%d-%Y")  # MM-DD-YYYY format
+        scrape_day = datetime.now().strftime("%a")  # Abbreviated day (e.g., Mon, Tue)
+
+        # Add job details to the list only if not all values are "N/A"
+        if not all(value == "N/A" for value in job.values()):
+            page_jobs.append(dict(zip(COLUMNS, [
+                scrape_timestamp, job["Title"], job["URL"], job["Location"], job["Setting"],
+                job["Date Posted"], scrape_date, scrape_day
+            ])))
+    return page_jobs
+
+def crawl_pages(driver, current_page, last_page, page_journal, checkpoint):
+    """Scrape pages current_page..last_page by clicking Next, journaling each page's jobs"""
+    while current_page <= last_page:
+        print(f"Scraping page {current_page} of {last_page}...")
+
+        try:
+            # Wait for job listings to load, then read the whole page in one call
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#search-results li"))
+            )
+            page_journal.extend(scrape_jobs(driver))
+            driver.count_page()
+        except Exception as e:
+            print(f"Unexpected error during job listing extraction: {e}")
 
         # Save the current page to the checkpoint file
-        save_checkpoint(current_page)
+        checkpoint(current_page)
 
         # Go to the next page if not on the last page
-        if current_page < total_pages:
+        if current_page < last_page:
             retries = 5  # Number of retries for navigation
             for attempt in range(retries):
                 try:
@@ -315,30 +320,133 @@ try:
                     time.sleep(1)  # Wait 5 seconds before retrying
             else:
                 print("Failed to navigate to the next page after multiple retries. Exiting pagination loop.")
-                break  # Exit the loop if navigation fails after all retries
+                return False  # Exit the loop if navigation fails after all retries
         else:
             break  # Exit the loop if on the last page
+    return True
 
-    # 9. Save the scraped jobs to an Excel file
-    print("Step 8: Saving scraped jobs to an Excel file...")
+def crawl_browser(setup_driver, keep_open=False):
+    """Original serial crawl: one browser walks every page, resuming from checkpoint.txt"""
+    driver = setup_driver()
+    try:
+        total_pages = open_filtered_search(driver)
 
-    # Define the filename with the current date in MM-DD-YYYY format
-    scrape_date = datetime.now().strftime("%m%d%Y")
-    filename = f"kpjobs_{scrape_date}.xlsx"  # Change extension to .xlsx
+        # Load the last scraped page from the checkpoint
+        current_page = load_checkpoint()
+        print(f"Resuming from page {current_page}...")
 
-    # Convert the list of jobs to a DataFrame
-    df = pd.DataFrame(all_jobs, columns=[
-        "Timestamp", "Title", "URL", "Location", "Setting",
-        "Date Posted", "Scrape Date", "Scrape Day"
-    ])
+        # Navigate to the desired page (e.g., page 34)
+        if current_page > 1:
+            jump_to_page(driver, current_page)
 
-    # Save the DataFrame to an Excel file
-    df.to_excel(filename, index=False, engine="openpyxl")
-    print(f"Scraped jobs saved to {filename}")
+        # Scrape all pages of job listings
+        print("Step 7: Scraping job listings from all pages...")
+        crawl_pages(driver, current_page, total_pages, journal, save_checkpoint)
 
-except Exception as e:
-    print(f"Error: {e}")
-finally:
-    # Keep the browser open for inspection
-    input("Press Enter to close the browser...")
-    driver.quit()
+        print("Step 8: Saving scraped jobs to an Excel file...")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        # Compact the journal (this run plus any resumed pages) into the workbook
+        journal.close()
+        journal.compact(filename, key="URL", columns=COLUMNS)
+        print(f"Scraped jobs saved to {filename}")
+        PageReady.report()
+
+        # Keep a visible browser open for inspection
+        if keep_open:
+            input("Press Enter to close the browser...")
+        driver.quit()
+        DriverFactory.report()
+
+def crawl_shard(shard, start, end, setup_driver, driver=None):
+    """Crawl pages start..end in a browser of its own, with its own checkpoint and journal"""
+    finished = load_shard_checkpoint(shard, start, end)
+    if finished == end:
+        print(f"[shard {shard}] Pages {start}-{end} already done.")
+        if driver:
+            driver.quit()
+        return True
+
+    shard_journal = journal.shard(shard)
+    try:
+        if driver is None:
+            driver = setup_driver()
+            open_filtered_search(driver)
+
+        current_page = finished or start
+        print(f"[shard {shard}] Crawling pages {current_page}-{end}...")
+        if current_page > 1:
+            jump_to_page(driver, current_page)
+        return crawl_pages(driver, current_page, end, shard_journal,
+                           lambda page: save_shard_checkpoint(shard, start, end, page))
+    except Exception as e:
+        print(f"[shard {shard}] Error: {e}")
+        return False
+    finally:
+        shard_journal.close()
+        if driver:
+            driver.quit()
+
+def crawl_sharded(shards, setup_driver):
+    """Split 1..total_pages into contiguous ranges, crawl each in its own browser, merge by URL"""
+    # The first browser learns the page count, then carries on as shard 0
+    first_driver = setup_driver()
+    try:
+        total_pages = open_filtered_search(first_driver)
+    except Exception:
+        first_driver.quit()
+        raise
+
+    shards = max(1, min(shards, total_pages))
+    size = math.ceil(total_pages / shards)
+    ranges = [(start, min(start + size - 1, total_pages)) for start in range(1, total_pages + 1, size)]
+    print(f"Step 7: Crawling {total_pages} pages in {len(ranges)} shards: {ranges}")
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [
+            pool.submit(crawl_shard, shard, start, end, setup_driver, first_driver if shard == 0 else None)
+            for shard, (start, end) in enumerate(ranges)
+        ]
+        failed = [shard for shard, future in enumerate(futures) if not future.result()]
+    if failed:
+        print(f"Shards {failed} stopped early; rerun to resume them from their checkpoints.")
+
+    # Merge every shard's journal, deduplicating on URL
+    print("Step 8: Saving scraped jobs to an Excel file...")
+    journal.compact(filename, key="URL", columns=COLUMNS)
+    print(f"Scraped jobs saved to {filename}")
+    PageReady.report()
+    DriverFactory.report()
+
+parser = argparse.ArgumentParser(description="Collect Kaiser Permanente California job links")
+parser.add_argument("--mode", choices=["direct", "browser", "sharded"], default="direct",
+                    help="'direct' requests every results page from the search endpoint, "
+                         "'browser' clicks through the search page, 'sharded' splits the pages "
+                         "across several browsers (default: %(default)s)")
+parser.add_argument("--workers", type=int, default=8,
+                    help="Concurrent requests in direct mode, or browsers in sharded mode (default: %(default)s)")
+DriverFactory.add_browser_arguments(parser)
+args = parser.parse_args()
+setup_driver = DriverFactory.driver_factory(args)
+
+if args.mode == "direct":
+    # Each results page is journaled as it arrives, then recorded as finished
+    pages_checkpoint = journal.path.with_suffix('.pages.txt')
+    def journal_page(page, page_jobs):
+        journal.extend(page_jobs)
+        SearchResults.mark_page_finished(pages_checkpoint, page)
+    _, failed = SearchResults.crawl("https://www.kaiserpermanentejobs.org", "/search-jobs/",
+                                    parse_result_rows, region="California", workers=args.workers,
+                                    on_page=journal_page,
+                                    skip_pages=SearchResults.load_finished_pages(pages_checkpoint))
+    journal.close()
+    if failed:
+        print(f"Pages {sorted(failed)} failed; rerun to fetch only those (the workbook was not written).")
+        sys.exit(1)
+    journal.compact(filename, key="URL", columns=COLUMNS)
+    print(f"Scraped jobs saved to {filename}")
+elif args.mode == "sharded":
+    crawl_sharded(args.workers, setup_driver)
+else:
+    crawl_browser(setup_driver, keep_open=args.headed)
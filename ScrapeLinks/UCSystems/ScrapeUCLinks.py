@@ -1,19 +1,26 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
+import argparse
 import csv
+import sys
+from pathlib import Path
 from datetime import datetime
-import pandas as pd
 
-# Set up Selenium with Chrome
-chrome_options = Options()
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from ScrapeCommon.CrawlJournal import CrawlJournal
+from ScrapeCommon.BulkExtract import Field, extract_rows
+from ScrapeCommon import DriverFactory
 
-# Initialize the WebDriver
-driver = webdriver.Chrome()
+parser = argparse.ArgumentParser(description="Collect University of California job links")
+DriverFactory.add_browser_arguments(parser)
+args = parser.parse_args()
+
+# Initialize the WebDriver (headless, lean profile unless --headed / --no-block)
+driver = DriverFactory.driver_factory(args)()
 
 # URL of the webpage
 url = "https://jobs.universityofcalifornia.edu/site/advancedsearch?keywords=&Campus%5Bcampus_id%5D=&multiple_locations=0&search="
@@ -32,6 +39,21 @@ scrape_time = current_datetime.strftime("%H:%M:%S")  # Format: HH:MM:SS
 # Excel file to save all data
 excel_filename = f"ucjobs_{current_datetime.strftime('%m%d%Y')}.xlsx"
 
+# Jobs are journaled as they are scraped; the workbook is built once at the end
+journal = CrawlJournal.for_output(excel_filename)
+
+# Fields of one .jobspot, read for the whole page in a single execute_script call
+JOB_FIELDS = {
+    "title": Field(".jtitle"),
+    "link": Field(".jtitle", "href"),
+    "location": Field(".jloc"),
+    "category": Field(".jfamily"),
+    "requisition": Field(".jreq"),
+    "posting_date": Field(".jclose"),
+    "description": Field(".jdesc"),
+}
+columns = ["Job Title", "Job Link", "Location", "Category", "Requisition", "Posting Date", "Description", "Scrape Date", "Scrape Time"]
+
 # Loop through all pages
 while True:
     # Wait for the job postings to load
@@ -43,72 +65,36 @@ while True:
         print("Timed out waiting for job postings to load.")
         break
 
-    # Find all job postings on the current page
-    jobspots = driver.find_elements(By.CLASS_NAME, "jobspot")
-
-    # Iterate through each job posting
-    for job in jobspots:
-        try:
-            # Extract job title and link
-            title_element = job.find_element(By.CLASS_NAME, "jtitle")
-            job_title = title_element.text.strip()
-            job_link = title_element.get_attribute("href")
-        except NoSuchElementException:
-            job_title = ""
-            job_link = ""
-
-        try:
-            # Extract location
-            location = job.find_element(By.CLASS_NAME, "jloc").text.strip()
-        except NoSuchElementException:
-            location = ""
-
-        try:
-            # Extract category
-            category = job.find_element(By.CLASS_NAME, "jfamily").text.strip()
-        except NoSuchElementException:
-            category = ""
-
-        try:
-            # Extract requisition
-            requisition = job.find_element(By.CLASS_NAME, "jreq").text.strip()
-        except NoSuchElementException:
-            requisition = ""
-
-        try:
-            # Extract posting date
-            posting_date = job.find_element(By.CLASS_NAME, "jclose").text.strip()
-        except NoSuchElementException:
-            posting_date = ""
-
-        try:
-            # Extract job description
-            description = job.find_element(By.CLASS_NAME, "jdesc").text.strip()
-        except NoSuchElementException:
-            description = ""
+    # Read every job posting on the current page in one round trip
+    for job in extract_rows(driver, ".jobspot", JOB_FIELDS):
+        # Missing elements are recorded as empty strings
+        job = {name: "" if value is None else value for name, value in job.items()}
 
         # Append the data to the list with scrape date and time
-        jobs_data.append([job_title, job_link, location, category, requisition, posting_date, description, scrape_date, scrape_time])
-
-    # Convert the list to a pandas DataFrame
-    df = pd.DataFrame(jobs_data, columns=["Job Title", "Job Link", "Location", "Category", "Requisition", "Posting Date", "Description", "Scrape Date", "Scrape Time"])
+        job = [job["title"], job["link"], job["location"], job["category"], job["requisition"],
+               job["posting_date"], job["description"], scrape_date, scrape_time]
+        jobs_data.append(job)
+        journal.append(dict(zip(columns, job)))
+    journal.sync()
 
-    # Reorganize the columns (example: move "Scrape Date" and "Scrape Time" to the front)
-    df = df[["Scrape Date", "Job Title", "Location", "Category", "Requisition", "Posting Date", "Description", "Job Link", "Scrape Time"]]
-
-    # Save the DataFrame to an Excel file after each page
-    df.to_excel(excel_filename, index=False)
-    print(f"Data saved to {excel_filename} after processing a page.")
+    print(f"Journaled {len(jobs_data)} jobs to {journal.path.name} after processing a page.")
 
     # Check if the "Next" button exists
     try:
         next_button = driver.find_element(By.LINK_TEXT, "Next")
         next_button.click()
+        driver.count_page()
     except NoSuchElementException:
         print("No more pages. Exiting.")
         break
 
 # Close the browser
 driver.quit()
+DriverFactory.report()
+journal.close()
+
+# Reorganize the columns (example: move "Scrape Date" and "Scrape Time" to the front)
+# and write the workbook once from the journal
+journal.compact(excel_filename, key="Job Link", columns=["Scrape Date", "Job Title", "Location", "Category", "Requisition", "Posting Date", "Description", "Job Link", "Scrape Time"])
 
 print(f"All data saved to {excel_filename}")
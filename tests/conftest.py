@@ -0,0 +1,69 @@
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Make the shared ScrapeCommon helpers importable from the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+PAGES = Path(__file__).resolve().parent / "pages"
+
+
+class _QuietFiles(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """Answers every request with server.respond(method, path, headers, body) -> (status, headers, body)"""
+
+    def _answer(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self.server.requests.append((self.command, self.path, dict(self.headers), body))
+        status, headers, payload = self.server.respond(self.command, self.path, self.headers, body)
+        payload = payload.encode('utf-8') if isinstance(payload, str) else payload
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def saved_pages():
+    """Base URL of a local http.server serving the saved pages in tests/pages/"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietFiles, directory=str(PAGES)))
+    yield _serve(server)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """A local server answering with a function the test sets: stub.respond = lambda method, path, headers, body: ...
+
+    Requests it received are in stub.requests as (method, path, headers, body).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Stub)
+    server.requests = []
+    server.respond = lambda method, path, headers, body: (404, {}, b'')
+    server.url = _serve(server)
+    yield server
+    server.shutdown()
+    server.server_close()
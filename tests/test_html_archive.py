@@ -0,0 +1,124 @@
+import argparse
+
+import pandas as pd
+import pytest
+
+from ScrapeCommon import HtmlArchive
+from ScrapeCommon.HtmlArchive import HtmlArchive as Archive
+
+
+def posting(version, paragraphs=60):
+    """A job page whose version-th edit changes one paragraph"""
+    body = "".join(f"<p>Responsibility {i}: coordinate patient care on unit {i % 7}.</p>" for i in range(paragraphs))
+    return f"<html><body><div class=\"job-left\"><h1>RN</h1>{body}<p>Edit {version}</p></div></body></html>"
+
+
+def test_put_get_round_trip(tmp_path):
+    archive = Archive(tmp_path / "kaiser")
+    ref = archive.put(posting(0), key="https://example.org/job/1")
+
+    assert HtmlArchive.is_ref(ref)
+    assert ref in archive
+    assert archive.get(ref) == posting(0)
+    assert archive.put(None) is None
+    archive.close()
+
+    reopened = Archive(tmp_path / "kaiser")
+    assert reopened.get(ref) == posting(0)
+    reopened.close()
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    archive = Archive(tmp_path / "dignity")
+    first = archive.put(posting(0), key="https://example.org/job/1")
+    pack_size = archive.pack_path.stat().st_size
+    # Scraped again the next day, and the same HTML under another posting
+    assert archive.put(posting(0), key="https://example.org/job/1") == first
+    assert archive.put(posting(0), key="https://example.org/job/2") == first
+
+    assert archive.pack_path.stat().st_size == pack_size
+    assert archive.stats['full'] == 1
+    assert archive.stats['duplicate'] == 2
+    archive.close()
+
+
+def test_edits_are_stored_as_deltas_up_to_max_chain(tmp_path):
+    archive = Archive(tmp_path / "uc")
+    key = "https://example.org/job/1"
+    refs = [archive.put(posting(version), key=key) for version in range(HtmlArchive.MAX_CHAIN + 2)]
+
+    entries = [archive.entries[ref.removeprefix(HtmlArchive.REF_PREFIX)] for ref in refs]
+    assert entries[0].base == ''
+    assert all(entry.base for entry in entries[1:HtmlArchive.MAX_CHAIN + 1])
+    # After MAX_CHAIN deltas the next version is stored in full again
+    assert entries[HtmlArchive.MAX_CHAIN + 1].base == ''
+    assert all(entry.length < entries[0].length / 3 for entry in entries[1:HtmlArchive.MAX_CHAIN + 1])
+    archive.close()
+
+    # Every version decodes through its chain after reopening (with an empty decode cache)
+    reopened = Archive(tmp_path / "uc")
+    assert [reopened.get(ref) for ref in reversed(refs)] == [posting(v) for v in reversed(range(len(refs)))]
+    reopened.close()
+
+
+def test_torn_index_line_is_ignored(tmp_path):
+    archive = Archive(tmp_path / "kaiser")
+    kept = archive.put(posting(0), key="a")
+    torn = archive.put(posting(1, paragraphs=5), key="b")
+    archive.close()
+
+    # A crash while the last index line was being written
+    index = archive.index_path.read_text(encoding='utf-8')
+    archive.index_path.write_text(index[:-25], encoding='utf-8')
+
+    reopened = Archive(tmp_path / "kaiser")
+    assert kept in reopened
+    assert torn not in reopened
+    assert reopened.get(kept) == posting(0)
+    # The page can be stored again, and reads back
+    assert reopened.put(posting(1, paragraphs=5), key="b") == torn
+    assert reopened.get(torn) == posting(1, paragraphs=5)
+    reopened.close()
+
+
+def test_index_entry_past_end_of_pack_is_ignored(tmp_path):
+    archive = Archive(tmp_path / "kaiser")
+    kept = archive.put(posting(0), key="a")
+    lost = archive.put(posting(1, paragraphs=5), key="b")
+    archive.close()
+
+    # The last frame never fully reached the disk
+    with open(archive.pack_path, 'r+b') as pack:
+        pack.truncate(archive.entries[lost.removeprefix(HtmlArchive.REF_PREFIX)].offset + 3)
+
+    reopened = Archive(tmp_path / "kaiser")
+    assert kept in reopened
+    assert lost not in reopened
+    reopened.close()
+
+
+def test_resolve_column(tmp_path):
+    ref = HtmlArchive.open_archive('dignity', tmp_path).put(posting(0), key="a")
+    values = pd.Series([ref, '<div>inline</div>', None], index=[3, 4, 5])
+
+    resolved = HtmlArchive.resolve_column(values, tmp_path)
+    assert list(resolved.index) == [3, 4, 5]
+    assert list(resolved[:2]) == [posting(0), '<div>inline</div>']
+    assert pd.isna(resolved.iloc[2])
+
+
+def test_resolve_raises_when_reference_is_not_archived(tmp_path):
+    HtmlArchive.open_archive('kaiser', tmp_path).put(posting(0), key="a")
+    missing = HtmlArchive.REF_PREFIX + "0" * 64
+
+    with pytest.raises(KeyError, match="not in the archive"):
+        HtmlArchive.resolve(missing, tmp_path)
+    with pytest.raises(KeyError):
+        HtmlArchive.resolve_column(pd.Series(['<p>inline</p>', missing]), tmp_path)
+
+
+def test_inline_html_keeps_the_html():
+    parser = HtmlArchive.add_archive_argument(argparse.ArgumentParser())
+    store = HtmlArchive.for_args(parser.parse_args(["--inline-html"]), 'kaiser')
+
+    assert store.put(posting(0), key="a") == posting(0)
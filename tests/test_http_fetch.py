@@ -0,0 +1,61 @@
+from bs4 import BeautifulSoup
+
+from ScrapeCommon import HttpFetch
+
+
+def job_left(page_html):
+    """The Kaiser detail container, or None when the page doesn't have it"""
+    container = BeautifulSoup(page_html, 'html.parser').select_one("div.job-left")
+    return container.decode_contents().strip() if container else None
+
+
+def test_fetch_html_reads_saved_page(saved_pages):
+    html = HttpFetch.fetch_html(f"{saved_pages}/kaiser_job.html")
+    assert '<div class="job-left">' in html
+
+
+def test_fetch_html_returns_none_on_http_error(saved_pages):
+    assert HttpFetch.fetch_html(f"{saved_pages}/missing.html") is None
+
+
+def test_fetch_extract_uses_plain_http_when_container_present(saved_pages):
+    fallbacks = []
+    html = HttpFetch.fetch_extract(f"{saved_pages}/kaiser_job.html", job_left,
+                                   fallback=lambda: fallbacks.append(1) or 'browser')
+    assert html.startswith('<h1>Registered Nurse II</h1>')
+    assert 'Hourly Range: $75.00 - $98.00' in html
+    assert fallbacks == []
+
+
+def test_fetch_extract_falls_back_when_container_missing(saved_pages):
+    fallbacks = []
+    html = HttpFetch.fetch_extract(f"{saved_pages}/rendered_by_script.html", job_left,
+                                   fallback=lambda: fallbacks.append(1) or 'browser')
+    assert html == 'browser'
+    assert fallbacks == [1]
+
+
+def test_fetch_extract_falls_back_when_fetch_fails(saved_pages):
+    assert HttpFetch.fetch_extract(f"{saved_pages}/missing.html", job_left, fallback=lambda: 'browser') == 'browser'
+
+
+def test_fetch_extract_without_fallback_returns_none(saved_pages):
+    assert HttpFetch.fetch_extract(f"{saved_pages}/rendered_by_script.html", job_left) is None
+
+
+def test_fetch_extract_dignity_sections(saved_pages):
+    def sections(page_html):
+        soup = BeautifulSoup(page_html, 'html.parser')
+        section16 = soup.select_one("div.section16.section-spacing")
+        if section16 is None:
+            return None
+        pay_range = soup.select_one("p.job-info.posted-pay-range")
+        return {'section16_html': str(section16), 'pay': " ".join(pay_range.get_text().split())}
+
+    record = HttpFetch.fetch_extract(f"{saved_pages}/dignity_section16.html", sections)
+    assert record['pay'] == 'Pay Range: $52.10 - $78.15 /hour'
+    assert record['section16_html'].startswith('<div class="section16 section-spacing">')
+
+
+def test_session_is_reused_per_thread():
+    assert HttpFetch.get_session() is HttpFetch.get_session()
@@ -0,0 +1,119 @@
+import hashlib
+
+import pytest
+
+from ScrapeCommon.PageCache import PageCache
+
+
+@pytest.fixture
+def pages(stub_server):
+    """The stub serving stub_server.pages {path: body}, with an ETag when stub_server.etags is set"""
+    stub_server.pages = {}
+    stub_server.etags = True
+
+    def respond(method, path, headers, body):
+        if path not in stub_server.pages:
+            return 404, {}, b''
+        text = stub_server.pages[path]
+        if not stub_server.etags:
+            return 200, {'Content-Type': 'text/html; charset=utf-8'}, text
+        etag = '"%s"' % hashlib.sha1(text.encode('utf-8')).hexdigest()
+        if headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}, text
+
+    stub_server.respond = respond
+    return stub_server
+
+
+def cache_at(tmp_path, **options):
+    return PageCache(tmp_path / "page_cache.sqlite", source='kaiser', **options)
+
+
+def test_revalidates_with_etag_and_serves_304_from_cache(pages, tmp_path):
+    pages.pages['/job/1'] = '<div class="job-left">RN</div>'
+    cache = cache_at(tmp_path, ttl_hours=0)
+
+    assert cache.fetch(f"{pages.url}/job/1") == '<div class="job-left">RN</div>'
+    assert cache.fetch(f"{pages.url}/job/1") == '<div class="job-left">RN</div>'
+
+    assert 'If-None-Match' not in pages.requests[0][2]
+    assert pages.requests[1][2]['If-None-Match'] == '"%s"' % hashlib.sha1(b'<div class="job-left">RN</div>').hexdigest()
+    assert cache.stats['miss'] == 1
+    assert cache.stats['not_modified'] == 1
+    cache.close()
+
+
+def test_changed_page_is_downloaded_again(pages, tmp_path):
+    pages.pages['/job/1'] = 'version 1'
+    cache = cache_at(tmp_path, ttl_hours=0)
+    cache.fetch(f"{pages.url}/job/1")
+    pages.pages['/job/1'] = 'version 2'
+
+    assert cache.fetch(f"{pages.url}/job/1") == 'version 2'
+    assert cache.stats['changed'] == 1
+    cache.close()
+
+
+def test_hash_match_without_validators(pages, tmp_path):
+    pages.etags = False
+    pages.pages['/job/1'] = 'same body'
+    cache = cache_at(tmp_path, ttl_hours=0)
+
+    cache.fetch(f"{pages.url}/job/1")
+    assert cache.fetch(f"{pages.url}/job/1") == 'same body'
+    pages.pages['/job/1'] = 'new body'
+    assert cache.fetch(f"{pages.url}/job/1") == 'new body'
+
+    assert 'If-None-Match' not in pages.requests[1][2]
+    assert (cache.stats['miss'], cache.stats['unchanged'], cache.stats['changed']) == (1, 1, 1)
+    cache.close()
+
+
+def test_fresh_within_ttl_skips_the_network(pages, tmp_path):
+    pages.pages['/job/1'] = 'cached'
+    cache = cache_at(tmp_path, ttl_hours=1)
+    cache.fetch(f"{pages.url}/job/1")
+
+    assert cache.fetch(f"{pages.url}/job/1") == 'cached'
+    assert len(pages.requests) == 1
+    assert cache.stats['fresh'] == 1
+
+    # Past the TTL the page is revalidated again
+    with cache._conn:
+        cache._conn.execute("UPDATE pages SET validated_at = validated_at - 7200")
+    assert cache.fetch(f"{pages.url}/job/1") == 'cached'
+    assert len(pages.requests) == 2
+    assert cache.stats['not_modified'] == 1
+    cache.close()
+
+
+def test_source_ttl_defaults():
+    assert PageCache(':memory:', source='claremont').ttl == 20 * 3600
+    assert PageCache(':memory:', source='unknown').ttl == 12 * 3600
+
+
+def test_failed_fetch_returns_none(pages, tmp_path):
+    cache = cache_at(tmp_path)
+    assert cache.fetch(f"{pages.url}/missing") is None
+    assert cache.stats['error'] == 1
+    cache.close()
+
+
+def test_evicts_least_recently_used_pages(pages, tmp_path):
+    for name in 'abc':
+        # Random-looking bodies, so compression leaves them about the same size
+        pages.pages[f'/job/{name}'] = hashlib.sha256(name.encode()).hexdigest() * 200
+    cache = cache_at(tmp_path, ttl_hours=1)
+    for name in 'abc':
+        cache.fetch(f"{pages.url}/job/{name}")
+    # Reading a again makes b the least recently used
+    cache.fetch(f"{pages.url}/job/a")
+    sizes = dict(cache._conn.execute("SELECT url, size FROM pages"))
+    cache.max_bytes = sum(sizes.values()) - 1
+
+    assert cache.evict() == 1
+    cached = {url for url, in cache._conn.execute("SELECT url FROM pages")}
+    assert cached == {f"{pages.url}/job/a", f"{pages.url}/job/c"}
+    assert cache.evict() == 0
+    cache.close()
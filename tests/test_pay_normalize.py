@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ScrapeCommon.PayNormalize import HOURS_PER_YEAR, PAY_COLUMNS, normalize_pay
+
+
+def pay_of(text):
+    """normalize_pay for a single cell, as a dict of PAY_COLUMNS"""
+    return normalize_pay(pd.Series([text])).iloc[0].to_dict()
+
+
+@pytest.mark.parametrize("text, low, high, period", [
+    ("Pay Range: $52.10 - $78.15 /hour", 52.10, 78.15, 'hour'),
+    ("$1,200 - $1,500 per week", 1200, 1500, 'week'),
+    ("Monthly salary: $5,000 - $7,500", 5000, 7500, 'month'),
+    ("$90,000 - $120,000 annually", 90000, 120000, 'year'),
+    ("Hourly rate: $16.50", 16.50, 16.50, 'hour'),
+])
+def test_stated_periods(text, low, high, period):
+    pay = pay_of(text)
+    assert (pay['pay_min'], pay['pay_max'], pay['pay_period']) == (low, high, period)
+    assert pay['pay_confidence'] == 'high'
+
+
+def test_k_suffix_is_thousands():
+    pay = pay_of("Salary range: $80k - $95k")
+    assert (pay['pay_min'], pay['pay_max'], pay['pay_period']) == (80000, 95000, 'year')
+    assert pay['pay_text'] == "$80k - $95k"
+
+
+def test_space_after_dollar_sign():
+    # Kaiser's "$ 76.47 - $ 76.47", which the old per-source regex missed
+    pay = pay_of("Hourly Range: $ 76.47 - $ 76.47")
+    assert (pay['pay_min'], pay['pay_max'], pay['pay_period']) == (76.47, 76.47, 'hour')
+    assert pay['pay_text'] == "$ 76.47 - $ 76.47"
+
+
+def test_budgets_are_not_pay():
+    assert pd.isna(pay_of("You will manage a $20 million budget")['pay_min'])
+    assert pd.isna(pay_of("Part of a $6 billion+ health system")['pay_min'])
+
+    pay = pay_of("We manage a $20 million budget and a $6 billion+ endowment. Pay: $25.00 - $28.00 per hour")
+    assert (pay['pay_min'], pay['pay_max'], pay['pay_period']) == (25, 28, 'hour')
+
+
+def test_missing_and_empty_cells_keep_the_index():
+    values = pd.Series([None, "", np.nan, "No pay listed", "$20.00 - $22.00 per hour"], index=[7, 7, 3, 9, 1])
+    pay = normalize_pay(values)
+
+    assert list(pay.columns) == PAY_COLUMNS
+    assert list(pay.index) == [7, 7, 3, 9, 1]
+    assert pay.iloc[:4].isna().all().all()
+    assert pay.iloc[4]['pay_min'] == 20
+
+
+def test_column_without_any_amount():
+    pay = normalize_pay(pd.Series([None, "Full time"], index=['a', 'b']))
+    assert list(pay.index) == ['a', 'b']
+    assert pay.isna().all().all()
+
+
+@pytest.mark.parametrize("text, period, confidence", [
+    # The period is stated and fits the amount
+    ("$25.00 - $28.00 per hour", 'hour', 'high'),
+    # No period, but pay wording: inferred from the amount
+    ("Compensation: $4,000 - $6,000", 'month', 'medium'),
+    # A bare amount with nothing saying it is pay
+    ("$45.00 - $60.00", 'hour', 'low'),
+    # A stated period that contradicts the amount: the amount wins
+    ("$70,000 per hour", 'year', 'low'),
+    # A range running backwards
+    ("$30 - $25 per hour", 'hour', 'low'),
+])
+def test_confidence_levels(text, period, confidence):
+    pay = pay_of(text)
+    assert (pay['pay_period'], pay['pay_confidence']) == (period, confidence)
+
+
+def test_most_confident_match_wins():
+    pay = pay_of("Sign-on bonus of $5,000. Salary: $95,000 - $110,000 per year")
+    assert (pay['pay_min'], pay['pay_max'], pay['pay_period']) == (95000, 110000, 'year')
+
+
+def test_hourly_and_annual_conversions():
+    pay = normalize_pay(pd.Series([
+        "$52.10 - $78.15 /hour", "$1,200 - $1,500 per week", "$5,000 - $7,500 monthly", "$90,000 - $120,000 annually",
+    ]))
+
+    assert list(pay['hourly_min']) == [52.10, 30.00, round(5000 * 12 / HOURS_PER_YEAR, 2), round(90000 / HOURS_PER_YEAR, 2)]
+    assert list(pay['hourly_max']) == [78.15, 37.50, round(7500 * 12 / HOURS_PER_YEAR, 2), round(120000 / HOURS_PER_YEAR, 2)]
+    assert list(pay['annual_min']) == [round(52.10 * HOURS_PER_YEAR, 2), 1200 * 52, 60000, 90000]
+    assert list(pay['annual_max']) == [round(78.15 * HOURS_PER_YEAR, 2), 1500 * 52, 90000, 120000]
@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from ScrapeCommon import SearchResults
+
+RECORDED = json.loads((Path(__file__).resolve().parent / "recorded" / "search_results.json").read_text())
+
+
+@pytest.fixture
+def search_site(stub_server):
+    """The stub serving the recorded search page and #search-results fragments.
+
+    stub_server.failures maps a page number to how many times it answers 500 first
+    (None: always).
+    """
+    stub_server.failures = {}
+
+    def respond(method, path, headers, body):
+        parts = urlsplit(path)
+        if parts.path == SearchResults.RESULTS_PATH:
+            page = int(parse_qs(parts.query)['CurrentPage'][0])
+            remaining = stub_server.failures.get(page, 0)
+            if remaining is None or remaining > 0:
+                if remaining:
+                    stub_server.failures[page] = remaining - 1
+                return 500, {}, b'Service Unavailable'
+            return 200, {'Content-Type': 'application/json'}, json.dumps({'results': RECORDED['results'][str(page)]})
+        if parts.path == '/search-jobs/':
+            return 200, {'Content-Type': 'text/html; charset=utf-8'}, RECORDED['search_page']
+        return 404, {}, b''
+
+    stub_server.respond = respond
+    return stub_server
+
+
+def job_ids(results, site_url):
+    return [{'job_id': link['data-job-id'], 'url': site_url + link['href']}
+            for link in results.select("#search-results a[data-job-id]")]
+
+
+def results_requests(stub):
+    """Query parameters of every results request, in the order they arrived"""
+    return [(parse_qs(urlsplit(path).query), headers) for method, path, headers, _ in stub.requests
+            if urlsplit(path).path == SearchResults.RESULTS_PATH]
+
+
+def crawl(stub, **options):
+    return SearchResults.crawl(stub.url, "/search-jobs/", job_ids, records_per_page=20, workers=3,
+                               backoff=0, **options)
+
+
+def test_crawl_returns_every_page_in_page_order(search_site):
+    finished = []
+    rows, failed = crawl(search_site, on_page=lambda page, rows: finished.append((page, len(rows))))
+
+    assert failed == {}
+    assert [row['job_id'] for row in rows] == [str(30000 + i) for i in range(45)]
+    assert rows[0]['url'] == f"{search_site.url}/job/oakland/registered-nurse/641/30000"
+    assert sorted(finished) == [(1, 20), (2, 20), (3, 5)]
+    # Page 1 comes first, alone, to learn the page count
+    assert finished[0] == (1, 20)
+    assert sorted(int(params['CurrentPage'][0]) for params, _ in results_requests(search_site)) == [1, 2, 3]
+
+
+def test_results_requests_use_the_region_facet_and_page_size(search_site):
+    crawl(search_site)
+
+    for params, headers in results_requests(search_site):
+        # The California checkbox of the recorded search page, not Nevada or the built-in facet
+        assert params['ActiveFacetID'] == ['5332921']
+        assert params['FacetFilters[0].ID'] == ['5332921']
+        assert params['FacetFilters[0].FacetType'] == ['3']
+        assert params['FacetFilters[0].Count'] == ['45']
+        assert params['FacetFilters[0].Display'] == ['California']
+        assert params['RecordsPerPage'] == ['20']
+        assert headers['X-Requested-With'] == 'XMLHttpRequest'
+
+
+def test_failing_page_is_retried_then_fails_alone(search_site):
+    search_site.failures = {2: 1, 3: None}
+    finished = []
+    rows, failed = crawl(search_site, on_page=lambda page, rows: finished.append(page))
+
+    assert list(failed) == [3]
+    assert '500' in failed[3]
+    # Page 2 succeeded on its second attempt; page 3 used up every attempt
+    assert sorted(finished) == [1, 2]
+    assert [row['job_id'] for row in rows] == [str(30000 + i) for i in range(40)]
+    pages = [int(params['CurrentPage'][0]) for params, _ in results_requests(search_site)]
+    assert pages.count(2) == 2
+    assert pages.count(3) == SearchResults.RETRIES
+
+
+def test_first_page_failure_is_reported(search_site):
+    search_site.failures = {1: None}
+    rows, failed = crawl(search_site)
+
+    assert rows == []
+    assert list(failed) == [1]
+    assert '500' in failed[1]
+
+
+def test_rerun_skips_finished_pages(search_site, tmp_path):
+    checkpoint = tmp_path / "kpjobs.pages.txt"
+    for page in [1, 2]:
+        SearchResults.mark_page_finished(checkpoint, page)
+    finished = []
+    rows, failed = crawl(search_site, on_page=lambda page, rows: finished.append(page),
+                         skip_pages=SearchResults.load_finished_pages(checkpoint))
+
+    assert failed == {}
+    assert finished == [3]
+    assert [row['job_id'] for row in rows] == [str(30000 + i) for i in range(40, 45)]
+    # Page 1 is still fetched for the page count
+    assert sorted(int(params['CurrentPage'][0]) for params, _ in results_requests(search_site)) == [1, 3]
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from ScrapeCommon import Workday
+
+RECORDED = json.loads((Path(__file__).resolve().parent / "recorded" / "workday_tccs.json").read_text())
+
+
+@pytest.fixture
+def workday(stub_server):
+    """The stub serving the recorded TCCS board on every site; sites listed in stub_server.broken answer 500"""
+    stub_server.broken = set()
+
+    def respond(method, path, headers, body):
+        site = path.split('/')[4]
+        if site in stub_server.broken:
+            return 500, {}, b'{"errorCode": "S22"}'
+        if method == 'POST' and path.endswith('/jobs'):
+            offset = json.loads(body)['offset']
+            return 200, {'Content-Type': 'application/json'}, json.dumps(RECORDED['search'][str(offset)])
+        return 200, {'Content-Type': 'application/json'}, json.dumps(RECORDED['detail'])
+
+    stub_server.respond = respond
+    return stub_server
+
+
+def searched_offsets(stub, site):
+    return sorted(json.loads(body)['offset'] for method, path, _, body in stub.requests
+                  if method == 'POST' and f"/{site}/" in path)
+
+
+def test_parse_career_page():
+    assert Workday.parse_career_page("https://tcc.wd1.myworkdayjobs.com/en-US/CGU_Careers") == \
+        ("https://tcc.wd1.myworkdayjobs.com", "tcc", "en-US", "CGU_Careers")
+    assert Workday.api_root("https://tcc.wd1.myworkdayjobs.com/HMC_Careers") == \
+        "https://tcc.wd1.myworkdayjobs.com/wday/cxs/tcc/HMC_Careers"
+
+
+def test_fetch_listings_pages_through_every_posting(workday):
+    board = f"{workday.url}/en-US/TCCS_Careers"
+    listings, failed = Workday.fetch_listings([board], workers=4)
+
+    assert failed == {}
+    rows = listings[board]
+    assert len(rows) == 45
+    assert searched_offsets(workday, 'TCCS_Careers') == [0, 20, 40]
+    # Postings keep the board's page order
+    assert [row['requisition_id'] for row in rows] == [f"TCCS-{1000 + i}" for i in range(45)]
+    assert rows[0]['url'] == f"{workday.url}/en-US/TCCS_Careers/job/Claremont-CA/Administrative-Assistant_TCCS-1000"
+    assert rows[0]['department'] == 'TCCS'
+    assert rows[0]['source_page'] == board
+    assert set(rows[0]) == {'scrape_date', 'title', 'url', 'source_page', 'department', 'location', 'time_type',
+                            'posted', 'requisition_id', 'scrape_time', 'scrape_day'}
+
+
+def test_failed_board_does_not_lose_the_others(workday):
+    boards = [f"{workday.url}/{site}" for site in ['TCCS_Careers', 'HMC_Careers', 'CMC_Staff']]
+    workday.broken.add('HMC_Careers')
+    finished = []
+
+    listings, failed = Workday.fetch_listings(boards, workers=4,
+                                              on_board=lambda url, rows: finished.append((url, len(rows))))
+
+    assert list(failed) == [boards[1]]
+    assert '500' in failed[boards[1]]
+    assert list(listings) == [boards[0], boards[2]]
+    assert sorted(finished) == sorted([(boards[0], 45), (boards[2], 45)])
+    # Nothing past the failed first page was requested for the broken board
+    assert searched_offsets(workday, 'HMC_Careers') == [0]
+
+
+def test_fetch_job_detail_maps_recorded_json(workday):
+    board = f"{workday.url}/TCCS_Careers"
+    job_url = f"{board}/job/Claremont-CA/Administrative-Assistant_TCCS-1000"
+    detail = Workday.fetch_job_detail(job_url, board)
+
+    method, path, _, _ = workday.requests[-1]
+    assert (method, path) == ('GET', "/wday/cxs/127/TCCS_Careers/job/Claremont-CA/Administrative-Assistant_TCCS-1000")
+    assert detail['title'] == 'Administrative Assistant 1'
+    assert detail['description'].splitlines() == [
+        'Position: Administrative Assistant', 'Schedule calendars', 'Order supplies', 'Pay: $25.00 - $28.00 per hour']
+    assert detail['details'] == {'locations': 'Claremont, CA', 'time type': 'Part time',
+                                 'posted on': 'Posted Today', 'job requisition id': 'TCCS-1000'}